@@ -3,7 +3,7 @@ from .models import ChatConversation, ChatMessage
 
 @admin.register(ChatConversation)
 class ChatConversationAdmin(admin.ModelAdmin):
-    list_display = ['id', 'user', 'title', 'created_at', 'updated_at']
+    list_display = ['id', 'user', 'title', 'message_count', 'last_message_at', 'created_at', 'updated_at']
     list_filter = ['created_at', 'updated_at']
     search_fields = ['title', 'user__username']
     readonly_fields = ['created_at', 'updated_at']
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete
 
 class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.apps.chat'
-    verbose_name = '聊天功能'
\ No newline at end of file
+    verbose_name = '聊天功能'
+    
+    def ready(self):
+        from .models import ChatMessage, message_deleted
+        # 删除消息时重新计算对话的消息数量和最后一条消息
+        post_delete.connect(message_deleted, sender=ChatMessage, dispatch_uid='chat_message_deleted')
@@ -0,0 +1,47 @@
+"""
+对话侧边栏（对话列表接口）的按用户缓存
+
+缓存键包含用户的版本号：新增消息、创建/修改/删除对话时更换版本号，
+旧版本的缓存不再被读取，自然过期。使用 Django 缓存框架，多进程部署必须配置
+共享缓存（设置 REDIS_URL），否则各进程的本地缓存只在本进程内失效，其他进程在超时前
+一直返回旧列表；gunicorn 多个工作进程且 DEBUG=False 时未配置会拒绝启动（见 backend/gunicorn.conf.py）。
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_TIMEOUT = 300
+
+
+def _version_key(user_id):
+    return f'chat:sidebar:{user_id}:version'
+
+
+def _version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def sidebar_cache_key(user_id, query_string):
+    """
+    先取键再读写：同一个键用于读取和回填，
+    计算期间发生的失效会更换版本号，回填的旧数据不会被读到。
+    """
+    return f'chat:sidebar:{user_id}:{_version(user_id)}:{query_string}'
+
+
+def get_sidebar(key):
+    return cache.get(key)
+
+
+def set_sidebar(key, data):
+    cache.set(key, data, getattr(settings, 'CHAT_SIDEBAR_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+
+
+def invalidate_sidebar(user_id):
+    cache.set(_version_key(user_id), uuid.uuid4().hex, None)
@@ -0,0 +1,124 @@
+"""
+对话上下文窗口管理
+
+发送给AI的上下文 = 系统提示词 + 早期消息摘要 + 最近若干轮原文 + 当前用户消息。
+
+- 最近窗口缓存在 Django cache 中，每轮只查询上次之后新增的消息；
+- 超出轮数或字符预算的早期消息按条折叠成一行摘要，持久化到
+  ChatConversation.context_summary，摘要本身也有长度上限（丢弃最早的行）；
+- 缓存丢失时从 context_summarized_until 之后的消息重建，不会读取已折叠的历史。
+
+预算按字符计（中文内容下约等于 token 数）。
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import ChatConversation, ChatMessage
+
+DEFAULT_CONTEXT_SETTINGS = {
+    'RECENT_TURNS': 6,           # 原文保留的最近轮数（一问一答为一轮）
+    'MAX_RECENT_CHARS': 8000,    # 最近窗口原文的字符预算
+    'MAX_SUMMARY_CHARS': 2000,   # 摘要的字符上限
+    'DIGEST_CHARS': 80,          # 每条折叠消息在摘要中保留的字符数
+    'CACHE_TIMEOUT': 60 * 60,
+}
+
+ROLE_LABELS = {
+    'user': '用户',
+    'assistant': '助手',
+}
+
+
+def get_context_settings():
+    return {**DEFAULT_CONTEXT_SETTINGS, **getattr(settings, 'CHAT_CONTEXT', {})}
+
+
+class ConversationContextBuilder:
+    """为单个对话构建有界的AI上下文"""
+
+    def __init__(self, conversation):
+        self.conversation = conversation
+        self.config = get_context_settings()
+        self.cache_key = f'chat:context:{conversation.pk}'
+
+    def build(self, system_prompt, user_message, exclude_message_id=None):
+        """
+        返回发送给AI的完整内容。
+        exclude_message_id：已入库的当前用户消息，避免在历史中重复出现。
+        """
+        recent = self._load_recent(exclude_message_id)
+
+        parts = [system_prompt, '\n\n']
+        if self.conversation.context_summary:
+            parts.append(f"【早期对话摘要】\n{self.conversation.context_summary}\n\n")
+        for _, role, content in recent:
+            label = ROLE_LABELS.get(role)
+            if label:
+                parts.append(f"{label}: {content}\n")
+        parts.append(f"用户: {user_message}\n助手: ")
+        return ''.join(parts)
+
+    def _load_recent(self, exclude_message_id):
+        state = cache.get(self.cache_key)
+        if state is None or state['summarized_until'] != self.conversation.context_summarized_until:
+            state = {
+                'last_id': self.conversation.context_summarized_until,
+                'summarized_until': self.conversation.context_summarized_until,
+                'recent': [],
+            }
+
+        new_messages = ChatMessage.objects.filter(
+            conversation_id=self.conversation.pk,
+            id__gt=state['last_id']
+        )
+        if exclude_message_id is not None:
+            new_messages = new_messages.exclude(id=exclude_message_id)
+        for message_id, role, content in new_messages.order_by('id').values_list('id', 'role', 'content'):
+            state['recent'].append((message_id, role, content))
+            state['last_id'] = message_id
+
+        folded = self._trim(state['recent'])
+        if folded:
+            self._fold_into_summary(folded)
+            state['summarized_until'] = self.conversation.context_summarized_until
+
+        cache.set(self.cache_key, state, self.config['CACHE_TIMEOUT'])
+        return state['recent']
+
+    def _trim(self, recent):
+        """把超出轮数或字符预算的最早消息移出窗口，返回被移出的消息"""
+        max_messages = self.config['RECENT_TURNS'] * 2
+        max_chars = self.config['MAX_RECENT_CHARS']
+        total_chars = sum(len(content) for _, _, content in recent)
+
+        folded = []
+        while recent and (len(recent) > max_messages or total_chars > max_chars):
+            message = recent.pop(0)
+            total_chars -= len(message[2])
+            folded.append(message)
+        return folded
+
+    def _fold_into_summary(self, messages):
+        digest_chars = self.config['DIGEST_CHARS']
+        lines = [self.conversation.context_summary] if self.conversation.context_summary else []
+        for _, role, content in messages:
+            text = ' '.join(content.split())
+            if len(text) > digest_chars:
+                text = text[:digest_chars] + '...'
+            lines.append(f"- {ROLE_LABELS.get(role, role)}: {text}")
+
+        summary = '\n'.join(lines)
+        max_chars = self.config['MAX_SUMMARY_CHARS']
+        if len(summary) > max_chars:
+            # 从行首截断，保留最近的摘要行
+            summary = summary[-max_chars:]
+            summary = summary[summary.find('\n') + 1:] if '\n' in summary else summary
+
+        summarized_until = messages[-1][0]
+        # 使用update避免刷新updated_at，不影响对话列表排序
+        ChatConversation.objects.filter(pk=self.conversation.pk).update(
+            context_summary=summary,
+            context_summarized_until=summarized_until
+        )
+        self.conversation.context_summary = summary
+        self.conversation.context_summarized_until = summarized_until
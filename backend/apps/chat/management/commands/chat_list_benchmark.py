@@ -0,0 +1,64 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from backend.apps.chat.views import ChatViewSet
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Measure query count and latency of the conversation list endpoint for one user (in-process, no server needed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='User whose conversation list is fetched')
+        parser.add_argument('--iterations', type=int, default=20, help='Number of timed requests')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} not found")
+
+        view = ChatViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        # 分页链接需要合法的Host
+        host = next((host for host in settings.ALLOWED_HOSTS if host not in ('*', '')), 'localhost').lstrip('.')
+
+        def fetch():
+            request = factory.get('/api/chat/', HTTP_HOST=host)
+            force_authenticate(request, user=user)
+            response = view(request)
+            response.render()
+            return response
+
+        # 预热一次，同时统计查询数
+        with CaptureQueriesContext(connection) as queries:
+            response = fetch()
+        if response.status_code != 200:
+            raise CommandError(f'List request failed: {response.status_code}')
+        data = response.data
+        rows = len(data['results'] if isinstance(data, dict) else data)
+
+        timings = []
+        for _ in range(options['iterations']):
+            started = time.perf_counter()
+            fetch()
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        p95 = max(int(len(timings) * 0.95) - 1, 0)
+
+        self.stdout.write('='*60)
+        self.stdout.write(f'📊 Conversation List Benchmark ({user.username}):')
+        self.stdout.write(f'   💬 Conversations returned: {rows}')
+        self.stdout.write(f'   🗄️  Queries per request: {len(queries)}')
+        self.stdout.write(f'   🕐 Latency p50/p95: {statistics.median(timings) * 1000:.1f}ms / {timings[p95] * 1000:.1f}ms')
+        if options['verbosity'] > 1:
+            for query in queries.captured_queries:
+                self.stdout.write(f"   - {query['sql'][:200]}")
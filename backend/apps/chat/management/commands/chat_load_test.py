@@ -0,0 +1,94 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Load test the chat streaming endpoints of a running server (use LLM_PROVIDER=fake on the server)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            default='http://localhost:8000/api',
+            help='API base URL of the running server',
+        )
+        parser.add_argument('--username', required=True, help='Login username')
+        parser.add_argument('--password', required=True, help='Login password')
+        parser.add_argument(
+            '--endpoint',
+            choices=['send_message', 'send_message_async'],
+            default='send_message',
+            help='send_message (sync, WSGI) or send_message_async (ASGI)',
+        )
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=200, help='Total chat turns to send')
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        response = requests.post(f'{base_url}/auth/login/', json={
+            'username': options['username'],
+            'password': options['password'],
+        })
+        if response.status_code != 200:
+            raise CommandError(f'Login failed: {response.status_code} {response.text}')
+        headers = {'Authorization': f"Bearer {response.json()['tokens']['access']}"}
+
+        total = options['requests']
+        concurrency = options['concurrency']
+        self.stdout.write(f"🚀 {total} turns against {options['endpoint']} with {concurrency} concurrent clients")
+
+        # 每个请求使用独立对话，对话在计时前创建
+        conversation_ids = []
+        with requests.Session() as session:
+            for _ in range(total):
+                created = session.post(f'{base_url}/chat/create_conversation/', headers=headers)
+                created.raise_for_status()
+                conversation_ids.append(created.json()['id'])
+
+        local = threading.local()
+
+        def send(conversation_id):
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            started = time.perf_counter()
+            first_byte = None
+            try:
+                with session.post(
+                    f"{base_url}/chat/{conversation_id}/{options['endpoint']}/",
+                    json={'message': '压测消息'},
+                    headers=headers,
+                    stream=True,
+                    timeout=300,
+                ) as response:
+                    if response.status_code != 200:
+                        return None
+                    for chunk in response.iter_content(chunk_size=None):
+                        if first_byte is None and chunk:
+                            first_byte = time.perf_counter() - started
+            except requests.RequestException:
+                return None
+            return first_byte, time.perf_counter() - started
+
+        wall_started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(send, conversation_ids))
+        wall_time = time.perf_counter() - wall_started
+
+        ok = [result for result in results if result]
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(f'📊 Load Test Summary:')
+        self.stdout.write(f'   ✅ Success: {len(ok)}')
+        self.stdout.write(f'   ❌ Errors: {total - len(ok)}')
+        self.stdout.write(f'   ⏱️  Wall time: {wall_time:.2f}s')
+        self.stdout.write(f'   📈 Throughput: {len(ok) / wall_time:.1f} turns/s')
+        if ok:
+            ttfb = sorted(result[0] or result[1] for result in ok)
+            latency = sorted(result[1] for result in ok)
+            p95 = max(int(len(latency) * 0.95) - 1, 0)
+            self.stdout.write(f'   ⚡ TTFB p50/p95: {statistics.median(ttfb):.3f}s / {ttfb[p95]:.3f}s')
+            self.stdout.write(f'   🕐 Latency p50/p95: {statistics.median(latency):.3f}s / {latency[p95]:.3f}s')
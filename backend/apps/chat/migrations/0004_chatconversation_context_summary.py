@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_chatmessage_referenced_todos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatconversation',
+            name='context_summarized_until',
+            field=models.PositiveBigIntegerField(default=0, help_text='ID不大于该值的消息已折叠进上下文摘要', verbose_name='摘要截止消息ID'),
+        ),
+        migrations.AddField(
+            model_name='chatconversation',
+            name='context_summary',
+            field=models.TextField(blank=True, default='', help_text='滑出最近对话窗口的早期消息摘要，发送给AI时代替完整历史', verbose_name='上下文摘要'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:34
+
+from django.db import migrations, models
+
+
+PREVIEW_LENGTH = 100
+
+
+def backfill_last_message(apps, schema_editor):
+    """
+    回填消息数量和最后一条消息；标题仍为"新对话"但已有用户消息的对话，
+    按第一条用户消息补齐标题（与发送消息时的规则一致），列表不再需要回退查询。
+    """
+    ChatConversation = apps.get_model('chat', 'ChatConversation')
+    ChatMessage = apps.get_model('chat', 'ChatMessage')
+
+    conversations = {conversation.pk: conversation for conversation in ChatConversation.objects.all()}
+    messages = ChatMessage.objects.order_by('conversation_id', 'created_at', 'id').values_list(
+        'conversation_id', 'role', 'content', 'created_at'
+    )
+    untitled = {pk for pk, conversation in conversations.items() if conversation.title == '新对话'}
+    for conversation_id, role, content, created_at in messages.iterator():
+        conversation = conversations[conversation_id]
+        if role == 'user' and conversation_id in untitled:
+            conversation.title = content[:50] + ('...' if len(content) > 50 else '')
+            untitled.discard(conversation_id)
+        conversation.message_count += 1
+        conversation.last_message_preview = content[:PREVIEW_LENGTH] + ('...' if len(content) > PREVIEW_LENGTH else '')
+        conversation.last_message_role = role
+        conversation.last_message_at = created_at
+
+    ChatConversation.objects.bulk_update(
+        conversations.values(),
+        ['title', 'message_count', 'last_message_preview', 'last_message_role', 'last_message_at'],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_chatconversation_context_summary'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='chatconversation',
+            name='chat_chatco_user_id_fe58be_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='chatconversation',
+            name='chat_chatco_updated_598f50_idx',
+        ),
+        migrations.AddField(
+            model_name='chatconversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='最后一条消息时间'),
+        ),
+        migrations.AddField(
+            model_name='chatconversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, default='', max_length=103, verbose_name='最后一条消息预览'),
+        ),
+        migrations.AddField(
+            model_name='chatconversation',
+            name='last_message_role',
+            field=models.CharField(blank=True, default='', max_length=10, verbose_name='最后一条消息角色'),
+        ),
+        migrations.AddField(
+            model_name='chatconversation',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='消息数量'),
+        ),
+        migrations.AddIndex(
+            model_name='chatconversation',
+            index=models.Index(fields=['user', '-updated_at'], name='chat_conv_user_updated_idx'),
+        ),
+        migrations.RunPython(backfill_last_message, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,25 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from .cache import invalidate_sidebar
+
 User = get_user_model()
 
+DEFAULT_TITLE = '新对话'
+# 对话列表中最后一条消息的预览长度
+PREVIEW_LENGTH = 100
+# 由第一条用户消息生成的标题长度
+TITLE_LENGTH = 50
+
+
+def message_preview(content):
+    return content[:PREVIEW_LENGTH] + ('...' if len(content) > PREVIEW_LENGTH else '')
+
+
+def title_from_message(content):
+    return content[:TITLE_LENGTH] + ('...' if len(content) > TITLE_LENGTH else '')
+
 class ChatConversation(models.Model):
     """聊天对话模型"""
     user = models.ForeignKey(
@@ -14,7 +30,7 @@ class ChatConversation(models.Model):
     )
     title = models.CharField(
         max_length=200, 
-        default='新对话',
+        default=DEFAULT_TITLE,
         verbose_name="对话标题"
     )
     created_at = models.DateTimeField(
@@ -25,25 +41,58 @@ class ChatConversation(models.Model):
         auto_now=True,
         verbose_name="更新时间"
     )
+    context_summary = models.TextField(
+        blank=True,
+        default='',
+        verbose_name="上下文摘要",
+        help_text="滑出最近对话窗口的早期消息摘要，发送给AI时代替完整历史"
+    )
+    context_summarized_until = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="摘要截止消息ID",
+        help_text="ID不大于该值的消息已折叠进上下文摘要"
+    )
+    # 以下字段在新增消息时由 ChatMessage.save() 原子更新，删除消息时由 message_deleted 重新计算，
+    # 对话列表无需查询消息表
+    message_count = models.PositiveIntegerField(default=0, verbose_name="消息数量")
+    last_message_preview = models.CharField(
+        max_length=PREVIEW_LENGTH + 3,
+        blank=True,
+        default='',
+        verbose_name="最后一条消息预览"
+    )
+    last_message_role = models.CharField(
+        max_length=10,
+        blank=True,
+        default='',
+        verbose_name="最后一条消息角色"
+    )
+    last_message_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="最后一条消息时间"
+    )
     
     class Meta:
         ordering = ['-updated_at']
         verbose_name = "聊天对话"
         verbose_name_plural = "聊天对话"
         indexes = [
-            models.Index(fields=['user']),
-            models.Index(fields=['-updated_at']),
+            # 对话列表：按用户过滤后按更新时间倒序
+            models.Index(fields=['user', '-updated_at'], name='chat_conv_user_updated_idx'),
         ]
     
     def __str__(self):
         return f"{self.user.username} - {self.title}"
     
-    def get_first_user_message(self):
-        """获取第一条用户消息作为标题"""
-        first_message = self.messages.filter(role='user').first()
-        if first_message:
-            return first_message.content[:50] + ('...' if len(first_message.content) > 50 else '')
-        return '新对话'
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_sidebar(self.user_id)
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_sidebar(self.user_id)
+        return result
 
 class ChatMessage(models.Model):
     """聊天消息模型"""
@@ -98,4 +147,62 @@ class ChatMessage(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.get_role_display()}: {self.content[:50]}..."
\ No newline at end of file
+        return f"{self.get_role_display()}: {self.content[:50]}..."
+    
+    def save(self, *args, **kwargs):
+        """
+        新增消息时同步更新对话的消息数量、最后一条消息和更新时间；
+        对话仍为默认标题时，第一条用户消息同时写入标题（只在这一次生成）。
+        插入消息和更新对话在同一事务中，任一失败都不会留下不一致的计数。
+        """
+        adding = self._state.adding
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            if not adding:
+                return
+            values = {
+                'message_count': models.F('message_count') + 1,
+                'last_message_preview': message_preview(self.content),
+                'last_message_role': self.role,
+                'last_message_at': self.created_at,
+                'updated_at': timezone.now(),
+            }
+            if self.role == 'user':
+                # 条件在同一条UPDATE中判断，并发发送时也只生成一次
+                values['title'] = models.Case(
+                    models.When(
+                        title=DEFAULT_TITLE,
+                        message_count=0,
+                        then=models.Value(title_from_message(self.content))
+                    ),
+                    default=models.F('title')
+                )
+            ChatConversation.objects.filter(pk=self.conversation_id).update(**values)
+        invalidate_sidebar(self.conversation.user_id)
+
+
+def refresh_message_fields(conversation_id):
+    """按剩余消息重新计算对话的消息数量和最后一条消息（标题不变）"""
+    messages = ChatMessage.objects.filter(conversation_id=conversation_id)
+    last = messages.order_by('-created_at', '-id').only('role', 'content', 'created_at').first()
+    ChatConversation.objects.filter(pk=conversation_id).update(
+        message_count=messages.count(),
+        last_message_preview=message_preview(last.content) if last else '',
+        last_message_role=last.role if last else '',
+        last_message_at=last.created_at if last else None,
+        updated_at=timezone.now(),
+    )
+
+
+def message_deleted(sender, instance, origin=None, **kwargs):
+    """
+    post_delete：单独删除消息（管理后台、queryset.delete()）时重新计算对话的计数字段。
+    删除对话或用户级联删除消息时对话本身也会被删除，跳过。
+    """
+    origin_model = getattr(origin, 'model', type(origin))
+    if origin_model is not ChatMessage:
+        return
+    refresh_message_fields(instance.conversation_id)
+    user_id = ChatConversation.objects.filter(pk=instance.conversation_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        invalidate_sidebar(user_id)
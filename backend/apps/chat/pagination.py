@@ -0,0 +1,101 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class MessageWindowPagination(BasePagination):
+    """
+    对话消息的游标分页，按 (created_at, id) 定位（配合 (conversation, created_at) 索引）
+
+    - 不带游标：最近的 limit 条消息；
+    - before=游标：早于游标的 limit 条消息（向上滚动加载更早的历史）；
+    - after=游标：晚于游标的 limit 条消息。
+    results 始终按时间正序返回；previous 为继续加载更早消息的游标，
+    next 为继续加载更新消息的游标，没有更多时为 null。
+    """
+    before_query_param = 'before'
+    after_query_param = 'after'
+    limit_query_param = 'limit'
+    default_limit = 50
+    max_limit = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        limit = self.get_limit(request)
+        before = self.decode_cursor(request, self.before_query_param)
+        after = self.decode_cursor(request, self.after_query_param)
+
+        if after is not None:
+            created_at, pk = after
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            ).order_by('created_at', 'id')
+            results = list(queryset[:limit + 1])
+            self.has_newer = len(results) > limit
+            self.has_older = True
+            self.page = results[:limit]
+            return self.page
+
+        if before is not None:
+            created_at, pk = before
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+        # 倒序取最近的一段，多取一条判断是否还有更早的消息
+        results = list(queryset.order_by('-created_at', '-id')[:limit + 1])
+        self.has_older = len(results) > limit
+        self.has_newer = before is not None
+        self.page = results[:limit][::-1]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('previous', self.encode_cursor(self.page[0]) if self.page and self.has_older else None),
+            ('next', self.encode_cursor(self.page[-1]) if self.page and self.has_newer else None),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'previous': {'type': 'string', 'nullable': True},
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+            if limit > 0:
+                return min(limit, self.max_limit)
+        except (KeyError, ValueError):
+            pass
+        return self.default_limit
+
+    def encode_cursor(self, message):
+        payload = [message.created_at.isoformat(), message.id]
+        return base64.urlsafe_b64encode(json.dumps(payload).encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request, param):
+        encoded = request.query_params.get(param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError
+            return created_at, int(pk)
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound('无效的分页游标')
+
+    def to_html(self):
+        return ''
@@ -8,31 +8,31 @@ class ChatMessageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 class ChatConversationSerializer(serializers.ModelSerializer):
-    """聊天对话序列化器"""
-    messages = ChatMessageSerializer(many=True, read_only=True)
-    message_count = serializers.SerializerMethodField()
+    """聊天对话序列化器（不含消息，消息通过 messages 接口分页获取）"""
     last_message_time = serializers.SerializerMethodField()
     
     class Meta:
         model = ChatConversation
         fields = [
             'id', 'title', 'created_at', 'updated_at', 
-            'messages', 'message_count', 'last_message_time'
+            'message_count', 'last_message_time'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
-    
-    def get_message_count(self, obj):
-        return obj.messages.count()
+        read_only_fields = ['id', 'created_at', 'updated_at', 'message_count']
     
     def get_last_message_time(self, obj):
-        last_message = obj.messages.last()
-        return last_message.created_at if last_message else obj.created_at
+        return obj.last_message_at or obj.created_at
+
+class ChatConversationWithMessagesSerializer(ChatConversationSerializer):
+    """聊天对话序列化器（内嵌全部消息，仅在 include_messages=true 时使用）"""
+    messages = ChatMessageSerializer(many=True, read_only=True)
+    
+    class Meta(ChatConversationSerializer.Meta):
+        fields = ChatConversationSerializer.Meta.fields + ['messages']
 
 class ChatConversationListSerializer(serializers.ModelSerializer):
-    """聊天对话列表序列化器（简化版）"""
-    message_count = serializers.SerializerMethodField()
+    """聊天对话列表序列化器（简化版），只读取对话表上的冗余字段"""
     last_message = serializers.SerializerMethodField()
-    display_title = serializers.SerializerMethodField()
+    display_title = serializers.CharField(source='title', read_only=True)
     
     class Meta:
         model = ChatConversation
@@ -41,20 +41,11 @@ class ChatConversationListSerializer(serializers.ModelSerializer):
             'updated_at', 'message_count', 'last_message'
         ]
     
-    def get_message_count(self, obj):
-        return obj.messages.count()
-    
     def get_last_message(self, obj):
-        last_message = obj.messages.last()
-        if last_message:
+        if obj.message_count:
             return {
-                'content': last_message.content[:100] + ('...' if len(last_message.content) > 100 else ''),
-                'role': last_message.role,
-                'created_at': last_message.created_at
+                'content': obj.last_message_preview,
+                'role': obj.last_message_role,
+                'created_at': obj.last_message_at
             }
-        return None
-    
-    def get_display_title(self, obj):
-        if obj.title == '新对话':
-            return obj.get_first_user_message()
-        return obj.title
\ No newline at end of file
+        return None
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+SSE 流式输出工具
+
+上游模型的增量文本往往很碎（几个字一块），逐块发送会放大每个事件的开销；
+coalesce 把增量合并后再发送：缓冲达到 FLUSH_CHARS 个字符，或距上次发送超过
+FLUSH_INTERVAL 秒即发送一帧，结束时发送剩余内容。
+
+异步版本 acoalesce 在等待下一块时带超时，上游停顿时缓冲的文本最多延迟 FLUSH_INTERVAL 秒发出。
+同步版本 coalesce 只能在下一块到达时检查间隔：上游停顿期间已缓冲的文本（不足 FLUSH_CHARS）
+会一直等到下一块或流结束才发出，最坏延迟为上游的停顿时长。同步路径用于 WSGI 下的
+send_message 接口；需要严格的延迟上限时使用异步接口 send_message_async（SERVER_ROLE=stream）。
+"""
+import asyncio
+import json
+import time
+from contextlib import suppress
+
+from django.conf import settings
+
+DEFAULT_FLUSH_CHARS = 48
+DEFAULT_FLUSH_INTERVAL = 0.05
+
+
+def sse_event(payload):
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def _flush_settings(flush_chars, flush_interval):
+    if flush_chars is None:
+        flush_chars = getattr(settings, 'CHAT_STREAM_FLUSH_CHARS', DEFAULT_FLUSH_CHARS)
+    if flush_interval is None:
+        flush_interval = getattr(settings, 'CHAT_STREAM_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+    return flush_chars, flush_interval
+
+
+def coalesce(deltas, flush_chars=None, flush_interval=None):
+    """合并文本增量，返回待发送的文本帧（间隔只在下一块到达时检查，见模块说明）"""
+    flush_chars, flush_interval = _flush_settings(flush_chars, flush_interval)
+
+    buffer = []
+    buffered_chars = 0
+    last_flush = time.monotonic()
+    for delta in deltas:
+        buffer.append(delta)
+        buffered_chars += len(delta)
+        now = time.monotonic()
+        if buffered_chars >= flush_chars or now - last_flush >= flush_interval:
+            yield ''.join(buffer)
+            buffer = []
+            buffered_chars = 0
+            last_flush = now
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def acoalesce(deltas, flush_chars=None, flush_interval=None):
+    """
+    coalesce 的异步版本，deltas 为异步迭代器。
+
+    下一块用单独的任务等待，用 asyncio.wait 而不是 wait_for 加超时：超时只发送缓冲，
+    不会取消正在读取上游的任务，上游的下一块不会丢失。
+    调用方提前结束时应 aclose() 本生成器，再关闭 deltas（读取任务在这里取消并等待结束）。
+    """
+    flush_chars, flush_interval = _flush_settings(flush_chars, flush_interval)
+
+    iterator = deltas.__aiter__()
+    buffer = []
+    buffered_chars = 0
+    last_flush = time.monotonic()
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = None
+            if buffer:
+                timeout = max(last_flush + flush_interval - time.monotonic(), 0)
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                # 上游停顿，到时间先把缓冲发出去
+                yield ''.join(buffer)
+                buffer = []
+                buffered_chars = 0
+                last_flush = time.monotonic()
+                continue
+
+            task, pending = pending, None
+            try:
+                delta = task.result()
+            except StopAsyncIteration:
+                break
+            buffer.append(delta)
+            buffered_chars += len(delta)
+            now = time.monotonic()
+            if buffered_chars >= flush_chars or now - last_flush >= flush_interval:
+                yield ''.join(buffer)
+                buffer = []
+                buffered_chars = 0
+                last_flush = now
+        if buffer:
+            yield ''.join(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+            with suppress(asyncio.CancelledError, StopAsyncIteration):
+                await pending
@@ -0,0 +1,347 @@
+import asyncio
+import importlib
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend.apps.llm.providers import reset_provider
+
+from .context import ConversationContextBuilder
+from .models import ChatConversation, ChatMessage
+from .pagination import MessageWindowPagination
+from .streaming import acoalesce, coalesce
+
+User = get_user_model()
+
+
+class ChatConditionalGetTests(APITestCase):
+    """对话列表、消息的 ETag → 304"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.client.force_authenticate(self.user)
+        self.conversation = ChatConversation.objects.create(user=self.user)
+
+    def assertRevalidates(self, url, change):
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        change()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_sidebar_changes_after_new_message(self):
+        self.assertRevalidates(
+            '/api/chat/',
+            lambda: ChatMessage.objects.create(conversation=self.conversation, role='user', content='hi'),
+        )
+
+    def test_sidebar_changes_after_delete(self):
+        ChatConversation.objects.create(user=self.user)
+        self.assertRevalidates('/api/chat/', self.conversation.delete)
+
+    def test_messages_change_after_new_message(self):
+        self.assertRevalidates(
+            f'/api/chat/{self.conversation.pk}/messages/',
+            lambda: ChatMessage.objects.create(conversation=self.conversation, role='user', content='hi'),
+        )
+
+
+async def stalled_deltas(closed):
+    """先给两小块，然后长时间停顿，再给最后一块"""
+    try:
+        yield 'a'
+        yield 'b'
+        await asyncio.sleep(0.5)
+        yield 'c'
+    finally:
+        closed.append(True)
+
+
+class CoalesceTests(SimpleTestCase):
+    """增量合并：按字符数、按时间间隔发送"""
+
+    def test_flush_by_chars(self):
+        self.assertEqual(
+            list(coalesce(['ab', 'cd', 'e'], flush_chars=4, flush_interval=60)),
+            ['abcd', 'e'],
+        )
+
+    def test_async_flushes_buffer_while_upstream_stalls(self):
+        async def run():
+            closed = []
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            frames = []
+            async for frame in acoalesce(stalled_deltas(closed), flush_chars=100, flush_interval=0.05):
+                frames.append((frame, loop.time() - started))
+            return frames, closed
+
+        frames, closed = asyncio.run(run())
+        self.assertEqual([frame for frame, _ in frames], ['ab', 'c'])
+        # 停顿期间按间隔发出，而不是等到下一块到达
+        self.assertLess(frames[0][1], 0.3)
+        self.assertEqual(closed, [True])
+
+    def test_async_close_cancels_pending_read(self):
+        async def run():
+            closed = []
+            deltas = stalled_deltas(closed)
+            frames = acoalesce(deltas, flush_chars=100, flush_interval=0.05)
+            first = await frames.__anext__()
+            # 读取任务还在等待上游，先关闭 frames 再关闭上游不会报 "already running"
+            await frames.aclose()
+            await deltas.aclose()
+            return first, closed
+
+        first, closed = asyncio.run(run())
+        self.assertEqual(first, 'ab')
+        self.assertEqual(closed, [True])
+
+
+class ConversationMessageFieldsTests(TestCase):
+    """对话上的消息数量、最后一条消息与首条消息标题"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.conversation = ChatConversation.objects.create(user=self.user)
+
+    def add(self, role, content):
+        return ChatMessage.objects.create(conversation=self.conversation, role=role, content=content)
+
+    def test_fields_follow_new_messages(self):
+        self.add('user', '第一个问题' * 20)
+        reply = self.add('assistant', '回答')
+        self.add('user', '第二个问题')
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.message_count, 3)
+        self.assertEqual(self.conversation.last_message_preview, '第二个问题')
+        self.assertEqual(self.conversation.last_message_role, 'user')
+        # 标题只由第一条用户消息生成，截断到 TITLE_LENGTH
+        self.assertEqual(self.conversation.title, ('第一个问题' * 20)[:50] + '...')
+        self.assertGreater(self.conversation.last_message_at, reply.created_at)
+
+    def test_custom_title_kept(self):
+        ChatConversation.objects.filter(pk=self.conversation.pk).update(title='自定义')
+        self.add('user', 'hello')
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.title, '自定义')
+
+    def test_failed_counter_update_rolls_back_message(self):
+        with mock.patch.object(QuerySet, 'update', side_effect=DatabaseError('boom')):
+            with self.assertRaises(DatabaseError):
+                self.add('user', 'hello')
+        self.assertFalse(ChatMessage.objects.exists())
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.message_count, 0)
+
+    def test_delete_recomputes_fields(self):
+        self.add('user', 'question')
+        answer = self.add('assistant', 'answer')
+        answer.delete()
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.message_count, 1)
+        self.assertEqual(self.conversation.last_message_preview, 'question')
+        self.assertEqual(self.conversation.last_message_role, 'user')
+
+        ChatMessage.objects.filter(conversation=self.conversation).delete()
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.message_count, 0)
+        self.assertEqual(self.conversation.last_message_preview, '')
+        self.assertIsNone(self.conversation.last_message_at)
+
+    def test_conversation_delete_skips_recompute(self):
+        for i in range(5):
+            self.add('user', f'message {i}')
+        with mock.patch('backend.apps.chat.models.refresh_message_fields') as refresh:
+            self.conversation.delete()
+        refresh.assert_not_called()
+        self.assertFalse(ChatMessage.objects.exists())
+
+    def test_migration_backfill(self):
+        self.add('assistant', 'welcome')
+        self.add('user', 'first question')
+        self.add('assistant', 'latest answer')
+        ChatConversation.objects.filter(pk=self.conversation.pk).update(
+            title='新对话', message_count=0, last_message_preview='', last_message_role='', last_message_at=None
+        )
+        migration = importlib.import_module('backend.apps.chat.migrations.0005_conversation_last_message')
+        migration.backfill_last_message(apps, None)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.message_count, 3)
+        self.assertEqual(self.conversation.title, 'first question')
+        self.assertEqual(self.conversation.last_message_preview, 'latest answer')
+        self.assertEqual(self.conversation.last_message_role, 'assistant')
+
+
+@override_settings(CHAT_CONTEXT={'RECENT_TURNS': 1, 'MAX_RECENT_CHARS': 1000, 'MAX_SUMMARY_CHARS': 60, 'DIGEST_CHARS': 10})
+class ConversationContextBuilderTests(TestCase):
+    """上下文：早期消息折叠为摘要，最近窗口增量读取"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.conversation = ChatConversation.objects.create(user=self.user)
+
+    def add_turn(self, question, answer):
+        ChatMessage.objects.create(conversation=self.conversation, role='user', content=question)
+        return ChatMessage.objects.create(conversation=self.conversation, role='assistant', content=answer)
+
+    def build(self, message='next'):
+        return ConversationContextBuilder(self.conversation).build('SYSTEM', message)
+
+    def test_old_turns_folded_into_summary(self):
+        self.add_turn('first question', 'first answer is rather long')
+        folded_until = self.add_turn('q2', 'a2')
+        self.add_turn('q3', 'a3')
+        content = self.build()
+
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.context_summarized_until, folded_until.id)
+        # 每条折叠消息只保留 DIGEST_CHARS 个字符
+        self.assertIn('- 助手: first answ...', self.conversation.context_summary)
+        self.assertIn('【早期对话摘要】', content)
+        self.assertNotIn('first answer is rather long', content)
+        self.assertTrue(content.endswith('用户: q3\n助手: a3\n用户: next\n助手: '))
+
+    def test_summary_keeps_latest_lines_within_limit(self):
+        for i in range(6):
+            self.add_turn(f'question {i}', f'answer {i}')
+        self.build()
+        self.conversation.refresh_from_db()
+        summary = self.conversation.context_summary
+        self.assertLessEqual(len(summary), 60)
+        self.assertTrue(summary.endswith('- 助手: answer 4'))
+        self.assertNotIn('question 0', summary)
+
+    def test_window_cached_between_turns(self):
+        self.add_turn('q1', 'a1')
+        self.build()
+        # 没有新消息需要折叠时只查询一次新增消息
+        with self.assertNumQueries(1):
+            content = self.build()
+        self.assertIn('用户: q1\n助手: a1\n', content)
+
+    def test_rebuild_after_cache_loss_skips_folded_history(self):
+        self.add_turn('old question', 'old answer')
+        self.add_turn('q2', 'a2')
+        self.build()
+        cache.clear()
+        conversation = ChatConversation.objects.get(pk=self.conversation.pk)
+        content = ConversationContextBuilder(conversation).build('SYSTEM', 'next')
+        self.assertNotIn('用户: old question', content)
+        self.assertIn('用户: q2\n助手: a2\n', content)
+
+    def test_current_message_excluded_from_history(self):
+        self.add_turn('q1', 'a1')
+        current = ChatMessage.objects.create(conversation=self.conversation, role='user', content='now')
+        content = ConversationContextBuilder(self.conversation).build('SYSTEM', 'now', exclude_message_id=current.id)
+        self.assertEqual(content.count('用户: now'), 1)
+
+
+class MessageWindowPaginationTests(APITestCase):
+    """消息分页：before/after 游标与 limit 限制"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.client.force_authenticate(self.user)
+        self.conversation = ChatConversation.objects.create(user=self.user)
+        for i in range(3):
+            ChatMessage.objects.create(conversation=self.conversation, role='user', content=f'm{i}')
+        # 后4条消息的 created_at 相同，按 id 区分先后
+        same_time = timezone.now()
+        for i in range(3, 7):
+            ChatMessage.objects.create(
+                conversation=self.conversation, role='user', content=f'm{i}', created_at=same_time
+            )
+        self.url = f'/api/chat/{self.conversation.pk}/messages/'
+
+    def page(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def contents(self, data):
+        return [message['content'] for message in data['results']]
+
+    def test_latest_then_before_then_after(self):
+        latest = self.page(limit=3)
+        self.assertEqual(self.contents(latest), ['m4', 'm5', 'm6'])
+        self.assertIsNone(latest['next'])
+
+        older = self.page(limit=3, before=latest['previous'])
+        self.assertEqual(self.contents(older), ['m1', 'm2', 'm3'])
+        self.assertIsNotNone(older['next'])
+
+        oldest = self.page(limit=3, before=older['previous'])
+        self.assertEqual(self.contents(oldest), ['m0'])
+        self.assertIsNone(oldest['previous'])
+
+        newer = self.page(limit=2, after=older['next'])
+        self.assertEqual(self.contents(newer), ['m4', 'm5'])
+        self.assertIsNotNone(newer['next'])
+        self.assertEqual(self.contents(self.page(limit=2, after=newer['next'])), ['m6'])
+
+    def test_after_returns_messages_added_later(self):
+        cursor = self.page(limit=3, before=self.page(limit=3)['previous'])['next']
+        ChatMessage.objects.create(conversation=self.conversation, role='assistant', content='m7')
+        data = self.page(after=cursor)
+        self.assertEqual(self.contents(data), ['m4', 'm5', 'm6', 'm7'])
+        self.assertIsNone(data['next'])
+
+    def test_limit_clamped(self):
+        with mock.patch.object(MessageWindowPagination, 'max_limit', 4), \
+                mock.patch.object(MessageWindowPagination, 'default_limit', 2):
+            self.assertEqual(len(self.page(limit=100)['results']), 4)
+            self.assertEqual(len(self.page(limit=0)['results']), 2)
+            self.assertEqual(len(self.page(limit='abc')['results']), 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'after': 'bm90LWpzb24='})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(CORS_ALLOWED_ORIGINS=['http://app.example.com'], LLM_PROVIDER='fake', LLM_FAKE_DELAY=0)
+class SendMessageAsyncTests(TestCase):
+    """异步流式接口：SSE 输出与 CORS 响应头"""
+
+    def setUp(self):
+        reset_provider()
+        self.addCleanup(reset_provider)
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.conversation = ChatConversation.objects.create(user=self.user)
+        self.url = f'/api/chat/{self.conversation.pk}/send_message_async/'
+        self.auth = f'Bearer {RefreshToken.for_user(self.user).access_token}'
+
+    def post(self, origin):
+        return self.client.post(
+            self.url, {'message': 'hello'}, content_type='application/json',
+            HTTP_AUTHORIZATION=self.auth, HTTP_ORIGIN=origin,
+        )
+
+    def test_cors_header_set_by_middleware(self):
+        response = self.post('http://app.example.com')
+        self.assertEqual(response['Access-Control-Allow-Origin'], 'http://app.example.com')
+
+    def test_unknown_origin_gets_no_cors_header(self):
+        response = self.post('http://evil.example.com')
+        self.assertNotIn('Access-Control-Allow-Origin', response)
+
+    def test_streams_reply_and_saves_it(self):
+        response = self.post('http://app.example.com')
+        body = b''.join(async_to_sync(self.collect)(response)).decode()
+        self.assertIn('"type": "done"', body)
+        reply = ChatMessage.objects.get(conversation=self.conversation, role='assistant')
+        self.assertIn('hello', reply.content)
+
+    async def collect(self, response):
+        return [chunk async for chunk in response.streaming_content]
@@ -1,18 +1,26 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
-from django.http import StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from django.conf import settings
 import json
-import os
-# 修正导入：使用正确的Google GenAI SDK导入方式
-import google.genai as genai
-from .models import ChatConversation, ChatMessage
+from backend.apps.llm.providers import get_provider
+from backend.apps.users.authentication import CachedJWTAuthentication
+from backend.conditional import make_etag, not_modified, set_validators
+from .cache import get_sidebar, set_sidebar, sidebar_cache_key
+from .models import DEFAULT_TITLE, ChatConversation, ChatMessage
+from .context import ConversationContextBuilder
+from .streaming import acoalesce, coalesce, sse_event
+from .prompts import build_system_prompt
+from .pagination import MessageWindowPagination
 from .serializers import (
     ChatConversationSerializer, 
     ChatConversationListSerializer,
+    ChatConversationWithMessagesSerializer,
     ChatMessageSerializer
 )
 
@@ -28,12 +36,35 @@ class ChatViewSet(viewsets.ModelViewSet):
         """根据动作选择序列化器"""
         if self.action == 'list':
             return ChatConversationListSerializer
+        if self.action == 'retrieve' and self.request.query_params.get('include_messages', '').lower() in ['true', '1', 'yes']:
+            return ChatConversationWithMessagesSerializer
         return ChatConversationSerializer
     
     def perform_create(self, serializer):
         """创建对话时自动设置用户"""
         serializer.save(user=self.request.user)
     
+    def list(self, request, *args, **kwargs):
+        """
+        对话列表（侧边栏），按用户缓存，新增消息或对话变更时失效；
+        ETag 取用户对话的数量和最新更新时间（新增消息会更新对话的 updated_at，
+        一条聚合查询走 (user, -updated_at) 索引），未变化时返回 304
+        """
+        state = self.get_queryset().aggregate(count=Count('id'), last_updated=Max('updated_at'))
+        etag = make_etag(
+            request.user.pk, request.get_full_path(),
+            state['count'], state['last_updated'] and state['last_updated'].isoformat(),
+        )
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        key = sidebar_cache_key(request.user.pk, request.get_full_path())
+        data = get_sidebar(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            set_sidebar(key, data)
+        return set_validators(Response(data), etag)
+    
     @action(detail=True, methods=['post'])
     def send_message(self, request, pk=None):
         """发送消息并获取AI回复"""
@@ -48,7 +79,7 @@ class ChatViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # 保存用户消息
+        # 保存用户消息（第一条消息同时生成对话标题）
         user_msg = ChatMessage.objects.create(
             conversation=conversation,
             role='user',
@@ -57,180 +88,52 @@ class ChatViewSet(viewsets.ModelViewSet):
             referenced_todos=referenced_todos
         )
         
-        # 更新对话标题（如果是第一条消息）
-        if conversation.title == '新对话' and conversation.messages.count() == 1:
-            conversation.title = user_message[:50] + ('...' if len(user_message) > 50 else '')
-            conversation.save()
-        
         # 调用Gemini API
         try:
-            # 创建Gemini客户端（按照测试成功的方式）
-            client = genai.Client(api_key=settings.GEMINI_API_KEY)
-            
-            # 根据人格选择系统提示词
-            system_prompts = {
-                'DefaultAssistant': """
-                您是一个高效、专业的AI助理。
-                
-                🤖 **核心特质**
-                - 直接、简洁、高效
-                - 逻辑清晰、条理分明
-                - 专注任务执行和问题解决
-                - 提供精准、可操作的建议
-                
-                ⚡ **工作风格**
-                - 快速响应，直击要点
-                - 结构化输出，便于理解
-                - 数据驱动的分析和建议
-                - 持续优化工作流程
-                
-                🎯 **服务目标**
-                - 最大化用户工作效率
-                - 提供准确、实用的信息
-                - 协助完成各类任务
-                - 持续学习和改进
-                
-                请以简洁、专业的方式回复用户。
-                """,
-                
-                'LifeAssistant': """
-                你好呀～我是你的贴心生活助理，就像知心姐姐一样陪伴在你身边💕
-                
-                🌸 **我的特质**
-                - 温暖、体贴、善解人意
-                - 耐心倾听，用心回应
-                - 关注你的情感需求和生活细节
-                - 像朋友一样给你支持和鼓励
-                
-                💝 **我的使命**
-                - 让你的生活更美好、更温馨
-                - 在你需要时给予温暖的陪伴
-                - 帮你处理生活中的大小事务
-                - 分享生活的智慧和小贴士
-                
-                🌈 **我会这样帮助你**
-                - 用温柔的语气和你交流
-                - 关心你的感受和需求
-                - 提供贴心的生活建议
-                - 在你困难时给予鼓励和支持
-                
-                有什么需要帮助的吗？我会用心为你服务的～
-                """,
-                
-                'MilitaryAssistant': """
-                报告！我是您的军事助理，随时准备执行任务！
-                
-                🎖️ **核心品质**
-                - 纪律严明、执行力强
-                - 逻辑清晰、决策果断
-                - 注重效率和结果导向
-                - 严谨细致、responsibility
-                
-                ⚔️ **作战风格**
-                - 快速分析情况，制定行动方案
-                - 优先级明确，重点突出
-                - 简洁有力的沟通方式
-                - 持续监控进展，及时调整策略
-                
-                🛡️ **服务承诺**
-                - 绝对服从命令，完成任务
-                - 提供专业、可靠的建议
-                - 保持高度警觉和责任感
-                - 以最高标准要求自己
-                
-                请下达指令，我将立即执行！
-                """,
-                
-                'DevelopmentAssistant': """
-                您好，我是您的发展助理，致力于为您提供深度的思考和战略指导。
-                
-                🧠 **思维特质**
-                - 深度思考、系统分析
-                - 长远视角、战略思维
-                - 批判性思维、多角度分析
-                - 持续学习、知识整合
-                
-                📚 **专业能力**
-                - 复杂问题的结构化分析
-                - 趋势预测和机会识别
-                - 知识体系构建和优化
-                - 创新思维和解决方案设计
-                
-                🎯 **服务理念**
-                - 授人以渔，提升您的思考能力
-                - 提供深度洞察和战略建议
-                - 帮助您建立系统性的知识框架
-                - 促进持续成长和能力提升
-                
-                让我们一起探索知识的深度，开启智慧的旅程。
-                """
-            }
+            provider = get_provider()
             
-            system_prompt = system_prompts.get(persona, system_prompts['DefaultAssistant'])
+            system_prompt = build_system_prompt(persona, referenced_todos)
             
-            # 如果有引用的todos，添加到系统提示词中
-            if referenced_todos:
-                todo_context = "\n\n📋 **用户引用的Todo信息：**\n"
-                for todo in referenced_todos:
-                    todo_type_map = {
-                        'record': '📝 记录',
-                        'requirement': '📋 需求', 
-                        'task': '✅ 任务',
-                        'bug': '🐛 故障'
-                    }
-                    todo_type_display = todo_type_map.get(todo.get('type', ''), '📝')
-                    priority_display = '🔴 高' if todo.get('priority') == 'high' else '🟡 中' if todo.get('priority') == 'medium' else '🟢 低'
-                    
-                    todo_context += f"\n{todo_type_display} **{todo.get('title', '')}** ({priority_display})\n"
-                    if todo.get('description'):
-                        todo_context += f"描述：{todo.get('description')}\n"
-                
-                todo_context += "\n请在回复中适当参考这些Todo信息，为用户提供更有针对性的建议。"
-                system_prompt += todo_context
-            
-            # 构建对话历史内容
-            conversation_content = system_prompt + "\n\n"
-            
-            # 添加对话历史
-            for msg in conversation.messages.all():
-                if msg.role == "user":
-                    conversation_content += f"用户: {msg.content}\n"
-                elif msg.role == "assistant":
-                    conversation_content += f"助手: {msg.content}\n"
-            
-            # 添加当前用户消息
-            conversation_content += f"用户: {user_message}\n助手: "
+            # 构建对话上下文：早期摘要 + 最近若干轮原文 + 当前用户消息
+            conversation_content = ConversationContextBuilder(conversation).build(
+                system_prompt, user_message, exclude_message_id=user_msg.id
+            )
             
-            # 流式响应
+            # 流式响应：转发模型的增量输出，合并成帧后发送
             def generate_response():
+                deltas = provider.stream(conversation_content)
+                parts = []
+                finished = False
                 try:
-                    # 使用测试成功的API调用方式
-                    response = client.models.generate_content(
-                        model="gemini-2.5-pro",
-                        contents=conversation_content
-                    )
-                    
-                    # 获取完整响应
-                    full_response = response.text
-                    
-                    # 模拟流式输出（分块发送）
-                    chunk_size = 10  # 每次发送的字符数
-                    for i in range(0, len(full_response), chunk_size):
-                        chunk = full_response[i:i+chunk_size]
-                        yield f"data: {json.dumps({'content': chunk, 'type': 'chunk'})}\n\n"
+                    for frame in coalesce(deltas):
+                        parts.append(frame)
+                        yield sse_event({'content': frame, 'type': 'chunk'})
+                    finished = True
                     
                     # 保存AI回复
                     ai_msg = ChatMessage.objects.create(
                         conversation=conversation,
                         role='assistant',
-                        content=full_response,
+                        content=''.join(parts),
                         persona=persona
                     )
                     
-                    yield f"data: {json.dumps({'type': 'done', 'message_id': ai_msg.id})}\n\n"
+                    yield sse_event({'type': 'done', 'message_id': ai_msg.id})
                     
                 except Exception as e:
-                    yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+                    finished = True
+                    yield sse_event({'type': 'error', 'error': str(e)})
+                finally:
+                    # 客户端断开时服务器会关闭本生成器（GeneratorExit），同时取消上游调用
+                    deltas.close()
+                    if not finished and parts:
+                        # 保留客户端已经收到的部分回复
+                        ChatMessage.objects.create(
+                            conversation=conversation,
+                            role='assistant',
+                            content=''.join(parts),
+                            persona=persona
+                        )
             
             response = StreamingHttpResponse(
                 generate_response(),
@@ -249,18 +152,145 @@ class ChatViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def messages(self, request, pk=None):
-        """获取对话的所有消息"""
+        """
+        分页获取对话消息，支持 before/after 游标和 limit（默认返回最近的消息）；
+        对话的消息数量和最后一条消息时间未变化时返回 304（新增、删除消息都会改变二者）
+        """
         conversation = self.get_object()
-        messages = conversation.messages.all()
-        serializer = ChatMessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        etag = make_etag(
+            conversation.pk, conversation.message_count,
+            conversation.last_message_at and conversation.last_message_at.isoformat(),
+            request.get_full_path(),
+        )
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        paginator = MessageWindowPagination()
+        page = paginator.paginate_queryset(
+            ChatMessage.objects.filter(conversation=conversation), request, view=self
+        )
+        serializer = ChatMessageSerializer(page, many=True)
+        return set_validators(paginator.get_paginated_response(serializer.data), etag)
     
     @action(detail=False, methods=['post'])
     def create_conversation(self, request):
         """创建新对话"""
         conversation = ChatConversation.objects.create(
             user=request.user,
-            title='新对话'
+            title=DEFAULT_TITLE
         )
         serializer = self.get_serializer(conversation)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+async def send_message_async(request, pk):
+    """
+    发送消息并获取AI回复（异步版本）
+    
+    与 ChatViewSet.send_message 行为一致，需在 ASGI 服务器下运行：
+    等待模型输出期间不占用工作线程，单进程即可承载大量并发的流式对话。
+    DRF 视图不支持 async，这里直接使用 CachedJWTAuthentication 完成认证。
+    
+    客户端断开：Django 4.2 的 ASGIHandler 在流式输出期间不监听 http.disconnect，
+    生成器会一直运行到模型输出结束（回复照常保存），上游调用不会提前取消；
+    Django >= 5.0 才会在断开时取消生成器，下面 finally 中的提前关闭才生效。
+    同步版本（WSGI）在下一次写入失败时关闭生成器，可以提前取消。
+    CORS 响应头由 corsheaders 中间件按 CORS_ALLOWED_ORIGINS 设置。
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': '仅支持POST请求'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+    
+    try:
+        auth = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as e:
+        return JsonResponse({'detail': str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    if auth is None:
+        return JsonResponse({'detail': '身份认证信息未提供。'}, status=status.HTTP_401_UNAUTHORIZED)
+    user = auth[0]
+    
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'error': '请求体不是有效的JSON'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    conversation = await ChatConversation.objects.filter(user=user, pk=pk).afirst()
+    if conversation is None:
+        return JsonResponse({'detail': '未找到。'}, status=status.HTTP_404_NOT_FOUND)
+    
+    user_message = str(data.get('message', '')).strip()
+    persona = data.get('persona', 'DefaultAssistant')
+    referenced_todos = data.get('referenced_todos', [])
+    
+    if not user_message:
+        return JsonResponse({'error': '消息内容不能为空'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # 保存用户消息（第一条消息同时生成对话标题）
+    user_msg = await ChatMessage.objects.acreate(
+        conversation=conversation,
+        role='user',
+        content=user_message,
+        persona=persona,
+        referenced_todos=referenced_todos
+    )
+    
+    try:
+        provider = get_provider()
+        system_prompt = build_system_prompt(persona, referenced_todos)
+        conversation_content = await sync_to_async(ConversationContextBuilder(conversation).build)(
+            system_prompt, user_message, exclude_message_id=user_msg.id
+        )
+    except Exception as e:
+        return JsonResponse(
+            {'error': f'AI服务调用失败: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    async def generate_response():
+        deltas = provider.astream(conversation_content)
+        frames = acoalesce(deltas)
+        parts = []
+        finished = False
+        try:
+            async for frame in frames:
+                parts.append(frame)
+                yield sse_event({'content': frame, 'type': 'chunk'})
+            finished = True
+            
+            # 保存AI回复
+            ai_msg = await ChatMessage.objects.acreate(
+                conversation=conversation,
+                role='assistant',
+                content=''.join(parts),
+                persona=persona
+            )
+            
+            yield sse_event({'type': 'done', 'message_id': ai_msg.id})
+            
+        except Exception as e:
+            finished = True
+            yield sse_event({'type': 'error', 'error': str(e)})
+        finally:
+            # 任务被取消时（Django >= 5.0 下客户端断开）同时关闭上游流；
+            # 先关闭 frames，等待其中读取上游的任务结束
+            await frames.aclose()
+            await deltas.aclose()
+            if not finished and parts:
+                # 保留客户端已经收到的部分回复
+                await ChatMessage.objects.acreate(
+                    conversation=conversation,
+                    role='assistant',
+                    content=''.join(parts),
+                    persona=persona
+                )
+    
+    response = StreamingHttpResponse(
+        generate_response(),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# 使用JWT认证，不需要CSRF校验（csrf_exempt装饰器在Django 4.2下不支持async视图）
+send_message_async.csrf_exempt = True
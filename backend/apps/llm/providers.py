@@ -0,0 +1,215 @@
+"""
+大模型调用封装
+
+- GeminiProvider：Google GenAI SDK
+- FakeProvider：本地确定性实现，用于测试和压测，不访问网络
+
+通过 settings.LLM_PROVIDER（'gemini' / 'fake'）选择，模型与超时由 LLM_MODEL、
+LLM_TIMEOUT 配置。get_provider() 返回进程内共享的实例：底层 HTTP 客户端只创建一次，
+连接池和 keep-alive 连接在聊天请求、每日回顾任务之间复用，省去每次调用的 TLS 握手。
+
+每个实现提供 generate()、stream()、供 ASGI 视图使用的 astream()，以及 batch()。
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+DEFAULT_MODEL = "gemini-2.5-pro"
+DEFAULT_TIMEOUT = 120
+DEFAULT_MAX_CONNECTIONS = 20
+
+
+class LLMProvider:
+    """大模型调用接口"""
+
+    def __init__(self, model=None):
+        self.model = model or getattr(settings, 'LLM_MODEL', DEFAULT_MODEL)
+
+    def generate(self, contents, model=None):
+        """一次性生成，返回完整文本"""
+        return self.generate_with_usage(contents, model)[0]
+
+    def generate_with_usage(self, contents, model=None):
+        """
+        一次性生成，返回 (文本, 用量)；
+        用量为 {'prompt_tokens', 'completion_tokens', 'total_tokens'}，服务商未返回的项为 None。
+        """
+        raise NotImplementedError
+
+    def stream(self, contents, model=None):
+        """流式生成，返回文本增量的生成器；调用方 close() 时应关闭上游连接"""
+        raise NotImplementedError
+
+    async def astream(self, contents, model=None):
+        """stream 的异步版本"""
+        raise NotImplementedError
+
+    def is_transient(self, error):
+        """错误是否为可重试的临时性错误（限流、服务端错误、网络超时等）"""
+        return False
+
+    def batch(self, prompts, max_workers=4):
+        """
+        并发生成多个提示词的结果，按输入顺序返回；
+        单个提示词失败时对应位置为异常对象，不影响其他结果。
+        """
+        def run(prompt):
+            try:
+                return self.generate(prompt)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, prompts))
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini 调用，进程内共享一个客户端"""
+
+    def __init__(self, model=None):
+        super().__init__(model)
+        # 修正导入：使用正确的Google GenAI SDK导入方式
+        import google.genai as genai
+        from google.genai import types
+
+        http_options = {
+            # SDK 超时单位为毫秒
+            'timeout': int(getattr(settings, 'LLM_TIMEOUT', DEFAULT_TIMEOUT) * 1000),
+        }
+        if 'client_args' in types.HttpOptions.model_fields:
+            import httpx
+            max_connections = getattr(settings, 'LLM_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS)
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60,
+            )
+            http_options['client_args'] = {'limits': limits}
+            http_options['async_client_args'] = {'limits': limits}
+
+        self.client = genai.Client(
+            api_key=settings.GEMINI_API_KEY,
+            http_options=types.HttpOptions(**http_options)
+        )
+
+    def is_transient(self, error):
+        from google.genai import errors
+        import httpx
+        if isinstance(error, errors.APIError):
+            return error.code in (408, 429, 500, 502, 503, 504)
+        return isinstance(error, (httpx.TimeoutException, httpx.NetworkError))
+
+    def generate_with_usage(self, contents, model=None):
+        response = self.client.models.generate_content(
+            model=model or self.model,
+            contents=contents
+        )
+        metadata = response.usage_metadata
+        usage = {
+            'prompt_tokens': getattr(metadata, 'prompt_token_count', None),
+            'completion_tokens': getattr(metadata, 'candidates_token_count', None),
+            'total_tokens': getattr(metadata, 'total_token_count', None),
+        }
+        return response.text, usage
+
+    def stream(self, contents, model=None):
+        response_stream = self.client.models.generate_content_stream(
+            model=model or self.model,
+            contents=contents
+        )
+        try:
+            for chunk in response_stream:
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            close = getattr(response_stream, 'close', None)
+            if close:
+                close()
+
+    async def astream(self, contents, model=None):
+        """异步流式生成，等待模型输出时不占用线程"""
+        response_stream = await self.client.aio.models.generate_content_stream(
+            model=model or self.model,
+            contents=contents
+        )
+        try:
+            async for chunk in response_stream:
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            aclose = getattr(response_stream, 'aclose', None)
+            if aclose:
+                await aclose()
+
+
+class FakeProvider(LLMProvider):
+    """确定性的本地实现，按固定块大小和间隔输出回复"""
+
+    def __init__(self, model=None, chunk_size=4, delay=None):
+        super().__init__(model)
+        self.chunk_size = chunk_size
+        self.delay = getattr(settings, 'LLM_FAKE_DELAY', 0) if delay is None else delay
+
+    def reply_for(self, contents):
+        last_line = contents.rstrip().rsplit('\n', 2)[-2] if '\n' in contents.rstrip() else contents
+        return f"[fake] 已收到：{last_line.strip()[:200]}"
+
+    def generate_with_usage(self, contents, model=None):
+        if self.delay:
+            time.sleep(self.delay)
+        text = self.reply_for(contents)
+        # 按字符数估算用量
+        usage = {
+            'prompt_tokens': len(contents),
+            'completion_tokens': len(text),
+            'total_tokens': len(contents) + len(text),
+        }
+        return text, usage
+
+    def stream(self, contents, model=None):
+        text = self.reply_for(contents)
+        for i in range(0, len(text), self.chunk_size):
+            if self.delay:
+                time.sleep(self.delay)
+            yield text[i:i + self.chunk_size]
+
+    async def astream(self, contents, model=None):
+        text = self.reply_for(contents)
+        for i in range(0, len(text), self.chunk_size):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield text[i:i + self.chunk_size]
+
+
+PROVIDERS = {
+    'gemini': GeminiProvider,
+    'fake': FakeProvider,
+}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """返回进程内共享的大模型调用实例（按 settings.LLM_PROVIDER 创建）"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                name = getattr(settings, 'LLM_PROVIDER', 'gemini')
+                try:
+                    provider_class = PROVIDERS[name]
+                except KeyError:
+                    raise ValueError(f"未知的LLM_PROVIDER: {name}")
+                _provider = provider_class()
+    return _provider
+
+
+def reset_provider():
+    """丢弃共享实例，下次 get_provider() 时按当前配置重新创建（用于测试和切换配置）"""
+    global _provider
+    with _provider_lock:
+        _provider = None
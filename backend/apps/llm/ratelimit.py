@@ -0,0 +1,49 @@
+"""大模型调用的限流与重试"""
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶：每秒补充 rate 个令牌，最多积累 capacity 个。
+    acquire() 在没有令牌时阻塞等待，用于把并发调用控制在服务商配额以内。
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError('rate 必须大于0')
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def call_with_retry(func, is_transient, max_retries=3, base_delay=1.0, max_delay=30.0):
+    """
+    调用 func()，遇到临时性错误（is_transient 返回 True）时按指数退避加随机抖动重试，
+    重试次数用尽或遇到非临时性错误时抛出原异常。
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= max_retries or not is_transient(e):
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            attempt += 1
@@ -1,3 +1,18 @@
 from django.contrib import admin
+from .models import DailyReviewRun, SchedulerLease
 
-# 如果有模型需要在admin中管理，在这里注册
\ No newline at end of file
+@admin.register(DailyReviewRun)
+class DailyReviewRunAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'review_date', 'status', 'attempts', 'latency_ms', 'total_tokens', 'result_todo', 'finished_at']
+    list_filter = ['status', 'review_date']
+    search_fields = ['user__username']
+    readonly_fields = ['created_at', 'updated_at']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'result_todo')
+
+
+@admin.register(SchedulerLease)
+class SchedulerLeaseAdmin(admin.ModelAdmin):
+    list_display = ['name', 'owner', 'expires_at', 'updated_at']
+    readonly_fields = ['updated_at']
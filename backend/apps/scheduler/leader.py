@@ -0,0 +1,101 @@
+"""
+基于数据库租约的主节点选举
+
+每个 run_scheduler 进程用唯一的 owner 标识竞争同一条租约记录：
+租约空闲、已过期或本来就属于自己时，条件UPDATE才会命中，保证同一时刻只有一个持有者。
+LeaseKeeper 负责持有期间的续约：数据库暂时不可用（如 database is locked）时租约仍然有效，
+在租约到期前继续重试，只有确认被他人接管或到期后才放弃。
+"""
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import DatabaseError
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import SchedulerLease
+
+logger = logging.getLogger('backend.apps.scheduler')
+
+
+def make_owner():
+    """进程唯一标识：主机名:进程号:随机串"""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def acquire_lease(name, owner, ttl):
+    """获取或续约租约，成功返回True"""
+    SchedulerLease.objects.get_or_create(name=name)
+    now = timezone.now()
+    updated = SchedulerLease.objects.filter(
+        Q(owner=owner) | Q(owner='') | Q(expires_at__lt=now),
+        name=name,
+    ).update(owner=owner, expires_at=now + timedelta(seconds=ttl), updated_at=now)
+    return updated == 1
+
+
+def release_lease(name, owner):
+    """主动释放租约，其他进程无需等待过期即可接管"""
+    SchedulerLease.objects.filter(name=name, owner=owner).update(
+        owner='', expires_at=timezone.now()
+    )
+
+
+class LeaseKeeper:
+    """
+    一个进程对一条租约的持有状态。
+
+    deadline 为本地单调时钟上的租约到期时间，取发起续约之前的时刻加 ttl，
+    不晚于数据库中 expires_at 的实际到期时间。
+    """
+
+    def __init__(self, name, owner, ttl, clock=time.monotonic):
+        self.name = name
+        self.owner = owner
+        self.ttl = ttl
+        self.clock = clock
+        self.deadline = None
+
+    def acquire(self):
+        """获取或续约，成功时返回True；数据库错误视为本次未获得"""
+        started = self.clock()
+        try:
+            acquired = acquire_lease(self.name, self.owner, self.ttl)
+        except DatabaseError as e:
+            logger.warning(f"获取调度器租约失败: {e}")
+            return False
+        if acquired:
+            self.deadline = started + self.ttl
+        return acquired
+
+    def renew(self):
+        """
+        续约，返回是否仍是持有者：
+        - 续约成功：True；
+        - 条件UPDATE未命中（租约已被其他进程接管）：False；
+        - 数据库错误：租约到期前返回True，等待下次重试，到期后返回False。
+        """
+        started = self.clock()
+        try:
+            renewed = acquire_lease(self.name, self.owner, self.ttl)
+        except DatabaseError as e:
+            remaining = (self.deadline or started) - started
+            if remaining > 0:
+                logger.warning(f"调度器续约失败，租约 {remaining:.0f} 秒后到期，稍后重试: {e}")
+                return True
+            logger.error(f"调度器续约失败且租约已到期: {e}")
+            return False
+        if renewed:
+            self.deadline = started + self.ttl
+        return renewed
+
+    def release(self):
+        try:
+            release_lease(self.name, self.owner)
+        except DatabaseError as e:
+            logger.warning(f"释放调度器租约失败，等待自然过期: {e}")
+        self.deadline = None
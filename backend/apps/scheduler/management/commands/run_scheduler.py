@@ -0,0 +1,155 @@
+import logging
+import signal
+import time
+from datetime import timedelta
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from backend.apps.scheduler.leader import LeaseKeeper, make_owner
+
+logger = logging.getLogger('backend.apps.scheduler')
+
+LEASE_NAME = 'scheduler'
+# 每日回顾的执行时间（整点）
+DAILY_REVIEW_HOUR = 23
+
+
+class Command(BaseCommand):
+    help = (
+        'Run scheduled jobs (daily review at 23:00) in a dedicated process. '
+        'Several instances may run; a database lease makes exactly one of them the active scheduler, '
+        'the others wait on standby and take over when the lease expires.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lease-ttl',
+            type=int,
+            default=getattr(settings, 'SCHEDULER_LEASE_TTL', 60),
+            help='Seconds the lease stays valid without renewal (renewed every ttl/3)',
+        )
+        parser.add_argument(
+            '--catch-up-days',
+            type=int,
+            default=1,
+            help='Whenever the lease is acquired, (re)run reviews missed or failed in the last N days, '
+                 'plus today once 23:00 has passed (0 = off)',
+        )
+
+    def handle(self, *args, **options):
+        ttl = options['lease_ttl']
+        interval = max(ttl / 3, 1)
+        keeper = LeaseKeeper(LEASE_NAME, make_owner(), ttl)
+
+        # docker stop 发送 SIGTERM：转为 SystemExit 以便释放租约
+        signal.signal(signal.SIGTERM, self.handle_sigterm)
+
+        try:
+            while True:
+                self.stdout.write(f'🔐 Scheduler {keeper.owner} waiting for lease "{LEASE_NAME}"...')
+                while not self.try_acquire(keeper):
+                    time.sleep(interval)
+                self.stdout.write(f'👑 Lease acquired, this instance is the active scheduler')
+                logger.info(f"调度器 {keeper.owner} 获得租约")
+
+                if not self.lead(keeper, interval, options['catch_up_days']):
+                    break
+                # 失去租约（已被其他实例接管或到期）：回到待命状态，重新获得时再补跑
+                self.stdout.write('⚠️ Lease lost, back to standby')
+        except (KeyboardInterrupt, SystemExit):
+            pass
+        finally:
+            keeper.release()
+            close_old_connections()
+        self.stdout.write('🛑 Scheduler stopped, lease released')
+
+    def lead(self, keeper, interval, catch_up_days):
+        """作为主节点运行调度，直到进程停止（返回False）或失去租约（返回True）"""
+        scheduler = BlockingScheduler(timezone=settings.TIME_ZONE)
+        lost_lease = False
+
+        def renew_lease():
+            nonlocal lost_lease
+            try:
+                held = keeper.renew()
+            finally:
+                close_old_connections()
+            if not held:
+                lost_lease = True
+                logger.error(f"调度器 {keeper.owner} 失去租约，停止调度")
+                scheduler.shutdown(wait=False)
+
+        # 每天23点执行；错过的执行在一小时内补跑，多次错过只补一次
+        scheduler.add_job(
+            run_job,
+            CronTrigger(hour=DAILY_REVIEW_HOUR, minute=0),
+            args=['generate_daily_review'],
+            id='daily_review_job',
+            name='生成每日回顾报告',
+            misfire_grace_time=3600,
+            coalesce=True,
+            max_instances=1,
+        )
+        scheduler.add_job(renew_lease, 'interval', seconds=interval, id='scheduler_lease_renew', max_instances=1)
+
+        # 每次获得租约都补跑：上一个持有者停机或交接期间错过的回顾，
+        # 执行记录表保证已完成的用户不会重复生成
+        date_range = catch_up_range(timezone.localtime(), catch_up_days)
+        if date_range:
+            date_from, date_to = date_range
+            scheduler.add_job(
+                run_job,
+                args=['generate_daily_review'],
+                kwargs={'date_from': date_from.isoformat(), 'date_to': date_to.isoformat()},
+                id='daily_review_catch_up',
+                name='补跑错过的每日回顾',
+            )
+
+        self.stdout.write(f'📅 Daily review: every day at {DAILY_REVIEW_HOUR}:00 ({settings.TIME_ZONE})')
+        try:
+            scheduler.start()
+        except (KeyboardInterrupt, SystemExit):
+            if scheduler.running:
+                scheduler.shutdown(wait=False)
+            raise
+        return lost_lease
+
+    def try_acquire(self, keeper):
+        try:
+            return keeper.acquire()
+        finally:
+            close_old_connections()
+
+    def handle_sigterm(self, signum, frame):
+        raise SystemExit(0)
+
+
+def catch_up_range(now, days):
+    """
+    需要补跑的日期范围 (起, 止)：今天之前的 days 天；当前已过当天的执行时间时
+    包含今天（接管发生在23点之后，今天的定时执行已经错过）
+    """
+    if days <= 0:
+        return None
+    today = now.date()
+    last = today if now.hour >= DAILY_REVIEW_HOUR else today - timedelta(days=1)
+    return today - timedelta(days=days), last
+
+
+def run_job(command, **options):
+    """在调度线程中执行管理命令，前后清理数据库连接"""
+    close_old_connections()
+    try:
+        logger.info(f"开始执行定时任务 {command} {options}")
+        call_command(command, **options)
+        logger.info(f"定时任务 {command} 执行完成")
+    except Exception as e:
+        logger.error(f"定时任务 {command} 执行失败: {e}")
+    finally:
+        close_old_connections()
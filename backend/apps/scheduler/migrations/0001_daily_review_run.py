@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('todos', '0011_todo_rank_ordering_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyReviewRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_date', models.DateField(verbose_name='回顾日期')),
+                ('status', models.CharField(choices=[('pending', '待处理'), ('running', '执行中'), ('completed', '已完成'), ('failed', '失败')], default='pending', max_length=20, verbose_name='状态')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='执行次数')),
+                ('claim_token', models.CharField(blank=True, default='', help_text='当前处理该记录的命令实例', max_length=32, verbose_name='认领标识')),
+                ('latency_ms', models.PositiveIntegerField(blank=True, null=True, verbose_name='大模型耗时(毫秒)')),
+                ('prompt_tokens', models.PositiveIntegerField(blank=True, null=True, verbose_name='输入token数')),
+                ('completion_tokens', models.PositiveIntegerField(blank=True, null=True, verbose_name='输出token数')),
+                ('total_tokens', models.PositiveIntegerField(blank=True, null=True, verbose_name='总token数')),
+                ('error', models.TextField(blank=True, default='', verbose_name='错误信息')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('result_todo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='todos.todo', verbose_name='回顾报告')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_review_runs', to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+            ],
+            options={
+                'verbose_name': '每日回顾执行记录',
+                'verbose_name_plural': '每日回顾执行记录',
+                'ordering': ['-review_date', 'user'],
+                'indexes': [models.Index(fields=['review_date', 'status'], name='scheduler_d_review__87c2e0_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyreviewrun',
+            constraint=models.UniqueConstraint(fields=('user', 'review_date'), name='daily_review_run_user_date_uniq'),
+        ),
+    ]
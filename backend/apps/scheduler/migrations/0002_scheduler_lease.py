@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:46
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0001_daily_review_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerLease',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='名称')),
+                ('owner', models.CharField(blank=True, default='', max_length=100, verbose_name='持有者')),
+                ('expires_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='过期时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '调度器租约',
+                'verbose_name_plural': '调度器租约',
+            },
+        ),
+    ]
@@ -1,4 +1,92 @@
 from django.db import models
+from django.contrib.auth import get_user_model
+from django.utils import timezone
 
-# 如果需要存储调度任务的执行记录，可以在这里定义模型
-# 目前暂时为空
\ No newline at end of file
+User = get_user_model()
+
+
+class DailyReviewRun(models.Model):
+    """
+    每日回顾执行记录，每个用户每天一条。
+
+    generate_daily_review 先认领记录再调用大模型：已完成的不再处理，
+    失败、待处理或长时间停留在执行中（进程崩溃）的记录在重跑时继续处理。
+    """
+    STATUS_CHOICES = [
+        ('pending', '待处理'),
+        ('running', '执行中'),
+        ('completed', '已完成'),
+        ('failed', '失败'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_review_runs',
+        verbose_name="用户"
+    )
+    review_date = models.DateField(verbose_name="回顾日期")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name="状态"
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name="执行次数")
+    claim_token = models.CharField(
+        max_length=32,
+        blank=True,
+        default='',
+        verbose_name="认领标识",
+        help_text="当前处理该记录的命令实例"
+    )
+    latency_ms = models.PositiveIntegerField(null=True, blank=True, verbose_name="大模型耗时(毫秒)")
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True, verbose_name="输入token数")
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True, verbose_name="输出token数")
+    total_tokens = models.PositiveIntegerField(null=True, blank=True, verbose_name="总token数")
+    result_todo = models.ForeignKey(
+        'todos.Todo',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="回顾报告"
+    )
+    error = models.TextField(blank=True, default='', verbose_name="错误信息")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="开始时间")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="完成时间")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="创建时间")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
+    class Meta:
+        ordering = ['-review_date', 'user']
+        verbose_name = "每日回顾执行记录"
+        verbose_name_plural = "每日回顾执行记录"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'review_date'], name='daily_review_run_user_date_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['review_date', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.review_date} ({self.get_status_display()})"
+
+
+class SchedulerLease(models.Model):
+    """
+    调度器租约，用于在多个 run_scheduler 进程中选出唯一的执行者。
+
+    持有者需在 expires_at 之前续约；进程退出或崩溃后租约过期，其他进程可接管。
+    """
+    name = models.CharField(max_length=50, primary_key=True, verbose_name="名称")
+    owner = models.CharField(max_length=100, blank=True, default='', verbose_name="持有者")
+    expires_at = models.DateTimeField(default=timezone.now, verbose_name="过期时间")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
+    class Meta:
+        verbose_name = "调度器租约"
+        verbose_name_plural = "调度器租约"
+
+    def __str__(self):
+        return f"{self.name} ({self.owner or '空闲'})"
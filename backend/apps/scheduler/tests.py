@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase
+from django.utils import timezone
+
+from .leader import LeaseKeeper, acquire_lease
+from .management.commands.run_scheduler import catch_up_range
+from .models import SchedulerLease
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class SchedulerLeaseTests(TestCase):
+    """调度器租约的获取、续约和交接"""
+
+    def test_only_one_owner_at_a_time(self):
+        self.assertTrue(acquire_lease('scheduler', 'a', 60))
+        self.assertFalse(acquire_lease('scheduler', 'b', 60))
+        self.assertTrue(acquire_lease('scheduler', 'a', 60))
+
+    def test_expired_lease_taken_over(self):
+        self.assertTrue(acquire_lease('scheduler', 'a', 60))
+        SchedulerLease.objects.filter(name='scheduler').update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(acquire_lease('scheduler', 'b', 60))
+        self.assertFalse(acquire_lease('scheduler', 'a', 60))
+
+    def test_transient_error_keeps_lease_until_deadline(self):
+        clock = FakeClock()
+        keeper = LeaseKeeper('scheduler', 'a', 60, clock=clock)
+        self.assertTrue(keeper.acquire())
+        with mock.patch(
+            'backend.apps.scheduler.leader.acquire_lease', side_effect=OperationalError('database is locked')
+        ):
+            clock.now += 40
+            self.assertTrue(keeper.renew())
+            clock.now += 25
+            self.assertFalse(keeper.renew())
+
+    def test_successful_renew_extends_deadline(self):
+        clock = FakeClock()
+        keeper = LeaseKeeper('scheduler', 'a', 60, clock=clock)
+        keeper.acquire()
+        clock.now += 40
+        self.assertTrue(keeper.renew())
+        with mock.patch(
+            'backend.apps.scheduler.leader.acquire_lease', side_effect=OperationalError('database is locked')
+        ):
+            clock.now += 40
+            self.assertTrue(keeper.renew())
+
+    def test_taken_over_lease_steps_down(self):
+        keeper = LeaseKeeper('scheduler', 'a', 60)
+        keeper.acquire()
+        SchedulerLease.objects.filter(name='scheduler').update(
+            owner='b', expires_at=timezone.now() + timedelta(seconds=60)
+        )
+        self.assertFalse(keeper.renew())
+
+
+class CatchUpRangeTests(TestCase):
+    """获得租约时补跑的日期范围"""
+
+    def test_before_run_time(self):
+        now = datetime(2026, 10, 18, 10, 0)
+        self.assertEqual(catch_up_range(now, 1), (now.date() - timedelta(days=1), now.date() - timedelta(days=1)))
+
+    def test_after_run_time_includes_today(self):
+        now = datetime(2026, 10, 18, 23, 30)
+        self.assertEqual(catch_up_range(now, 1), (now.date() - timedelta(days=1), now.date()))
+
+    def test_disabled(self):
+        self.assertIsNone(catch_up_range(datetime(2026, 10, 18, 23, 30), 0))
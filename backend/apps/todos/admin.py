@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Todo, QuickTaskConfig
+from .models import Todo, QuickTaskConfig, UserTodoStats
 
 @admin.register(Todo)
 class TodoAdmin(admin.ModelAdmin):
@@ -53,3 +53,12 @@ class QuickTaskConfigAdmin(admin.ModelAdmin):
         if not change:  # 新建时
             obj.created_by = request.user
         super().save_model(request, obj, form, change)
+
+@admin.register(UserTodoStats)
+class UserTodoStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'total_count', 'completed_count', 'deleted_count', 'updated_at']
+    search_fields = ['user__username']
+    readonly_fields = ['updated_at']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
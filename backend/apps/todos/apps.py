@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class TodosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.apps.todos'
+    
+    def ready(self):
+        from .search import ensure_search_index
+        # 迁移后创建/补齐全文索引（SQLite FTS5 表与触发器，PostgreSQL GIN 索引）
+        post_migrate.connect(ensure_search_index, sender=self)
+        
+        from .models import Todo
+        from .stats import todo_deleted, todo_saved
+        # 单条保存/删除时增量维护用户计数（批量路径由TodoQuerySet处理）
+        post_save.connect(todo_saved, sender=Todo, dispatch_uid='todo_stats_saved')
+        post_delete.connect(todo_deleted, sender=Todo, dispatch_uid='todo_stats_deleted')
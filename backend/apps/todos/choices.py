@@ -0,0 +1,106 @@
+"""
+Todo 类型、状态、优先级的选项注册表
+
+导入时构建一次，全部为不可变结构（元组、frozenset、MappingProxyType），
+模型、序列化器、后台和每日回顾共用，显示名称和状态校验都是一次字典查找，
+不再在每次访问时重新构造字典。
+CATALOGUE_JSON 是 /api/todos/meta/ 返回给前端的完整目录，同样只渲染一次。
+"""
+import hashlib
+import json
+from types import MappingProxyType
+
+TYPE_CHOICES = (
+    ('record', '记录'),
+    ('requirement', '需求'),
+    ('task', '任务'),
+    ('issue', '故障'),
+)
+
+# 各类型可用的状态，第一个为新建时的默认状态
+STATUS_CHOICES = MappingProxyType({
+    'record': (
+        ('pending', '待阅'),
+        ('archived', '归档'),
+    ),
+    'requirement': (
+        ('pending_evaluation', '待评估'),
+        ('decomposed', '已拆解'),
+        ('rejected', '已拒绝'),
+    ),
+    'task': (
+        ('todo', '待办'),
+        ('on_hold', '搁置'),
+        ('cancelled', '取消'),
+        ('completed', '完成'),
+    ),
+    'issue': (
+        ('reported', '报告'),
+        ('reproduced', '复现'),
+        ('fixing', '修复'),
+        ('resolved', '解决'),
+        ('closed', '关闭'),
+    ),
+})
+
+PRIORITY_CHOICES = (
+    ('high', '高'),
+    ('medium', '中'),
+    ('low', '低'),
+    ('none', '无'),
+)
+
+# 优先级排序权重（数值越小优先级越高）
+PRIORITY_WEIGHTS = MappingProxyType({
+    'high': 1,
+    'medium': 2,
+    'low': 3,
+    'none': 4,
+})
+# 未知优先级（如历史数据中的空值）排在最后
+DEFAULT_PRIORITY_WEIGHT = 999
+
+# 所有状态（数据库字段的 choices）
+ALL_STATUS_CHOICES = tuple(choice for statuses in STATUS_CHOICES.values() for choice in statuses)
+
+TYPE_LABELS = MappingProxyType(dict(TYPE_CHOICES))
+STATUS_LABELS = MappingProxyType(dict(ALL_STATUS_CHOICES))
+PRIORITY_LABELS = MappingProxyType(dict(PRIORITY_CHOICES))
+
+# 各类型新建时的默认状态；未知类型使用 FALLBACK_STATUS
+DEFAULT_STATUS = MappingProxyType({todo_type: statuses[0][0] for todo_type, statuses in STATUS_CHOICES.items()})
+FALLBACK_STATUS = 'pending'
+
+# 各类型允许切换到的状态
+STATUS_TRANSITIONS = MappingProxyType({
+    todo_type: frozenset(status for status, _ in statuses)
+    for todo_type, statuses in STATUS_CHOICES.items()
+})
+
+
+def is_valid_status(todo_type, status):
+    """status 是否为 todo_type 可用的状态"""
+    return status in STATUS_TRANSITIONS.get(todo_type, ())
+
+
+def _build_catalogue():
+    return {
+        'types': [
+            {
+                'value': todo_type,
+                'label': label,
+                'default_status': DEFAULT_STATUS[todo_type],
+                'statuses': [{'value': value, 'label': text} for value, text in STATUS_CHOICES[todo_type]],
+            }
+            for todo_type, label in TYPE_CHOICES
+        ],
+        'priorities': [
+            {'value': value, 'label': label, 'weight': PRIORITY_WEIGHTS[value]}
+            for value, label in PRIORITY_CHOICES
+        ],
+    }
+
+
+# 前端使用的类型/状态/优先级目录（JSON字节串），ETag 取内容哈希，只随代码变化
+CATALOGUE_JSON = json.dumps(_build_catalogue(), ensure_ascii=False, separators=(',', ':')).encode()
+CATALOGUE_ETAG = f'"{hashlib.sha256(CATALOGUE_JSON).hexdigest()[:32]}"'
@@ -0,0 +1,124 @@
+"""
+Todo列表的精简读取路径
+
+列表接口不经过 ModelSerializer：用 values() 只查询需要的列（创建者用户名、昵称通过关联一并查出），
+再直接构造字典，显示名称查 choices 注册表。输出与 TodoSerializer 完全一致。
+
+fields 参数（逗号分隔）指定只返回部分字段，如 fields=id,title,status,priority，
+exclude 参数去掉部分字段，如 exclude=available_statuses（前端改从 /api/todos/meta/ 读取），
+未用到的列不查询，子任务数只在需要时用一条分组查询补齐。
+"""
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from . import choices
+from .models import Todo
+
+_datetime = serializers.DateTimeField()
+
+# 输出字段 → 依赖的数据库列（values() 的参数），顺序与 TodoSerializer.Meta.fields 一致
+FIELD_COLUMNS = {
+    'id': ('id',),
+    'title': ('title',),
+    'description': ('description',),
+    'completed': ('completed',),
+    'is_deleted': ('is_deleted',),
+    'todo_type': ('todo_type',),
+    'type_display': ('todo_type',),
+    'priority': ('priority',),
+    'priority_display': ('priority',),
+    'status': ('status',),
+    'status_display': ('status',),
+    'available_statuses': ('todo_type',),
+    'created_by': ('created_by',),
+    'created_by_username': ('created_by__username',),
+    'created_by_nickname': ('created_by__nickname',),
+    'parent_todo_id': ('parent_todo_id',),
+    'has_sub_todos': ('id',),
+    'sub_todos_count': ('id',),
+    'created_at': ('created_at',),
+    'updated_at': ('updated_at',),
+}
+
+# 游标分页需要的列，始终查询
+CURSOR_COLUMNS = ('id', 'priority_rank', 'created_at')
+
+
+def _split_fields(param, value):
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in FIELD_COLUMNS]
+    if unknown:
+        raise serializers.ValidationError({param: [f'不支持的字段: {", ".join(unknown)}']})
+    return fields
+
+
+def parse_fields(value, exclude=None):
+    """解析 fields / exclude 参数，都未传时返回全部字段"""
+    fields = _split_fields('fields', value) if value else tuple(FIELD_COLUMNS)
+    if exclude:
+        excluded = set(_split_fields('exclude', exclude))
+        fields = tuple(field for field in fields if field not in excluded)
+    return fields
+
+
+def todo_values(queryset, fields):
+    """只查询所需列的 values() 查询集"""
+    columns = dict.fromkeys(CURSOR_COLUMNS)
+    for field in fields:
+        columns.update(dict.fromkeys(FIELD_COLUMNS[field]))
+    return queryset.values(*columns)
+
+
+def _datetime_formatter():
+    """
+    与 DRF DateTimeField 输出一致的时间格式化；当前时区每次列表只解析一次
+    （DateTimeField 每个值都要经过线程本地变量取时区，是逐行开销的大头）
+    """
+    output_format = api_settings.DATETIME_FORMAT
+    if output_format is None or output_format.lower() != ISO_8601:
+        return _datetime.to_representation
+    current_timezone = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        if not value:
+            return None
+        value = value.astimezone(current_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return format_datetime
+
+
+def build_todo_list(rows, fields):
+    """把 values() 行构造为输出字典"""
+    rows = list(rows)
+    sub_counts = {}
+    if rows and ('has_sub_todos' in fields or 'sub_todos_count' in fields):
+        sub_counts = dict(
+            Todo.objects.filter(parent_todo_id__in=[row['id'] for row in rows], is_deleted=False)
+            .order_by()
+            .values_list('parent_todo_id')
+            .annotate(count=Count('pk'))
+        )
+
+    format_datetime = _datetime_formatter()
+    builders = {
+        'type_display': lambda row: choices.TYPE_LABELS.get(row['todo_type'], row['todo_type']),
+        'priority_display': lambda row: choices.PRIORITY_LABELS.get(row['priority'], row['priority']),
+        'status_display': lambda row: choices.STATUS_LABELS.get(row['status'], row['status']),
+        'available_statuses': lambda row: choices.STATUS_CHOICES.get(row['todo_type'], ()),
+        'created_by_username': lambda row: row['created_by__username'],
+        'created_by_nickname': lambda row: row['created_by__nickname'],
+        'has_sub_todos': lambda row: sub_counts.get(row['id'], 0) > 0,
+        'sub_todos_count': lambda row: sub_counts.get(row['id'], 0),
+        'created_at': lambda row: format_datetime(row['created_at']),
+        'updated_at': lambda row: format_datetime(row['updated_at']),
+    }
+    plan = [(field, builders.get(field)) for field in fields]
+    return [
+        {field: build(row) if build else row[field] for field, build in plan}
+        for row in rows
+    ]
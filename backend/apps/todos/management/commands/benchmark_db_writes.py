@@ -0,0 +1,83 @@
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+
+from backend.apps.todos.models import Todo
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark concurrent write throughput against the configured database. '
+        'Run once per configuration (e.g. DB_ENGINE=sqlite with SQLITE_TUNING=True/False, '
+        'DB_ENGINE=postgresql) and compare the summaries.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writer threads')
+        parser.add_argument('--ops', type=int, default=200, help='Write transactions per thread')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'🗄️  Database: {connection.vendor} ({connection.settings_dict["NAME"]})')
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                for pragma in ('journal_mode', 'synchronous', 'busy_timeout'):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    self.stdout.write(f'   {pragma} = {cursor.fetchone()[0]}')
+        elif connection.vendor == 'postgresql':
+            self.stdout.write(f'   CONN_MAX_AGE = {connection.settings_dict["CONN_MAX_AGE"]}')
+
+        # 使用独立的临时用户，结束后连同其数据一起删除
+        user = User.objects.create_user(username=f'bench_{uuid.uuid4().hex[:12]}', nickname='benchmark')
+        threads = options['threads']
+        ops = options['ops']
+
+        def worker(_):
+            latencies = []
+            errors = 0
+            try:
+                for i in range(ops):
+                    started = time.perf_counter()
+                    try:
+                        # 一次写事务：新建任务并修改一次，同时触发计数表更新
+                        with transaction.atomic():
+                            todo = Todo.objects.create(created_by=user, title=f'bench {i}', todo_type='task')
+                            todo.completed = True
+                            todo.save()
+                    except OperationalError:
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+            return latencies, errors
+
+        self.stdout.write(f'🚀 {threads} thread(s) x {ops} write transaction(s)')
+        try:
+            wall_started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                results = list(executor.map(worker, range(threads)))
+            wall_time = time.perf_counter() - wall_started
+        finally:
+            user.delete()
+
+        latencies = sorted(latency for result in results for latency in result[0])
+        errors = sum(result[1] for result in results)
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(f'📊 Write Benchmark Summary:')
+        self.stdout.write(f'   ✅ Committed: {len(latencies)}')
+        self.stdout.write(f'   🔒 Lock errors: {errors}')
+        self.stdout.write(f'   ⏱️  Wall time: {wall_time:.2f}s')
+        self.stdout.write(f'   📈 Throughput: {len(latencies) / wall_time:.1f} tx/s')
+        if latencies:
+            p95 = max(int(len(latencies) * 0.95) - 1, 0)
+            self.stdout.write(
+                f'   🕐 Latency p50/p95: {statistics.median(latencies) * 1000:.1f}ms / {latencies[p95] * 1000:.1f}ms'
+            )
@@ -1,18 +1,30 @@
-import os
-import django
-from django.core.management.base import BaseCommand
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
 # 修正用户模型导入：使用get_user_model()而不是直接导入User
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import datetime, timedelta
-# 修正导入：使用正确的Google GenAI SDK导入方式
-import google.genai as genai
+from backend.apps.llm.providers import get_provider
+from backend.apps.llm.ratelimit import TokenBucket, call_with_retry
+from backend.apps.scheduler.models import DailyReviewRun
+from backend.apps.todos.choices import PRIORITY_LABELS, TYPE_LABELS
 from backend.apps.todos.models import Todo
-from django.conf import settings
 
 # 获取正确的用户模型
 User = get_user_model()
 
+# 执行记录写回的字段
+RUN_RESULT_FIELDS = [
+    'status', 'claim_token', 'latency_ms', 'prompt_tokens', 'completion_tokens',
+    'total_tokens', 'result_todo', 'error', 'finished_at', 'updated_at',
+]
+
 class Command(BaseCommand):
     help = 'Generate daily review for all users'
 
@@ -32,23 +44,62 @@ class Command(BaseCommand):
             type=str,
             help='Specify date in YYYY-MM-DD format (default: today)',
         )
+        parser.add_argument(
+            '--from',
+            dest='date_from',
+            type=str,
+            help='Backfill start date in YYYY-MM-DD format (inclusive)',
+        )
+        parser.add_argument(
+            '--to',
+            dest='date_to',
+            type=str,
+            help='Backfill end date in YYYY-MM-DD format (inclusive, default: today)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate reviews that already completed (the existing report is updated in place)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'DAILY_REVIEW_CONCURRENCY', 4),
+            help='Number of concurrent LLM calls (1 = serial)',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=getattr(settings, 'DAILY_REVIEW_RATE_LIMIT', 1.0),
+            help='Max LLM requests per second (token bucket)',
+        )
+        parser.add_argument(
+            '--max-retries',
+            type=int,
+            default=3,
+            help='Retries with exponential backoff on transient LLM errors',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Number of report todos committed per transaction',
+        )
 
     def handle(self, *args, **options):
         """命令主入口"""
+        # 本次执行的认领标识，用于区分同时运行的多个实例
+        self.run_token = uuid.uuid4().hex
         try:
-            # 初始化Gemini客户端
-            client = genai.Client(api_key=settings.GEMINI_API_KEY)
-            
-            # 解析目标日期
-            if options['date']:
-                target_date = datetime.strptime(options['date'], '%Y-%m-%d').date()
-            else:
-                target_date = timezone.now().date()
+            # 获取共享的大模型调用实例
+            provider = get_provider()
+            self.rate_limiter = TokenBucket(options['rate'], capacity=options['concurrency'])
+            self.max_retries = options['max_retries']
+            self.batch_size = options['batch_size']
+            self.pending_results = []
+            test_mode = options['test_mode']
             
-            start_of_day = timezone.make_aware(datetime.combine(target_date, datetime.min.time()))
-            end_of_day = timezone.make_aware(datetime.combine(target_date, datetime.max.time()))
-            
-            self.stdout.write(f'📅 Processing date: {target_date.strftime("%Y年%m月%d日")}')
+            target_dates = self.parse_dates(options)
             
             # 确定要处理的用户（排除管理员）
             if options['user_id']:
@@ -59,83 +110,229 @@ class Command(BaseCommand):
             else:
                 users = User.objects.filter(is_active=True, is_superuser=False)  # 排除管理员
             
-            self.stdout.write(f'👥 Found {users.count()} active non-admin user(s) to process')
+            self.stdout.write(f'⚙️  Concurrency: {options["concurrency"]}, rate limit: {options["rate"]}/s')
             
-            success_count = 0
-            error_count = 0
-            skip_count = 0
-            
-            # 为每个用户生成报告
-            for user in users:
-                try:
-                    result = self.generate_user_review(
-                        user, client, start_of_day, end_of_day, target_date, options['test_mode']
-                    )
-                    if result:
-                        success_count += 1
-                        self.stdout.write(
-                            self.style.SUCCESS(f'✅ Generated review for user: {user.username}')
-                        )
-                    else:
-                        # 为无活动用户也生成提醒报告
-                        self.generate_inactive_user_reminder(user, target_date, options['test_mode'])
-                        skip_count += 1
-                        self.stdout.write(
-                            self.style.WARNING(f'⏭️  Generated reminder for inactive user: {user.username}')
-                        )
-                        
-                except Exception as e:
-                    error_count += 1
-                    self.stdout.write(
-                        self.style.ERROR(f'❌ Error for user {user.username}: {str(e)}')
-                    )
-                    if options['test_mode']:
-                        import traceback
-                        self.stdout.write(traceback.format_exc())
+            started = time.monotonic()
+            totals = {'success': 0, 'fallback': 0, 'skipped': 0, 'done': 0, 'errors': 0, 'total': 0}
+            for target_date in target_dates:
+                counts = self.process_date(provider, users, target_date, options['force'], test_mode, options['concurrency'])
+                for key, value in counts.items():
+                    totals[key] += value
+            elapsed = time.monotonic() - started
+            processed = totals['total'] - totals['done']
             
             # 输出总结
             self.stdout.write('\n' + '='*60)
             self.stdout.write(f'📊 Task Summary:')
-            self.stdout.write(f'   ✅ Success: {success_count}')
-            self.stdout.write(f'   ⏭️  Skipped: {skip_count}')
-            self.stdout.write(f'   ❌ Errors: {error_count}')
-            self.stdout.write(f'   👥 Total users: {users.count()}')
+            self.stdout.write(f'   📅 Dates: {len(target_dates)}')
+            self.stdout.write(f'   ✅ Success: {totals["success"]}')
+            self.stdout.write(f'   ⚠️  Fallback reports: {totals["fallback"]} (retried on next run)')
+            self.stdout.write(f'   ⏭️  Skipped: {totals["skipped"]}')
+            self.stdout.write(f'   ♻️  Already done: {totals["done"]}')
+            self.stdout.write(f'   ❌ Errors: {totals["errors"]}')
+            self.stdout.write(f'   👥 Total user-days: {totals["total"]}')
+            self.stdout.write(f'   ⏱️  Wall time: {elapsed:.2f}s')
+            self.stdout.write(f'   📈 Throughput: {processed / elapsed if elapsed else 0:.2f} users/s')
             
+        except CommandError:
+            raise
         except Exception as e:
+            # 已认领但未写回的记录标记为失败，重跑时继续处理
+            DailyReviewRun.objects.filter(claim_token=self.run_token, status='running').update(
+                status='failed', claim_token='', error=str(e), updated_at=timezone.now()
+            )
             self.stdout.write(self.style.ERROR(f'💥 Fatal error: {str(e)}'))
             if options.get('test_mode'):
                 import traceback
                 self.stdout.write(traceback.format_exc())
     
-    def generate_user_review(self, user, client, start_of_day, end_of_day, target_date, test_mode=False):
-        """为指定用户生成每日回顾"""
-        # 只获取指定日期新增的todos
-        new_todos = Todo.objects.filter(
-            created_by=user,
-            created_at__range=[start_of_day, end_of_day],
-            is_deleted=False
-        )
+    def parse_dates(self, options):
+        """解析目标日期：--date 单日，或 --from/--to 日期区间（含两端），默认今天"""
+        def parse(value, name):
+            try:
+                return datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError(f'Invalid {name} date "{value}", expected YYYY-MM-DD')
         
-        # 只检查新增的todos
-        if not new_todos.exists():
-            return False
+        if options['date'] and (options['date_from'] or options['date_to']):
+            raise CommandError('--date cannot be combined with --from/--to')
+        today = timezone.now().date()
+        if options['date']:
+            return [parse(options['date'], '--date')]
+        if not options['date_from'] and not options['date_to']:
+            return [today]
         
-        # 构建数据摘要时只传入new_todos
-        summary = self.build_todo_summary(new_todos, target_date)
+        date_to = parse(options['date_to'], '--to') if options['date_to'] else today
+        date_from = parse(options['date_from'], '--from') if options['date_from'] else date_to
+        if date_from > date_to:
+            raise CommandError('--from must not be later than --to')
+        return [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+    
+    def process_date(self, provider, users, target_date, force, test_mode, concurrency):
+        """处理单个日期，返回计数"""
+        start_of_day = timezone.make_aware(datetime.combine(target_date, datetime.min.time()))
+        end_of_day = timezone.make_aware(datetime.combine(target_date, datetime.max.time()))
         
-        if test_mode:
-            self.stdout.write(f'📋 Summary for {user.username}:')
-            self.stdout.write(f'   📝 New todos: {summary["new_count"]}')
-            self.stdout.write(f'   📊 Type distribution: {summary["type_stats"]}')
+        self.stdout.write(f'📅 Processing date: {target_date.strftime("%Y年%m月%d日")}')
         
-        # 生成AI报告
-        review_content = self.generate_ai_review(client, summary, test_mode)
+        runs, total = self.claim_runs(users, target_date, force)
+        counts = {'success': 0, 'fallback': 0, 'skipped': 0, 'done': total - len(runs), 'errors': 0, 'total': total}
         
-        if test_mode:
-            self.stdout.write(f'🤖 AI Review preview: {review_content[:200]}...')
+        self.stdout.write(f'👥 Found {total} active non-admin user(s), {len(runs)} to process, {counts["done"]} already done')
+        if not runs:
+            return counts
+        
+        summaries = self.build_todo_summaries([run.user_id for run in runs], start_of_day, end_of_day, target_date)
+        progress = 0
+        
+        # 数据读取和写入都在主线程完成，线程池只负责大模型调用
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {}
+            for run in runs:
+                user = run.user
+                try:
+                    summary = summaries.get(user.id)
+                    if summary:
+                        if test_mode:
+                            self.stdout.write(f'📋 Summary for {user.username}:')
+                            self.stdout.write(f'   📝 New todos: {summary["new_count"]}')
+                            self.stdout.write(f'   📊 Type distribution: {summary["type_stats"]}')
+                        futures[executor.submit(self.generate_ai_review, provider, summary, test_mode)] = (run, summary)
+                        continue
+                    
+                    # 为无活动用户也生成提醒报告
+                    self.queue_result(run, self.build_inactive_user_reminder(user, target_date, test_mode))
+                    counts['skipped'] += 1
+                    progress += 1
+                    self.stdout.write(
+                        self.style.WARNING(f'⏭️  [{progress}/{len(runs)}] Generated reminder for inactive user: {user.username}')
+                    )
+                except Exception as e:
+                    counts['errors'] += 1
+                    progress += 1
+                    self.queue_result(run, None, error=str(e))
+                    self.report_user_error(user, e, progress, len(runs), test_mode)
+            
+            for future in as_completed(futures):
+                run, summary = futures[future]
+                user = run.user
+                progress += 1
+                try:
+                    result = future.result()
+                    if test_mode:
+                        self.stdout.write(f'🤖 AI Review preview: {result["content"][:200]}...')
+                    self.queue_result(run, self.build_review_todo(user, summary, result['content']), **result['metrics'])
+                    if result['metrics']['error']:
+                        counts['fallback'] += 1
+                        self.stdout.write(
+                            self.style.WARNING(f'⚠️  [{progress}/{len(runs)}] Generated fallback review for user: {user.username}')
+                        )
+                    else:
+                        counts['success'] += 1
+                        self.stdout.write(
+                            self.style.SUCCESS(f'✅ [{progress}/{len(runs)}] Generated review for user: {user.username}')
+                        )
+                except Exception as e:
+                    counts['errors'] += 1
+                    self.queue_result(run, None, error=str(e))
+                    self.report_user_error(user, e, progress, len(runs), test_mode)
         
-        # 直接创建新的报告todo（移除重复检查）
-        review_todo = Todo.objects.create(
+        self.flush_results()
+        return counts
+    
+    def claim_runs(self, users, target_date, force=False):
+        """
+        认领当天需要处理的执行记录，返回 (认领到的记录, 用户总数)。
+        
+        缺失的记录先批量补齐；认领用一条条件UPDATE完成，同时运行的多个实例不会认领到同一条记录。
+        已完成的记录只在 force 时重新处理；执行中的记录超过 DAILY_REVIEW_STALE_AFTER 秒视为进程已崩溃。
+        """
+        user_ids = list(users.values_list('id', flat=True))
+        DailyReviewRun.objects.bulk_create(
+            [DailyReviewRun(user_id=user_id, review_date=target_date) for user_id in user_ids],
+            batch_size=self.batch_size * 10,
+            ignore_conflicts=True
+        )
+        
+        now = timezone.now()
+        stale_before = now - timedelta(seconds=getattr(settings, 'DAILY_REVIEW_STALE_AFTER', 30 * 60))
+        claimable = Q(status__in=['pending', 'failed']) | Q(status='running', started_at__lt=stale_before)
+        if force:
+            claimable |= Q(status='completed')
+        DailyReviewRun.objects.filter(claimable, review_date=target_date, user__in=users).update(
+            status='running',
+            claim_token=self.run_token,
+            attempts=F('attempts') + 1,
+            started_at=now,
+            finished_at=None,
+            error='',
+            updated_at=now
+        )
+        runs = DailyReviewRun.objects.filter(
+            review_date=target_date,
+            claim_token=self.run_token
+        ).select_related('user', 'result_todo').order_by('user_id')
+        return list(runs), len(user_ids)
+    
+    def report_user_error(self, user, error, progress, total, test_mode=False):
+        self.stdout.write(
+            self.style.ERROR(f'❌ [{progress}/{total}] Error for user {user.username}: {str(error)}')
+        )
+        if test_mode:
+            import traceback
+            self.stdout.write(''.join(traceback.format_exception(error)))
+    
+    def queue_result(self, run, todo, error='', latency_ms=None, usage=None):
+        """记录单个用户的结果并暂存待写入的报告，攒够一批后统一提交"""
+        usage = usage or {}
+        run.status = 'failed' if error else 'completed'
+        run.error = error
+        run.latency_ms = latency_ms
+        run.prompt_tokens = usage.get('prompt_tokens')
+        run.completion_tokens = usage.get('completion_tokens')
+        run.total_tokens = usage.get('total_tokens')
+        if todo is not None:
+            todo = self.reuse_report(run, todo)
+        self.pending_results.append((run, todo))
+        if len(self.pending_results) >= self.batch_size:
+            self.flush_results()
+    
+    def reuse_report(self, run, todo):
+        """重跑时更新上次写入的报告（如AI失败时的基础报告），不重复创建"""
+        existing = run.result_todo
+        if existing is None or existing.is_deleted:
+            return todo
+        existing.title = todo.title
+        existing.description = todo.description
+        existing.priority = todo.priority
+        existing.updated_at = timezone.now()
+        return existing
+    
+    def flush_results(self):
+        """报告和执行记录在同一事务中写入，执行记录标记为完成时报告一定已经存在"""
+        if not self.pending_results:
+            return
+        new_todos = [todo for _, todo in self.pending_results if todo is not None and todo.pk is None]
+        existing_todos = [todo for _, todo in self.pending_results if todo is not None and todo.pk is not None]
+        now = timezone.now()
+        runs = []
+        with transaction.atomic():
+            Todo.objects.bulk_create(new_todos)
+            if existing_todos:
+                Todo.objects.bulk_update(existing_todos, ['title', 'description', 'priority', 'updated_at'])
+            for run, todo in self.pending_results:
+                if todo is not None:
+                    run.result_todo = todo
+                run.claim_token = ''
+                run.finished_at = now
+                run.updated_at = now
+                runs.append(run)
+            DailyReviewRun.objects.bulk_update(runs, RUN_RESULT_FIELDS)
+        self.pending_results = []
+    
+    def build_review_todo(self, user, summary, review_content):
+        """构建每日回顾报告todo（重复由执行记录避免）"""
+        return Todo(
             created_by=user,
             title=f"每日回顾报告 - {summary['date']}",
             description=review_content,
@@ -143,11 +340,9 @@ class Command(BaseCommand):
             priority='medium',
             status='pending'
         )
-        
-        return True
     
-    def generate_inactive_user_reminder(self, user, target_date, test_mode=False):
-        """为无活动用户生成提醒报告"""
+    def build_inactive_user_reminder(self, user, target_date, test_mode=False):
+        """为无活动用户构建提醒报告"""
         date_str = target_date.strftime('%Y年%m月%d日')
         
         reminder_content = f"""📅 **每日回顾报告 - {date_str}**\n\n🔍 **活动概览**\n今日暂无任务活动记录，系统未检测到新增或修改的任务。\n\n💡 **温馨提醒**\n为了更好地管理您的工作和生活，建议您：\n• 每日至少记录1-2个重要任务或想法\n• 定期回顾和更新现有任务状态\n• 利用不同任务类型（记录、需求、任务、故障）来分类管理\n\n🎯 **行动建议**\n明日可以尝试：\n• 记录今日的工作总结或学习心得\n• 规划明日的重要任务和目标\n• 整理待处理的事项和想法\n\n😊 **保持习惯**\n每日使用任务管理系统，让生活更有条理，工作更高效！\n\n*系统自动生成的提醒报告*"""
@@ -155,8 +350,7 @@ class Command(BaseCommand):
         if test_mode:
             self.stdout.write(f'📝 Reminder for {user.username}: {reminder_content[:100]}...')
         
-        # 直接创建新的提醒报告（移除重复检查）
-        Todo.objects.create(
+        return Todo(
             created_by=user,
             title=f"每日回顾报告 - {date_str}",
             description=reminder_content,
@@ -165,39 +359,64 @@ class Command(BaseCommand):
             status='pending'
         )
     
-    def build_todo_summary(self, new_todos, target_date):
-        """构建todo数据摘要"""
-        summary = {
-            'date': target_date.strftime('%Y年%m月%d日'),
-            'new_count': new_todos.count(),
-            'new_todos': [],
-            'type_stats': {},
-            'priority_stats': {}
-        }
-        
-        # 统计类型分布
-        for todo in new_todos:
-            todo_type = todo.get_todo_type_display()
-            summary['type_stats'][todo_type] = summary['type_stats'].get(todo_type, 0) + 1
-        
-        # 统计优先级分布
-        for todo in new_todos:
-            priority = todo.get_priority_display() if todo.priority else '无'
-            summary['priority_stats'][priority] = summary['priority_stats'].get(priority, 0) + 1
-        
-        # 新增todos详情（限制10个）
-        for todo in new_todos[:10]:
-            summary['new_todos'].append({
-                'title': todo.title,
-                'type': todo.get_todo_type_display(),
-                'description': todo.description[:100] if todo.description else '',
-                'priority': todo.get_priority_display() if todo.priority else '无'
+    def build_todo_summaries(self, users, start_of_day, end_of_day, target_date):
+        """
+        一次性为所有用户构建todo数据摘要，返回 {user_id: summary}，当天无新增的用户不在其中。
+        
+        类型/优先级分布用一条分组聚合查询，新增todos详情用一条窗口函数查询取每个用户前10条，
+        查询数量与用户数无关。
+        """
+        new_todos = Todo.objects.filter(
+            created_by__in=users,
+            created_at__range=[start_of_day, end_of_day],
+            is_deleted=False
+        )
+        type_names = TYPE_LABELS
+        priority_names = PRIORITY_LABELS
+        date_str = target_date.strftime('%Y年%m月%d日')
+        summaries = {}
+        
+        # 统计类型和优先级分布
+        distribution = new_todos.order_by().values('created_by', 'todo_type', 'priority').annotate(count=Count('id'))
+        for row in distribution:
+            summary = summaries.setdefault(row['created_by'], {
+                'date': date_str,
+                'new_count': 0,
+                'new_todos': [],
+                'type_stats': {},
+                'priority_stats': {}
+            })
+            todo_type = type_names.get(row['todo_type'], row['todo_type'])
+            priority = priority_names.get(row['priority'], row['priority']) if row['priority'] else '无'
+            summary['new_count'] += row['count']
+            summary['type_stats'][todo_type] = summary['type_stats'].get(todo_type, 0) + row['count']
+            summary['priority_stats'][priority] = summary['priority_stats'].get(priority, 0) + row['count']
+        
+        # 新增todos详情（每个用户限制10个，与列表相同按优先级、创建时间倒序）
+        details = new_todos.annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F('created_by')],
+                order_by=[F('priority_rank').asc(), F('created_at').desc()]
+            )
+        ).filter(row_number__lte=10).order_by('created_by', 'row_number').values(
+            'created_by', 'title', 'todo_type', 'description', 'priority'
+        )
+        for todo in details:
+            summaries[todo['created_by']]['new_todos'].append({
+                'title': todo['title'],
+                'type': type_names.get(todo['todo_type'], todo['todo_type']),
+                'description': todo['description'][:100] if todo['description'] else '',
+                'priority': priority_names.get(todo['priority'], todo['priority']) if todo['priority'] else '无'
             })
         
-        return summary
+        return summaries
     
-    def generate_ai_review(self, client, summary, test_mode=False):
-        """生成AI回顾报告"""
+    def generate_ai_review(self, provider, summary, test_mode=False):
+        """
+        生成AI回顾报告，返回 {'content': 报告内容, 'metrics': {'error', 'latency_ms', 'usage'}}；
+        调用失败时内容为基础报告，error 为失败原因。
+        """
         prompt = f"""
 你是一个专业的个人效率分析师。请基于以下用户的todo活动数据，生成一份简洁的每日回顾报告（严格控制在300字以内）。
 
@@ -221,17 +440,22 @@ class Command(BaseCommand):
 请用温暖、专业的语调，提供实用的洞察。严格控制在300字以内，使用emoji让报告更生动。
 """
         
+        metrics = {'error': '', 'latency_ms': None, 'usage': None}
         try:
             if test_mode:
-                self.stdout.write('🤖 Calling Gemini API...')
+                self.stdout.write('🤖 Calling LLM API...')
             
-            response = client.models.generate_content(
-                model="gemini-2.5-pro",
-                contents=prompt
-            )
+            # 限流后调用，临时性错误按指数退避重试；耗时只统计最后一次调用
+            def call():
+                self.rate_limiter.acquire()
+                call_started = time.monotonic()
+                try:
+                    return provider.generate_with_usage(prompt)
+                finally:
+                    metrics['latency_ms'] = int((time.monotonic() - call_started) * 1000)
             
             # 确保返回的内容有适当的换行格式
-            content = response.text
+            content, metrics['usage'] = call_with_retry(call, provider.is_transient, max_retries=self.max_retries)
             # 如果AI返回的内容没有足够的换行，我们手动优化格式
             if content.count('\n') < 4:  # 如果换行符少于4个，说明格式可能有问题
                 # 在每个维度标题前添加换行
@@ -241,7 +465,7 @@ class Command(BaseCommand):
                 content = content.replace('**💡', '\n**💡')
                 content = content.replace('**😊', '\n**😊')
             
-            return content
+            return {'content': content, 'metrics': metrics}
             
         except Exception as e:
             error_msg = f"AI报告生成失败：{str(e)}"
@@ -249,4 +473,5 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR(f'🤖 AI Error: {error_msg}'))
             
             # 返回格式化的默认报告
-            return f"""📊 **每日回顾报告 - {summary['date']}**\n\n📈 **效率评估**\n今日新增{summary['new_count']}个任务，修改{summary['modified_count']}个任务。任务处理节奏{'较为活跃' if summary['new_count'] + summary['modified_count'] > 5 else '相对平稳'}。\n\n🎯 **成就亮点**\n{'完成了多项任务的创建和更新，保持了良好的任务管理习惯' if summary['new_count'] > 0 else '专注于现有任务的优化和调整'}。\n\n⚠️ **关注问题**\n{'任务数量较多，注意合理安排优先级' if summary['new_count'] > 10 else '建议保持当前的工作节奏'}。\n\n💡 **改进建议**\n明日可以关注任务的完成情况，适当调整工作重点。\n\n😊 **情绪状态**\n从任务管理模式看，工作状态积极主动，建议保持。\n\n*注：AI分析服务暂时不可用，以上为基础分析报告。*"""
\ No newline at end of file
+            metrics['error'] = error_msg
+            return {'content': f"""📊 **每日回顾报告 - {summary['date']}**\n\n📈 **效率评估**\n今日新增{summary['new_count']}个任务。任务处理节奏{'较为活跃' if summary['new_count'] > 5 else '相对平稳'}。\n\n🎯 **成就亮点**\n{'完成了多项任务的创建和更新，保持了良好的任务管理习惯' if summary['new_count'] > 0 else '专注于现有任务的优化和调整'}。\n\n⚠️ **关注问题**\n{'任务数量较多，注意合理安排优先级' if summary['new_count'] > 10 else '建议保持当前的工作节奏'}。\n\n💡 **改进建议**\n明日可以关注任务的完成情况，适当调整工作重点。\n\n😊 **情绪状态**\n从任务管理模式看，工作状态积极主动，建议保持。\n\n*注：AI分析服务暂时不可用，以上为基础分析报告。*""", 'metrics': metrics}
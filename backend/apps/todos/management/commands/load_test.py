@@ -0,0 +1,84 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'HTTP load test against a running server (runserver or gunicorn). '
+        'Requests are authenticated as --username with a freshly issued JWT.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server base URL')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Endpoint to request, repeatable (default: /api/todos/)')
+        parser.add_argument('--username', required=True, help='User the requests are sent as')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client threads')
+        parser.add_argument('--duration', type=float, default=10, help='Test duration in seconds')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} not found")
+
+        token = str(RefreshToken.for_user(user).access_token)
+        base_url = options['url'].rstrip('/')
+        paths = options['paths'] or ['/api/todos/']
+        deadline = time.perf_counter() + options['duration']
+        lock = threading.Lock()
+        latencies = []
+        errors = []
+
+        def client(index):
+            session = requests.Session()
+            session.headers['Authorization'] = f'Bearer {token}'
+            # 各线程错开起始路径，多个接口交替请求
+            n = index
+            while time.perf_counter() < deadline:
+                url = base_url + paths[n % len(paths)]
+                n += 1
+                started = time.perf_counter()
+                try:
+                    response = session.get(url, timeout=30)
+                    ok = response.status_code < 400
+                    error = None if ok else f'{response.status_code} {url}'
+                except requests.RequestException as e:
+                    ok, error = False, f'{type(e).__name__} {url}'
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors.append(error)
+
+        self.stdout.write(
+            f"🚀 {options['concurrency']} client(s) x {options['duration']:g}s against {base_url} {', '.join(paths)}"
+        )
+        wall_started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(client, range(options['concurrency'])))
+        wall_time = time.perf_counter() - wall_started
+
+        latencies.sort()
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(f'📊 Load Test Summary:')
+        self.stdout.write(f'   ✅ Successful requests: {len(latencies)}')
+        self.stdout.write(f'   ❌ Failed requests: {len(errors)}')
+        self.stdout.write(f'   📈 Requests/sec: {len(latencies) / wall_time:.1f}')
+        if latencies:
+            p95 = max(int(len(latencies) * 0.95) - 1, 0)
+            self.stdout.write(
+                f'   🕐 Latency p50/p95: {statistics.median(latencies) * 1000:.1f}ms / {latencies[p95] * 1000:.1f}ms'
+            )
+        for error in sorted(set(errors))[:5]:
+            self.stdout.write(f'   - {error}')
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from backend.apps.todos.models import UserTodoStats
+from backend.apps.todos.stats import COUNTER_FIELDS, compute_todo_stats, save_todo_stats
+
+
+class Command(BaseCommand):
+    help = 'Recount per-user todo stats from the todo table and fix any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            action='append',
+            help='Rebuild stats for this user ID only (can be repeated)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted users without writing',
+        )
+
+    def handle(self, *args, **options):
+        stats = compute_todo_stats(options['user_id'])
+        existing = {
+            row['user_id']: row
+            for row in UserTodoStats.objects.filter(user_id__in=list(stats)).values('user_id', *COUNTER_FIELDS)
+        }
+
+        drifted = {}
+        for user_id, counts in stats.items():
+            current = existing.get(user_id)
+            if current is None:
+                drifted[user_id] = counts
+                self.stdout.write(f'➕ User {user_id}: stats row missing')
+                continue
+            diff = {field: (current[field], count) for field, count in counts.items() if current[field] != count}
+            if diff:
+                drifted[user_id] = counts
+                changes = ', '.join(f'{field} {old} → {new}' for field, (old, new) in diff.items())
+                self.stdout.write(self.style.WARNING(f'⚠️  User {user_id}: {changes}'))
+
+        if drifted and not options['dry_run']:
+            save_todo_stats(drifted)
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(f'📊 Checked {len(stats)} user(s), {len(drifted)} drifted')
+        if options['dry_run']:
+            self.stdout.write('🔍 Dry run, nothing written')
+        elif drifted:
+            self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt stats for {len(drifted)} user(s)'))
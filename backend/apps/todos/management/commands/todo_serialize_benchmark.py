@@ -0,0 +1,89 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend.apps.todos.listing import build_todo_list, parse_fields
+from backend.apps.todos.models import Todo
+from backend.apps.todos.serializers import TodoSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark of TodoSerializer(many=True) vs the lean list builder per-row cost on in-memory todos (no database queries)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Todos per serialization')
+        parser.add_argument('--iterations', type=int, default=5, help='Number of timed serializations')
+        parser.add_argument('--fields', default='id,title,status,priority',
+                            help='Sparse fieldset for the lean builder comparison')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        user = User(id=1, username='bench', nickname='benchmark')
+        now = timezone.now()
+        types = [todo_type for todo_type, _ in Todo.TYPE_CHOICES]
+        priorities = [priority for priority, _ in Todo.PRIORITY_CHOICES]
+
+        todos = []
+        for i in range(rows):
+            todo_type = types[i % len(types)]
+            todo = Todo(
+                id=i + 1,
+                title=f'bench {i}',
+                todo_type=todo_type,
+                priority=priorities[i % len(priorities)],
+                created_by=user,
+                created_at=now,
+                updated_at=now,
+            )
+            todo.status = todo.get_default_status_for_type(todo_type)
+            # 子任务数预先填好，只测量序列化本身
+            todo._sub_todos_count = 0
+            todos.append(todo)
+
+        # 精简路径的输入是 values() 行，子任务数查询不计入
+        all_fields = parse_fields(None)
+        sparse_fields = parse_fields(options['fields'])
+        values_rows = [
+            {
+                'id': todo.id, 'title': todo.title, 'description': todo.description,
+                'completed': todo.completed, 'is_deleted': todo.is_deleted,
+                'todo_type': todo.todo_type, 'priority': todo.priority, 'status': todo.status,
+                'created_by': user.id, 'created_by__username': user.username,
+                'created_by__nickname': user.nickname, 'parent_todo_id': None,
+                'priority_rank': todo.priority_rank, 'created_at': now, 'updated_at': now,
+            }
+            for todo in todos
+        ]
+        sub_fields = {'has_sub_todos', 'sub_todos_count'}
+        all_fields = tuple(field for field in all_fields if field not in sub_fields)
+        sparse_fields = tuple(field for field in sparse_fields if field not in sub_fields)
+
+        results = [
+            ('TodoSerializer', self.measure(lambda: TodoSerializer(todos, many=True).data, options['iterations'])),
+            ('Lean builder', self.measure(lambda: build_todo_list(values_rows, all_fields), options['iterations'])),
+            (f'Lean builder ({",".join(sparse_fields)})',
+             self.measure(lambda: build_todo_list(values_rows, sparse_fields), options['iterations'])),
+        ]
+
+        baseline = results[0][1]
+        self.stdout.write('='*60)
+        self.stdout.write(f'📊 Todo Serialization Benchmark ({rows} rows x {options["iterations"]}):')
+        for label, elapsed in results:
+            self.stdout.write(f'   🔹 {label}')
+            self.stdout.write(f'      🕐 Per list: {elapsed * 1000:.1f}ms (median)')
+            self.stdout.write(f'      📈 Per row: {elapsed / rows * 1e6:.1f}µs ({baseline / elapsed:.1f}x)')
+
+    def measure(self, run, iterations):
+        """预热一次后计时，返回中位数（秒）"""
+        run()
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
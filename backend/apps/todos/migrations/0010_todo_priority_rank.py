@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:19
+
+from django.db import migrations, models
+
+
+PRIORITY_WEIGHTS = {
+    'high': 1,
+    'medium': 2,
+    'low': 3,
+    'none': 4,
+}
+
+
+def backfill_priority_rank(apps, schema_editor):
+    """根据已有的priority回填priority_rank"""
+    Todo = apps.get_model('todos', 'Todo')
+    for priority, rank in PRIORITY_WEIGHTS.items():
+        Todo.objects.filter(priority=priority).update(priority_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0009_alter_todo_status_quicktaskconfig'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='todo',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=4, editable=False, help_text='数值越小优先级越高，保存时根据priority自动同步', verbose_name='优先级排序值'),
+        ),
+        migrations.RunPython(backfill_priority_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['created_by', 'is_deleted', 'todo_type', 'priority_rank', '-created_at'], name='todo_owner_type_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0010_todo_priority_rank'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='todo',
+            options={'ordering': ['priority_rank', '-created_at'], 'verbose_name': '待办事项', 'verbose_name_plural': '待办事项'},
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['created_by', 'is_deleted', 'priority_rank', '-created_at'], name='todo_owner_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['parent_todo_id', 'is_deleted', 'priority_rank', '-created_at'], name='todo_parent_rank_idx'),
+        ),
+    ]
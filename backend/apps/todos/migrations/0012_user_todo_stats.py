@@ -0,0 +1,80 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def backfill_user_todo_stats(apps, schema_editor):
+    """按现有todo为所有用户生成统计行（与 stats.compute_todo_stats 的计数规则一致）"""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Todo = apps.get_model('todos', 'Todo')
+    UserTodoStats = apps.get_model('todos', 'UserTodoStats')
+    columns = {field.name for field in UserTodoStats._meta.get_fields()}
+
+    stats = {user_id: UserTodoStats(user_id=user_id) for user_id in User.objects.values_list('pk', flat=True)}
+    groups = Todo.objects.order_by().values_list(
+        'created_by_id', 'todo_type', 'status', 'priority', 'completed', 'is_deleted'
+    ).annotate(count=Count('pk'))
+    for user_id, todo_type, status, priority, completed, is_deleted, count in groups:
+        row = stats[user_id]
+        if is_deleted:
+            row.deleted_count += count
+            continue
+        row.total_count += count
+        if completed:
+            row.completed_count += count
+        for prefix, value in (('type', todo_type), ('status', status), ('priority', priority or 'none')):
+            column = f'{prefix}_{value}_count'
+            if column in columns:
+                setattr(row, column, getattr(row, column) + count)
+    UserTodoStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('todos', '0011_todo_rank_ordering_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTodoStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='todo_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+                ('total_count', models.IntegerField(default=0, verbose_name='待办总数')),
+                ('completed_count', models.IntegerField(default=0, verbose_name='已完成数量')),
+                ('deleted_count', models.IntegerField(default=0, verbose_name='已删除数量')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('type_record_count', models.IntegerField(default=0, verbose_name='记录数量')),
+                ('type_requirement_count', models.IntegerField(default=0, verbose_name='需求数量')),
+                ('type_task_count', models.IntegerField(default=0, verbose_name='任务数量')),
+                ('type_issue_count', models.IntegerField(default=0, verbose_name='故障数量')),
+                ('status_pending_count', models.IntegerField(default=0, verbose_name='待阅数量')),
+                ('status_archived_count', models.IntegerField(default=0, verbose_name='归档数量')),
+                ('status_pending_evaluation_count', models.IntegerField(default=0, verbose_name='待评估数量')),
+                ('status_decomposed_count', models.IntegerField(default=0, verbose_name='已拆解数量')),
+                ('status_rejected_count', models.IntegerField(default=0, verbose_name='已拒绝数量')),
+                ('status_todo_count', models.IntegerField(default=0, verbose_name='待办数量')),
+                ('status_on_hold_count', models.IntegerField(default=0, verbose_name='搁置数量')),
+                ('status_cancelled_count', models.IntegerField(default=0, verbose_name='取消数量')),
+                ('status_completed_count', models.IntegerField(default=0, verbose_name='完成数量')),
+                ('status_reported_count', models.IntegerField(default=0, verbose_name='报告数量')),
+                ('status_reproduced_count', models.IntegerField(default=0, verbose_name='复现数量')),
+                ('status_fixing_count', models.IntegerField(default=0, verbose_name='修复数量')),
+                ('status_resolved_count', models.IntegerField(default=0, verbose_name='解决数量')),
+                ('status_closed_count', models.IntegerField(default=0, verbose_name='关闭数量')),
+                ('priority_high_count', models.IntegerField(default=0, verbose_name='高数量')),
+                ('priority_medium_count', models.IntegerField(default=0, verbose_name='中数量')),
+                ('priority_low_count', models.IntegerField(default=0, verbose_name='低数量')),
+                ('priority_none_count', models.IntegerField(default=0, verbose_name='无数量')),
+            ],
+            options={
+                'verbose_name': '用户待办统计',
+                'verbose_name_plural': '用户待办统计',
+            },
+        ),
+        migrations.RunPython(backfill_user_todo_stats, migrations.RunPython.noop),
+    ]
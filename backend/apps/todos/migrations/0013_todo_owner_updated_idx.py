@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0012_user_todo_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['created_by', 'updated_at'], name='todo_owner_updated_idx'),
+        ),
+    ]
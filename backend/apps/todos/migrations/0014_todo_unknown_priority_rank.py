@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+KNOWN_PRIORITIES = ['high', 'medium', 'low', 'none']
+UNKNOWN_PRIORITY_RANK = 999
+
+
+def rank_unknown_priorities_last(apps, schema_editor):
+    """0010 回填时未知优先级保留了默认值4，与"无"并列；改为排在最后（原 priority_weight 的999）"""
+    Todo = apps.get_model('todos', 'Todo')
+    Todo.objects.exclude(priority__in=KNOWN_PRIORITIES).update(priority_rank=UNKNOWN_PRIORITY_RANK)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0013_todo_owner_updated_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(rank_unknown_priorities_last, migrations.RunPython.noop),
+    ]
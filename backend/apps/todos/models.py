@@ -1,65 +1,75 @@
 from django.db import models
+from django.db.models.lookups import Exact
 from django.utils import timezone
 from django.conf import settings
 
+from . import choices
+
+def priority_rank_for(priority):
+    """priority 对应的排序值；priority 为表达式（如 F()、Case）时在数据库中按同样的权重换算"""
+    if not hasattr(priority, 'resolve_expression'):
+        return choices.PRIORITY_WEIGHTS.get(priority, choices.DEFAULT_PRIORITY_WEIGHT)
+    return models.Case(
+        *[
+            models.When(Exact(priority, value), then=models.Value(weight))
+            for value, weight in choices.PRIORITY_WEIGHTS.items()
+        ],
+        default=models.Value(choices.DEFAULT_PRIORITY_WEIGHT),
+        output_field=models.PositiveSmallIntegerField()
+    )
+
+
+class TodoQuerySet(models.QuerySet):
+    """Todo查询集：保证绕过save()的批量写入路径也同步priority_rank和用户计数"""
+    
+    def update(self, **kwargs):
+        from .stats import update_with_stats
+        # 与 save() 的 auto_now 一致，列表/详情的条件GET依赖 updated_at
+        kwargs.setdefault('updated_at', timezone.now())
+        if 'priority' in kwargs and 'priority_rank' not in kwargs:
+            kwargs['priority_rank'] = priority_rank_for(kwargs['priority'])
+        return update_with_stats(self, kwargs, super().update)
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        from .stats import objs_created
+        objs = list(objs)
+        for obj in objs:
+            obj.priority_rank = obj.priority_weight
+        created = super().bulk_create(objs, *args, **kwargs)
+        objs_created(objs, ignore_conflicts=kwargs.get('ignore_conflicts', False))
+        return created
+    
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        if 'priority' in fields:
+            for obj in objs:
+                obj.priority_rank = obj.priority_weight
+            if 'priority_rank' not in fields:
+                fields.append('priority_rank')
+        from .stats import objs_updated
+        # Django 的 bulk_update 内部调用 update()，用普通查询集执行，避免 update() 再统计一次
+        plain = models.QuerySet(model=self.model, query=self.query, using=self._db, hints=self._hints)
+        rows = plain.bulk_update(objs, fields, *args, **kwargs)
+        objs_updated(objs, fields)
+        return rows
+
+
 class Todo(models.Model):
     # Django会自动创建id字段作为主键
     # id = models.AutoField(primary_key=True)  # 这行是隐式的，不需要写出来
     
-    # 添加类型选择
-    TYPE_CHOICES = [
-        ('record', '记录'),
-        ('requirement', '需求'),
-        ('task', '任务'),
-        ('issue', '故障'),
-    ]
+    # 类型、状态、优先级选项来自 choices 模块的注册表
+    TYPE_CHOICES = choices.TYPE_CHOICES
+    STATUS_CHOICES = choices.STATUS_CHOICES  # 状态按类型区分
+    ALL_STATUS_CHOICES = choices.ALL_STATUS_CHOICES  # 所有状态（用于数据库字段定义）
+    PRIORITY_CHOICES = choices.PRIORITY_CHOICES
     
-    # 状态选择 - 根据类型动态显示
-    STATUS_CHOICES = {
-        'record': [
-            ('pending', '待阅'),
-            ('archived', '归档'),
-        ],
-        'requirement': [
-            ('pending_evaluation', '待评估'),
-            ('decomposed', '已拆解'),
-            ('rejected', '已拒绝'),
-        ],
-        'task': [
-            ('todo', '待办'),
-            ('on_hold', '搁置'),
-            ('cancelled', '取消'),
-            ('completed', '完成'),
-        ],
-        'issue': [
-            ('reported', '报告'),
-            ('reproduced', '复现'),
-            ('fixing', '修复'),
-            ('resolved', '解决'),
-            ('closed', '关闭'),
-        ]
-    }
-    
-    # 获取所有状态选择（用于数据库字段定义）
-    ALL_STATUS_CHOICES = []
-    for type_statuses in STATUS_CHOICES.values():
-        ALL_STATUS_CHOICES.extend(type_statuses)
-    
-    # 添加优先级选择
-    PRIORITY_CHOICES = [
-        ('high', '高'),
-        ('medium', '中'), 
-        ('low', '低'),
-        ('none', '无'),
-    ]
+    # 影响用户计数（UserTodoStats）的字段，顺序即 stats.todo_state() 的取值顺序
+    STATS_FIELDS = ('created_by_id', 'todo_type', 'status', 'priority', 'completed', 'is_deleted')
     
     # 优先级排序权重（数值越小优先级越高）
-    PRIORITY_WEIGHTS = {
-        'high': 1,
-        'medium': 2,
-        'low': 3,
-        'none': 4,
-    }
+    PRIORITY_WEIGHTS = choices.PRIORITY_WEIGHTS
     
     title = models.CharField(max_length=200, help_text="任务标题")
     description = models.TextField(blank=True, help_text="任务描述")
@@ -86,9 +96,14 @@ class Todo(models.Model):
     
     # 修改save方法
     def save(self, *args, **kwargs):
-        """保存时自动设置默认状态"""
+        """保存时自动设置默认状态，并同步优先级排序值"""
         if not self.status:  # 当status为空或空字符串时
             self.status = self.get_default_status_for_type(self.todo_type)
+        self.priority_rank = self.priority_weight
+        # 指定了update_fields且包含priority时，一并写入priority_rank
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'priority' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'priority_rank'}
         super().save(*args, **kwargs)
     
     # 新增优先级字段
@@ -100,6 +115,14 @@ class Todo(models.Model):
         help_text="任务优先级"
     )
     
+    # 优先级排序值（冗余存储PRIORITY_WEIGHTS，供索引排序和游标分页使用）
+    priority_rank = models.PositiveSmallIntegerField(
+        default=4,
+        editable=False,
+        verbose_name="优先级排序值",
+        help_text="数值越小优先级越高，保存时根据priority自动同步"
+    )
+    
     # 新增字段
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
@@ -121,9 +144,11 @@ class Todo(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, help_text="创建时间")
     updated_at = models.DateTimeField(auto_now=True, help_text="更新时间")
     
+    objects = TodoQuerySet.as_manager()
+    
     class Meta:
         # 按优先级排序，高优先级靠前，然后按创建时间倒序
-        ordering = ['priority', '-created_at']
+        ordering = ['priority_rank', '-created_at']
         verbose_name = "待办事项"
         verbose_name_plural = "待办事项"
         indexes = [
@@ -133,44 +158,62 @@ class Todo(models.Model):
             models.Index(fields=['parent_todo_id']),  # 父todo ID索引
             models.Index(fields=['priority']),  # 优先级索引
             models.Index(fields=['status']),  # 状态索引
+            # 中心页面列表 / 游标分页：按用户、类型过滤后按优先级、创建时间倒序扫描
+            models.Index(
+                fields=['created_by', 'is_deleted', 'todo_type', 'priority_rank', '-created_at'],
+                name='todo_owner_type_rank_idx'
+            ),
+            # 不按类型过滤的列表、可引用todo列表
+            models.Index(
+                fields=['created_by', 'is_deleted', 'priority_rank', '-created_at'],
+                name='todo_owner_rank_idx'
+            ),
+            # 列表条件GET的验证值：按用户统计数量和最新更新时间
+            models.Index(fields=['created_by', 'updated_at'], name='todo_owner_updated_idx'),
+            # 子任务列表
+            models.Index(
+                fields=['parent_todo_id', 'is_deleted', 'priority_rank', '-created_at'],
+                name='todo_parent_rank_idx'
+            ),
         ]
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 记录加载时的计数相关字段，保存时据此计算增量；字段未全部加载时保存会重新统计
+        if all(field in field_names for field in cls.STATS_FIELDS):
+            instance._stats_state = tuple(getattr(instance, field) for field in cls.STATS_FIELDS)
+        return instance
+    
     @property
     def status_display(self):
         """获取状态显示名称"""
-        all_choices = dict(self.ALL_STATUS_CHOICES)
-        return all_choices.get(self.status, self.status)
+        return choices.STATUS_LABELS.get(self.status, self.status)
     
     @property
     def type_display(self):
-        return dict(self.TYPE_CHOICES).get(self.todo_type, self.todo_type)
+        return choices.TYPE_LABELS.get(self.todo_type, self.todo_type)
     
     @property
     def priority_display(self):
-        return dict(self.PRIORITY_CHOICES).get(self.priority, self.priority)
+        return choices.PRIORITY_LABELS.get(self.priority, self.priority)
     
     @property
     def priority_weight(self):
         """获取优先级权重，用于排序"""
-        return self.PRIORITY_WEIGHTS.get(self.priority, 999)
+        return choices.PRIORITY_WEIGHTS.get(self.priority, choices.DEFAULT_PRIORITY_WEIGHT)
     
     @property
     def available_statuses(self):
         """获取当前类型可用的状态选项"""
-        return self.STATUS_CHOICES.get(self.todo_type, [])
+        return choices.STATUS_CHOICES.get(self.todo_type, ())
     
     def get_default_status_for_type(self, todo_type):
         """获取指定类型的默认状态"""
-        defaults = {
-            'record': 'pending',
-            'requirement': 'pending_evaluation', 
-            'task': 'todo',
-            'issue': 'reported'
-        }
-        return defaults.get(todo_type, 'pending')
+        return choices.DEFAULT_STATUS.get(todo_type, choices.FALLBACK_STATUS)
     
     def soft_delete(self):
         """软删除"""
@@ -197,16 +240,87 @@ class Todo(models.Model):
         return Todo.objects.filter(
             parent_todo_id=self.id,
             is_deleted=False
-        ).order_by('priority', '-created_at')  # 子任务也按优先级排序
+        ).order_by('priority_rank', '-created_at')  # 子任务也按优先级排序
+    
+    @property
+    def sub_todos_count(self):
+        """未删除的子任务数；列表中先用 tree.prefetch_sub_todo_counts 批量填充，避免逐行查询"""
+        if getattr(self, '_sub_todos_count', None) is None:
+            self._sub_todos_count = Todo.objects.filter(
+                parent_todo_id=self.id,
+                is_deleted=False
+            ).count()
+        return self._sub_todos_count
     
     @property
     def has_sub_todos(self):
         """检查是否有子任务"""
-        return Todo.objects.filter(
-            parent_todo_id=self.id,
-            is_deleted=False
-        ).exists()
+        return self.sub_todos_count > 0
+
+
+class UserTodoStats(models.Model):
+    """
+    每个用户一行的待办事项计数，由 stats.py 在单条保存/删除和批量写入时增量维护，
+    统计页面直接读取，不再扫描todo表。计数偏差可用 rebuild_todo_stats 命令修正。
+
+    total/completed 及按类型、状态、优先级的计数只统计未删除的todo，deleted 为已软删除的数量。
+    按类型、状态、优先级的计数列由下方根据选项生成，列名形如 type_task_count。
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='todo_stats',
+        verbose_name="用户"
+    )
+    total_count = models.IntegerField(default=0, verbose_name="待办总数")
+    completed_count = models.IntegerField(default=0, verbose_name="已完成数量")
+    deleted_count = models.IntegerField(default=0, verbose_name="已删除数量")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+    
+    # (列名前缀, 选项)
+    DIMENSIONS = [
+        ('type', choices.TYPE_CHOICES),
+        ('status', tuple(choices.STATUS_LABELS.items())),
+        ('priority', choices.PRIORITY_CHOICES),
+    ]
+    
+    class Meta:
+        verbose_name = "用户待办统计"
+        verbose_name_plural = "用户待办统计"
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.total_count}"
+    
+    @classmethod
+    def counter_fields(cls):
+        """所有计数列名"""
+        fields = ['total_count', 'completed_count', 'deleted_count']
+        for prefix, options in cls.DIMENSIONS:
+            fields.extend(f'{prefix}_{value}_count' for value, _ in options)
+        return fields
+    
+    def as_dict(self):
+        """按维度分组的计数，供接口返回"""
+        data = {
+            'total': self.total_count,
+            'completed': self.completed_count,
+            'deleted': self.deleted_count,
+        }
+        for prefix, options in self.DIMENSIONS:
+            data[f'by_{prefix}'] = {
+                value: getattr(self, f'{prefix}_{value}_count') for value, _ in options
+            }
+        return data
+
 
+for _prefix, _choices in UserTodoStats.DIMENSIONS:
+    for _value, _label in _choices:
+        UserTodoStats.add_to_class(
+            f'{_prefix}_{_value}_count',
+            models.IntegerField(default=0, verbose_name=f"{_label}数量")
+        )
+del _prefix, _choices, _value, _label
 
 class QuickTaskConfig(models.Model):
     """快捷任务配置模型"""
@@ -231,7 +345,7 @@ class QuickTaskConfig(models.Model):
     
     todo_type = models.CharField(
         max_length=20,
-        choices=Todo.TYPE_CHOICES,
+        choices=choices.TYPE_CHOICES,
         default='record',
         verbose_name="任务类型",
         help_text="快捷任务的类型"
@@ -239,7 +353,7 @@ class QuickTaskConfig(models.Model):
     
     priority = models.CharField(
         max_length=20,
-        choices=Todo.PRIORITY_CHOICES,
+        choices=choices.PRIORITY_CHOICES,
         default='medium',
         verbose_name="优先级",
         help_text="快捷任务的优先级"
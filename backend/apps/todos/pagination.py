@@ -0,0 +1,114 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class TodoKeysetPagination(BasePagination):
+    """
+    Todo列表的游标（keyset）分页
+
+    按 (priority_rank, -created_at, -id) 排序，游标记录上一页最后一行的这三个值，
+    下一页通过 WHERE 条件直接定位（配合 todo_owner_type_rank_idx 索引），
+    不使用 OFFSET，也不会因为新插入的数据导致翻页时重复或遗漏。
+    默认不统计总数，传入 with_count=true 时才执行 COUNT 查询。
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'with_count'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    ordering = ('priority_rank', '-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ['true', '1', 'yes']:
+            self.count = queryset.count()
+
+        if position is not None:
+            rank, created_at, pk = position
+            queryset = queryset.filter(
+                Q(priority_rank__gt=rank) |
+                Q(priority_rank=rank, created_at__lt=created_at) |
+                Q(priority_rank=rank, created_at=created_at, id__lt=pk)
+            )
+
+        # 多取一条用于判断是否还有下一页
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        response_data = [
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]
+        if self.count is not None:
+            response_data.insert(0, ('count', self.count))
+        return Response(OrderedDict(response_data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = remove_query_param(self.base_url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(last))
+
+    def encode_cursor(self, todo):
+        # 列表的精简路径分页的是 values() 字典
+        if isinstance(todo, dict):
+            payload = [todo['priority_rank'], todo['created_at'].isoformat(), todo['id']]
+        else:
+            payload = [todo.priority_rank, todo.created_at.isoformat(), todo.id]
+        return base64.urlsafe_b64encode(json.dumps(payload).encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            rank, created_at, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError
+            return int(rank), created_at, int(pk)
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound('无效的分页游标')
+
+    def to_html(self):
+        return ''
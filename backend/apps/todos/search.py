@@ -0,0 +1,290 @@
+"""
+Todo全文检索
+
+- SQLite：FTS5 外部内容虚拟表 todos_todo_fts（trigram 分词，中文按3字切片），
+  由 todos_todo 上的触发器同步，queryset.update() 等批量写入同样生效；
+  bm25 排序，highlight/snippet 生成高亮片段。
+- PostgreSQL：对 title/description 建 tsvector 表达式 GIN 索引，ts_rank 排序，
+  ts_headline 生成高亮片段。分词配置由 settings.TODO_SEARCH_CONFIG 指定，
+  默认 'simple'；安装 zhparser 等中文分词扩展后可改为对应配置。
+
+trigram 无法匹配少于3个字符的词，此时以及数据库不支持全文检索时退回 icontains。
+列表的 ?search= 参数按整个输入做短语匹配（与原来的 icontains 一致），
+检索接口 search_todos 按空白拆分为多个词，要求全部命中。
+
+高亮片段是HTML：数据库（及 icontains 退回路径）先用私用区字符标记命中词，
+再对原文做HTML转义，最后把标记替换为 <mark> 标签，用户输入的标题、描述不会作为标签输出。
+"""
+import logging
+import re
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, ProgrammingError, connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'todos_todo_fts'
+TRIGRAM_MIN_LENGTH = 3
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+# 转义前标记命中词的私用区字符
+MARK_START = '\ue000'
+MARK_END = '\ue001'
+SNIPPET_LENGTH = 64
+
+SQLITE_TRIGGERS = {
+    'todos_todo_fts_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS todos_todo_fts_ai AFTER INSERT ON todos_todo BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    """,
+    'todos_todo_fts_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS todos_todo_fts_ad AFTER DELETE ON todos_todo BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    """,
+    'todos_todo_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS todos_todo_fts_au AFTER UPDATE OF title, description ON todos_todo BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    """,
+}
+
+# 数据库别名 -> 全文索引是否可用
+_available = {}
+
+
+def _pg_config():
+    config = getattr(settings, 'TODO_SEARCH_CONFIG', 'simple')
+    if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_.]*', config):
+        raise ValueError(f'无效的全文检索配置: {config}')
+    return config
+
+
+def _pg_document(config):
+    return (
+        f"setweight(to_tsvector('{config}', coalesce(todos_todo.title, '')), 'A') || "
+        f"setweight(to_tsvector('{config}', coalesce(todos_todo.description, '')), 'B')"
+    )
+
+
+def ensure_search_index(sender=None, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    创建（或补齐）全文索引，作为 post_migrate 回调注册。
+
+    SQLite 在部分 AlterField/AddField 迁移中会重建 todos_todo 表，表上的触发器随之丢失，
+    因此每次迁移后都检查一遍，发现缺失时重新创建并 rebuild 索引。
+    """
+    connection = connections[using]
+    _available[using] = False
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND tbl_name = 'todos_todo')",
+                    [FTS_TABLE]
+                )
+                existing = {row[0] for row in cursor.fetchall()}
+                if existing.issuperset({FTS_TABLE, *SQLITE_TRIGGERS}):
+                    _available[using] = True
+                    return
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    f"title, description, content='todos_todo', content_rowid='id', tokenize='trigram')"
+                )
+                for sql in SQLITE_TRIGGERS.values():
+                    cursor.execute(sql)
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            elif connection.vendor == 'postgresql':
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS todos_todo_search_idx ON todos_todo "
+                    f"USING gin (({_pg_document(_pg_config())}))"
+                )
+            else:
+                return
+        _available[using] = True
+    except (OperationalError, ProgrammingError) as e:
+        logger.warning(f"Todo全文索引不可用，搜索将退回icontains: {e}")
+
+
+def is_available(using=DEFAULT_DB_ALIAS):
+    """当前数据库是否可以使用全文索引"""
+    if using not in _available:
+        ensure_search_index(using=using)
+    return _available[using]
+
+
+def _terms(query):
+    return [term for term in query.split() if term]
+
+
+def _fts5_query(terms):
+    """每个词作为短语加引号，避免用户输入被解析为FTS5语法"""
+    return ' AND '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def _use_index(queryset, terms):
+    if not terms or not is_available(queryset.db):
+        return False
+    if connections[queryset.db].vendor == 'sqlite':
+        return all(len(term) >= TRIGRAM_MIN_LENGTH for term in terms)
+    return True
+
+
+def _icontains_filter(terms):
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return condition
+
+
+def _match(queryset, terms, phrase=False):
+    """terms 全部命中的过滤；phrase 为 True 时 terms 只有一个短语（PostgreSQL 按词序匹配）"""
+    if not _use_index(queryset, terms):
+        return queryset.filter(_icontains_filter(terms))
+
+    if connections[queryset.db].vendor == 'sqlite':
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [_fts5_query(terms)]
+        ))
+
+    config = _pg_config()
+    to_tsquery = 'phraseto_tsquery' if phrase else 'plainto_tsquery'
+    return queryset.filter(RawSQL(
+        f"({_pg_document(config)}) @@ {to_tsquery}('{config}', %s)",
+        [' '.join(terms)],
+        output_field=BooleanField()
+    ))
+
+
+def filter_todos(queryset, query):
+    """
+    列表 ?search= 参数的过滤（不改变原有排序）。
+
+    与原来的 icontains 一样按整个输入做短语匹配，不拆分空格。SQLite 的 trigram 短语即子串匹配，
+    结果与 icontains 相同；输入少于3个字符（如常见的两字中文词）时仍是 icontains 扫描，
+    扫描范围限于当前用户的任务（按 created_by 索引过滤）。
+    """
+    if not query:
+        return queryset
+    return _match(queryset, [query], phrase=True)
+
+
+def search_todos(queryset, query, limit=20):
+    """
+    在查询集范围内检索，返回按相关度排序的命中列表：
+    [{'todo': Todo, 'rank': float|None, 'title_highlight': str, 'snippet': str}, ...]
+    rank 越大越相关；退回 icontains 时 rank 为 None。
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    if not _use_index(queryset, terms):
+        todos = queryset.filter(_icontains_filter(terms)).select_related('created_by')[:limit]
+        return [
+            {
+                'todo': todo,
+                'rank': None,
+                'title_highlight': _markup(_highlight(todo.title, terms)),
+                'snippet': _markup(_snippet(todo.description, terms)),
+            }
+            for todo in todos
+        ]
+
+    if connections[queryset.db].vendor == 'sqlite':
+        return _search_sqlite(queryset, terms, limit)
+    return _search_postgresql(queryset, terms, limit)
+
+
+def _search_sqlite(queryset, terms, limit):
+    scope_sql, scope_params = queryset.order_by().values('id').query.sql_with_params()
+    sql = (
+        f"SELECT rowid, bm25({FTS_TABLE}, 10.0, 1.0) AS score, "
+        f"highlight({FTS_TABLE}, 0, %s, %s), "
+        f"snippet({FTS_TABLE}, 1, %s, %s, '…', %s) "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid IN ({scope_sql}) "
+        f"ORDER BY score LIMIT %s"
+    )
+    # trigram 的 snippet 长度按 token（3字滑窗）计，约等于字符数
+    params = [
+        MARK_START, MARK_END,
+        MARK_START, MARK_END, SNIPPET_LENGTH,
+        _fts5_query(terms), *scope_params, limit,
+    ]
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    # 序列化需要创建者的用户名、昵称
+    todos = queryset.model.objects.using(queryset.db).select_related('created_by').in_bulk([row[0] for row in rows])
+    return [
+        {
+            # bm25 越小越相关，取反使 rank 越大越相关
+            'todo': todos[pk],
+            'rank': -score,
+            'title_highlight': _markup(title_highlight),
+            'snippet': _markup(snippet),
+        }
+        for pk, score, title_highlight, snippet in rows
+        if pk in todos
+    ]
+
+
+def _search_postgresql(queryset, terms, limit):
+    config = _pg_config()
+    tsquery = f"plainto_tsquery('{config}', %s)"
+    headline_options = f"StartSel={MARK_START}, StopSel={MARK_END}"
+    query = ' '.join(terms)
+    todos = _match(queryset, terms).select_related('created_by').annotate(
+        search_rank=RawSQL(f"ts_rank(({_pg_document(config)}), {tsquery})", [query], output_field=FloatField()),
+        title_highlight=RawSQL(
+            f"ts_headline('{config}', todos_todo.title, {tsquery}, %s)",
+            [query, f'{headline_options}, HighlightAll=true']
+        ),
+        snippet=RawSQL(
+            f"ts_headline('{config}', todos_todo.description, {tsquery}, %s)",
+            [query, f'{headline_options}, MaxWords=35, MinWords=15, MaxFragments=2']
+        ),
+    ).order_by('-search_rank', '-created_at')[:limit]
+    return [
+        {
+            'todo': todo,
+            'rank': todo.search_rank,
+            'title_highlight': _markup(todo.title_highlight),
+            'snippet': _markup(todo.snippet),
+        }
+        for todo in todos
+    ]
+
+
+def _markup(text):
+    """HTML转义后把命中标记替换为 <mark> 标签"""
+    return str(escape(text or '')).replace(MARK_START, HIGHLIGHT_START).replace(MARK_END, HIGHLIGHT_END)
+
+
+def _highlight(text, terms):
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    return pattern.sub(lambda m: f'{MARK_START}{m.group(0)}{MARK_END}', text)
+
+
+def _snippet(text, terms):
+    """截取第一个命中词附近的片段并高亮"""
+    if not text:
+        return ''
+    lowered = text.lower()
+    positions = [lowered.find(term.lower()) for term in terms]
+    positions = [pos for pos in positions if pos >= 0]
+    start = max(min(positions) - SNIPPET_LENGTH // 4, 0) if positions else 0
+    end = start + SNIPPET_LENGTH
+    fragment = text[start:end]
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if end < len(text) else ''
+    return prefix + _highlight(fragment, terms) + suffix
@@ -1,6 +1,67 @@
+from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
+from .choices import is_valid_status
 from .models import Todo, QuickTaskConfig
 
+
+class TodoListSerializer(serializers.ListSerializer):
+    """
+    TodoSerializer(many=True) 使用的列表序列化器，批量写入一次完成：
+    - 新建：bulk_create；
+    - 更新：instance 传入预先查出的任务列表，每项数据按 id 匹配对应任务后校验，bulk_update。
+    """
+    
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+        
+        if not hasattr(self, '_instances_by_id'):
+            self._instances_by_id = {obj.id: obj for obj in self.instance}
+        try:
+            instance = self._instances_by_id[int(data['id'])]
+        except (KeyError, TypeError, ValueError):
+            raise serializers.ValidationError({'id': ['任务不存在或无权操作']})
+        self.child.instance = instance
+        self.child.initial_data = data
+        try:
+            validated = super().run_child_validation(data)
+        finally:
+            self.child.instance = None
+        validated['instance'] = instance
+        return validated
+    
+    def to_representation(self, data):
+        # 一次查询填充整批任务的子任务数，has_sub_todos 不再逐行查询
+        from .tree import prefetch_sub_todo_counts
+        iterable = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        prefetch_sub_todo_counts(iterable)
+        return super().to_representation(iterable)
+    
+    def create(self, validated_data):
+        todos = [Todo(**attrs) for attrs in validated_data]
+        for todo in todos:
+            # bulk_create 不调用 save()，按类型补默认状态
+            if not todo.status:
+                todo.status = todo.get_default_status_for_type(todo.todo_type)
+        return Todo.objects.bulk_create(todos)
+    
+    def update(self, instance, validated_data):
+        fields = {'updated_at'}
+        todos = []
+        now = timezone.now()
+        for attrs in validated_data:
+            todo = attrs.pop('instance')
+            for field, value in attrs.items():
+                setattr(todo, field, value)
+                fields.add(field)
+            todo.updated_at = now
+            todos.append(todo)
+        if todos:
+            Todo.objects.bulk_update(todos, sorted(fields))
+        return todos
+
+
 class TodoSerializer(serializers.ModelSerializer):
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     created_by_nickname = serializers.CharField(source='created_by.nickname', read_only=True)
@@ -8,6 +69,8 @@ class TodoSerializer(serializers.ModelSerializer):
     type_display = serializers.CharField(read_only=True)
     priority_display = serializers.CharField(read_only=True)  # 新增优先级显示
     available_statuses = serializers.SerializerMethodField()  # 新增：可用状态选项
+    has_sub_todos = serializers.BooleanField(read_only=True)
+    sub_todos_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Todo
@@ -17,9 +80,11 @@ class TodoSerializer(serializers.ModelSerializer):
             'priority', 'priority_display',  # 新增优先级字段
             'status', 'status_display', 'available_statuses',  # 新增状态相关字段
             'created_by', 'created_by_username', 'created_by_nickname',
+            'parent_todo_id', 'has_sub_todos', 'sub_todos_count',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
+        list_serializer_class = TodoListSerializer
     
     def get_available_statuses(self, obj):
         """获取当前todo类型的可用状态选项"""
@@ -34,11 +99,26 @@ class TodoSerializer(serializers.ModelSerializer):
         """验证状态值是否有效"""
         if self.instance:
             # 更新时验证状态是否在可用选项中
-            available = dict(self.instance.available_statuses)
-            if value not in available:
+            if not is_valid_status(self.instance.todo_type, value):
                 raise serializers.ValidationError(f'无效的状态值: {value}')
         return value
     
+    def validate_parent_todo_id(self, value):
+        """父任务必须存在、未删除、属于同一用户，且不能是自己或自己的子孙任务（避免形成环）"""
+        if value is None:
+            return value
+        parent = Todo.objects.filter(pk=value, is_deleted=False).only('id', 'created_by_id').first()
+        if parent is None:
+            raise serializers.ValidationError('父任务不存在')
+        owner_id = self.instance.created_by_id if self.instance else self.context['request'].user.id
+        if parent.created_by_id != owner_id:
+            raise serializers.ValidationError('父任务必须属于同一用户')
+        if self.instance and self.instance.parent_todo_id != value:
+            from .tree import get_subtree_ids
+            if value in get_subtree_ids(self.instance.pk):
+                raise serializers.ValidationError('不能把任务挂到自己或自己的子任务下')
+        return value
+    
     def validate(self, attrs):
         # 防止修改已删除的任务
         if self.instance and self.instance.is_deleted:
@@ -46,10 +126,7 @@ class TodoSerializer(serializers.ModelSerializer):
         
         # 创建时验证状态
         if not self.instance and 'status' in attrs and 'todo_type' in attrs:
-            from .models import Todo
-            temp_todo = Todo(todo_type=attrs['todo_type'])
-            available = dict(temp_todo.available_statuses)
-            if attrs['status'] not in available:
+            if not is_valid_status(attrs['todo_type'], attrs['status']):
                 raise serializers.ValidationError(f'无效的状态值: {attrs["status"]}')
         
         return attrs
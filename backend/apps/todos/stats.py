@@ -0,0 +1,205 @@
+"""
+用户待办计数（UserTodoStats）的增量维护
+
+- 单条 save()/delete()：post_save/post_delete 信号根据加载时记录的字段值计算增量；
+- 批量 update()/bulk_create()/bulk_update()：TodoQuerySet 在写入前后计算增量，
+  update() 先按统计相关字段分组计数（一条聚合查询），写入后按新值整体平移；
+- 无法确定原值时（如 F() 表达式、延迟加载的字段）重新统计受影响用户。
+
+增量通过 F() 原子更新计数列；用户还没有统计行时改为重新统计该用户。
+"""
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Todo, UserTodoStats
+
+COUNTER_FIELDS = UserTodoStats.counter_fields()
+# 修改后会影响计数的字段
+TRACKED_FIELDS = frozenset(Todo.STATS_FIELDS) | {'created_by'}
+
+
+def todo_state(todo):
+    return tuple(getattr(todo, field) for field in Todo.STATS_FIELDS)
+
+
+def counters_for(state):
+    """一条todo（按 Todo.STATS_FIELDS 的取值）计入的计数列"""
+    _, todo_type, status, priority, completed, is_deleted = state
+    if is_deleted:
+        return ['deleted_count']
+    fields = ['total_count']
+    if completed:
+        fields.append('completed_count')
+    for prefix, value in (('type', todo_type), ('status', status), ('priority', priority or 'none')):
+        field = f'{prefix}_{value}_count'
+        if field in COUNTER_FIELDS:
+            fields.append(field)
+    return fields
+
+
+class StatsDelta:
+    """按用户累积计数增量，apply() 时每个用户一条UPDATE"""
+
+    def __init__(self):
+        self.changes = defaultdict(Counter)
+
+    def add(self, state, count=1):
+        for field in counters_for(state):
+            self.changes[state[0]][field] += count
+
+    def apply(self, rebuild_missing=True):
+        """
+        rebuild_missing：没有统计行的用户是否重新统计；
+        删除路径传 False，级联删除用户时不会为其重新创建统计行。
+        """
+        missing = []
+        now = timezone.now()
+        for user_id, counter in self.changes.items():
+            values = {field: F(field) + count for field, count in counter.items() if count}
+            if not values:
+                continue
+            if not UserTodoStats.objects.filter(user_id=user_id).update(updated_at=now, **values):
+                missing.append(user_id)
+        if missing and rebuild_missing:
+            rebuild_todo_stats(missing)
+        self.changes.clear()
+
+
+def compute_todo_stats(user_ids=None):
+    """从todo表重新统计，返回 {user_id: {计数列: 数量}}；user_ids 为空时统计所有用户"""
+    todos = Todo.objects.order_by()
+    if user_ids is None:
+        user_ids = get_user_model().objects.values_list('pk', flat=True)
+    else:
+        todos = todos.filter(created_by_id__in=user_ids)
+
+    delta = StatsDelta()
+    for *state, count in todos.values_list(*Todo.STATS_FIELDS).annotate(count=Count('pk')):
+        delta.add(tuple(state), count)
+    return {
+        user_id: {field: delta.changes[user_id][field] for field in COUNTER_FIELDS}
+        for user_id in user_ids
+    }
+
+
+def save_todo_stats(stats, batch_size=500):
+    """写入 compute_todo_stats() 的结果，已有的统计行整体覆盖"""
+    UserTodoStats.objects.bulk_create(
+        [UserTodoStats(user_id=user_id, **counts) for user_id, counts in stats.items()],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=COUNTER_FIELDS + ['updated_at']
+    )
+
+
+def rebuild_todo_stats(user_ids=None):
+    """重新统计并写入指定用户（默认所有用户）的计数"""
+    stats = compute_todo_stats(user_ids)
+    save_todo_stats(stats)
+    return len(stats)
+
+
+def get_user_todo_stats(user):
+    """读取用户的统计行，不存在时先统计"""
+    try:
+        return UserTodoStats.objects.get(user_id=user.pk)
+    except UserTodoStats.DoesNotExist:
+        rebuild_todo_stats([user.pk])
+        return UserTodoStats.objects.get(user_id=user.pk)
+
+
+def todo_saved(sender, instance, created, update_fields=None, **kwargs):
+    """post_save：按加载时与当前的字段值计算增量"""
+    if update_fields is not None and not TRACKED_FIELDS.intersection(update_fields):
+        return
+    new_state = todo_state(instance)
+    old_state = getattr(instance, '_stats_state', None)
+    if created:
+        delta = StatsDelta()
+        delta.add(new_state)
+        delta.apply()
+    elif old_state is None:
+        rebuild_todo_stats([instance.created_by_id])
+    elif old_state != new_state:
+        delta = StatsDelta()
+        delta.add(old_state, -1)
+        delta.add(new_state)
+        delta.apply()
+    instance._stats_state = new_state
+
+
+def todo_deleted(sender, instance, **kwargs):
+    """post_delete：物理删除时扣减计数（queryset.delete() 也会逐条触发）"""
+    delta = StatsDelta()
+    delta.add(getattr(instance, '_stats_state', None) or todo_state(instance), -1)
+    delta.apply(rebuild_missing=False)
+
+
+def update_with_stats(queryset, values, update):
+    """TodoQuerySet.update() 的计数维护，update 为实际执行写入的函数"""
+    changed = TRACKED_FIELDS.intersection(values)
+    if not changed:
+        return update(**values)
+
+    with transaction.atomic(using=queryset.db):
+        if any(hasattr(values[field], 'resolve_expression') for field in changed):
+            # 新值由数据库计算，写入后重新统计受影响用户
+            user_ids = set(queryset.values_list('created_by_id', flat=True))
+            rows = update(**values)
+            rebuild_todo_stats(list(user_ids))
+            return rows
+
+        groups = list(
+            queryset.order_by().values_list(*Todo.STATS_FIELDS).annotate(count=Count('pk'))
+        )
+        rows = update(**values)
+
+        overrides = {}
+        for field in changed:
+            value = values[field]
+            if field == 'created_by':
+                field, value = 'created_by_id', getattr(value, 'pk', value)
+            overrides[Todo.STATS_FIELDS.index(field)] = value
+
+        delta = StatsDelta()
+        for *state, count in groups:
+            delta.add(tuple(state), -count)
+            for index, value in overrides.items():
+                state[index] = value
+            delta.add(tuple(state), count)
+        delta.apply()
+        return rows
+
+
+def objs_created(objs, ignore_conflicts=False):
+    """bulk_create() 之后计入新建的todo"""
+    if ignore_conflicts:
+        # 冲突被忽略的行无法区分，重新统计
+        rebuild_todo_stats(list({obj.created_by_id for obj in objs}))
+        return
+    delta = StatsDelta()
+    for obj in objs:
+        obj._stats_state = todo_state(obj)
+        delta.add(obj._stats_state)
+    delta.apply()
+
+
+def objs_updated(objs, fields):
+    """bulk_update() 之后按对象加载时的字段值计算增量"""
+    if not TRACKED_FIELDS.intersection(fields):
+        return
+    if any(getattr(obj, '_stats_state', None) is None for obj in objs):
+        rebuild_todo_stats(list({obj.created_by_id for obj in objs}))
+        return
+    delta = StatsDelta()
+    for obj in objs:
+        new_state = todo_state(obj)
+        delta.add(obj._stats_state, -1)
+        delta.add(new_state)
+        obj._stats_state = new_state
+    delta.apply()
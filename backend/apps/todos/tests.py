@@ -1,3 +1,603 @@
-from django.test import TestCase
+import json
+from datetime import datetime, time, timedelta
+from io import StringIO
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Case, F, Value, When
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from backend.apps.llm.providers import reset_provider
+from backend.apps.scheduler.models import DailyReviewRun
+
+from . import choices
+from .choices import PRIORITY_LABELS, TYPE_LABELS
+from .management.commands.generate_daily_review import Command as DailyReviewCommand
+from .models import Todo, UserTodoStats
+from .serializers import TodoSerializer
+from .stats import COUNTER_FIELDS, compute_todo_stats
+
+User = get_user_model()
+
+
+class TodoConditionalGetTests(APITestCase):
+    """列表、详情的 ETag → 304"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.client.force_authenticate(self.user)
+        self.todo = Todo.objects.create(title='first', todo_type='task', created_by=self.user)
+
+    def assertRevalidates(self, url, change):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached.content, b'')
+
+        change()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_list_changes_after_save(self):
+        def change():
+            self.todo.title = 'renamed'
+            self.todo.save()
+        self.assertRevalidates('/api/todos/', change)
+
+    def test_list_changes_after_queryset_update(self):
+        self.assertRevalidates('/api/todos/', lambda: Todo.objects.filter(pk=self.todo.pk).update(completed=True))
+
+    def test_list_changes_after_hard_delete(self):
+        Todo.objects.create(title='second', todo_type='task', created_by=self.user)
+        self.assertRevalidates('/api/todos/', lambda: Todo.objects.filter(pk=self.todo.pk).delete())
+
+    def test_detail_changes_when_sub_todo_added(self):
+        self.assertRevalidates(
+            f'/api/todos/{self.todo.pk}/',
+            lambda: Todo.objects.create(
+                title='child', todo_type='task', created_by=self.user, parent_todo_id=self.todo.pk
+            ),
+        )
+
+    def test_if_modified_since_alone_is_ignored(self):
+        response = self.client.get('/api/todos/', HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TodoBulkTests(APITestCase):
+    """批量接口 /api/todos/bulk/"""
+
+    url = '/api/todos/bulk/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.client.force_authenticate(self.user)
+
+    def test_mixed_operations_in_one_request(self):
+        keep = Todo.objects.create(title='keep', todo_type='task', created_by=self.user)
+        done = Todo.objects.create(title='done', todo_type='task', created_by=self.user)
+        gone = Todo.objects.create(title='gone', todo_type='task', created_by=self.user)
+        response = self.client.post(self.url, {
+            'create': [{'title': 'new', 'todo_type': 'issue'}],
+            'update': [{'id': keep.id, 'title': 'kept'}],
+            'status': [{'id': done.id, 'status': 'completed', 'completed': True}],
+            'delete': [gone.id],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'][0]['status'], 'reported')
+        self.assertEqual(response.data['deleted'], [gone.id])
+        keep.refresh_from_db()
+        done.refresh_from_db()
+        gone.refresh_from_db()
+        self.assertEqual(keep.title, 'kept')
+        self.assertTrue(done.completed)
+        self.assertTrue(gone.is_deleted)
+
+    def test_invalid_item_writes_nothing(self):
+        response = self.client.post(self.url, {
+            'create': [{'title': 'ok'}, {'title': ''}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors']['create'][0], {})
+        self.assertFalse(Todo.objects.exists())
+
+    def test_array_body_rejected(self):
+        response = self.client.post(self.url, [{'title': 'x'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_under_parent_deleted_in_same_request(self):
+        parent = Todo.objects.create(title='parent', todo_type='requirement', created_by=self.user)
+        response = self.client.post(self.url, {
+            'create': [{'title': 'child', 'todo_type': 'task', 'parent_todo_id': parent.id}],
+            'delete': [parent.id],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parent_todo_id', response.data['errors']['create'][0])
+        parent.refresh_from_db()
+        self.assertFalse(parent.is_deleted)
+        self.assertEqual(Todo.objects.count(), 1)
+
+    def test_other_users_todos_rejected(self):
+        other = User.objects.create_user(username='bob', password='password123', nickname='Bob')
+        theirs = Todo.objects.create(title='theirs', todo_type='task', created_by=other)
+        response = self.client.post(self.url, {'delete': [theirs.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        theirs.refresh_from_db()
+        self.assertFalse(theirs.is_deleted)
+
+
+class TodoKeysetPaginationTests(APITestCase):
+    """列表的游标分页 pagination=cursor"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.client.force_authenticate(self.user)
+        priorities = ['high', 'medium', 'low', 'none']
+        for i in range(23):
+            Todo.objects.create(
+                title=f'todo {i}', todo_type='task', priority=priorities[i % 4], created_by=self.user
+            )
+
+    def collect(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_pages_follow_list_ordering(self):
+        ids = self.collect('/api/todos/?pagination=cursor&page_size=5&fields=id')
+        expected = list(
+            Todo.objects.filter(created_by=self.user)
+            .order_by('priority_rank', '-created_at', '-id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_insert_between_pages_does_not_repeat_rows(self):
+        first = self.client.get('/api/todos/?pagination=cursor&page_size=5&fields=id')
+        seen = [row['id'] for row in first.data['results']]
+        # 新插入的高优先级任务排在已翻过的位置，不影响后续页
+        Todo.objects.create(title='late', todo_type='task', priority='high', created_by=self.user)
+        seen.extend(self.collect(first.data['next']))
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), 23)
+
+    def test_unknown_priority_sorted_last(self):
+        legacy = Todo.objects.create(title='legacy', todo_type='task', priority='', created_by=self.user)
+        self.assertEqual(legacy.priority_rank, 999)
+        ids = self.collect('/api/todos/?pagination=cursor&page_size=10&fields=id')
+        self.assertEqual(ids[-1], legacy.id)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/todos/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TodoTreeTests(APITestCase):
+    """任务树 /api/todos/{id}/tree/（递归CTE）"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.client.force_authenticate(self.user)
+        self.root = Todo.objects.create(title='root', todo_type='requirement', created_by=self.user)
+        self.child = Todo.objects.create(
+            title='child', todo_type='task', created_by=self.user, parent_todo_id=self.root.id
+        )
+        self.done = Todo.objects.create(
+            title='done', todo_type='task', created_by=self.user, parent_todo_id=self.root.id, completed=True
+        )
+        self.grandchild = Todo.objects.create(
+            title='grandchild', todo_type='task', created_by=self.user, parent_todo_id=self.child.id
+        )
+        Todo.objects.create(
+            title='deleted', todo_type='task', created_by=self.user, parent_todo_id=self.root.id, is_deleted=True
+        )
+
+    def test_subtree_with_rollups(self):
+        response = self.client.get(f'/api/todos/{self.root.id}/tree/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tree = response.data['tree']
+        self.assertEqual(response.data['ancestors'], [])
+        self.assertEqual(tree['id'], self.root.id)
+        self.assertEqual({node['id'] for node in tree['children']}, {self.child.id, self.done.id})
+        self.assertEqual(tree['descendants_count'], 3)
+        self.assertEqual(tree['completed_descendants_count'], 1)
+        self.assertEqual(tree['completion_percent'], 33)
+        child = next(node for node in tree['children'] if node['id'] == self.child.id)
+        self.assertEqual([node['id'] for node in child['children']], [self.grandchild.id])
+
+    def test_ancestors_from_root(self):
+        response = self.client.get(f'/api/todos/{self.grandchild.id}/tree/')
+        self.assertEqual([node['id'] for node in response.data['ancestors']], [self.root.id, self.child.id])
+        self.assertEqual(response.data['tree']['children'], [])
+
+    def test_cycle_rejected(self):
+        response = self.client.patch(
+            f'/api/todos/{self.root.id}/', {'parent_todo_id': self.grandchild.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parent_todo_id', response.data)
+
+    def test_tree_survives_cycle_in_data(self):
+        # 绕过校验直接写出环，递归深度受限，接口仍能返回
+        Todo.objects.filter(pk=self.root.pk).update(parent_todo_id=self.grandchild.id)
+        response = self.client.get(f'/api/todos/{self.root.id}/tree/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['tree']['descendants_count'], 3)
+
+
+class TodoSearchHighlightTests(APITestCase):
+    """全文检索的高亮片段只包含 <mark> 标签，原文经过HTML转义"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.client.force_authenticate(self.user)
+        Todo.objects.create(
+            title='<img src=x onerror=alert(1)> deploy',
+            description='run <script>alert(1)</script> before deploy',
+            todo_type='task', created_by=self.user,
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/todos/search/', {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        return response.data['results'][0]
+
+    def test_full_text_index_path(self):
+        hit = self.search('deploy')
+        self.assertEqual(hit['title_highlight'], '&lt;img src=x onerror=alert(1)&gt; <mark>deploy</mark>')
+        self.assertNotIn('<script>', hit['snippet'])
+        self.assertIn('&lt;script&gt;', hit['snippet'])
+        self.assertIn('<mark>deploy</mark>', hit['snippet'])
+
+    def test_short_term_fallback_path(self):
+        # 少于3个字符退回 icontains
+        hit = self.search('x')
+        self.assertNotIn('<img', hit['title_highlight'])
+        self.assertIn('&lt;img src=<mark>x</mark>', hit['title_highlight'])
+        self.assertNotIn('<script>', hit['snippet'])
+
+    def test_markup_in_query_is_escaped(self):
+        hit = self.search('<script>')
+        self.assertIn('<mark>&lt;script&gt;</mark>', hit['snippet'])
+
+
+class TodoSearchFilterTests(APITestCase):
+    """列表 ?search= 按短语匹配；检索接口按词匹配"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.client.force_authenticate(self.user)
+        self.phrase = Todo.objects.create(title='Deploy the app', todo_type='task', created_by=self.user)
+        self.words = Todo.objects.create(title='app: deploy later', todo_type='task', created_by=self.user)
+        self.chinese = Todo.objects.create(title='修复登录问题', todo_type='issue', created_by=self.user)
+
+    def list_ids(self, search):
+        response = self.client.get('/api/todos/', {'search': search, 'fields': 'id'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row['id'] for row in response.data['results']}
+
+    def test_list_search_matches_phrase(self):
+        self.assertEqual(self.list_ids('deploy the'), {self.phrase.id})
+        self.assertEqual(self.list_ids('deploy'), {self.phrase.id, self.words.id})
+        self.assertEqual(self.list_ids('the deploy'), set())
+
+    def test_list_search_short_chinese_term(self):
+        self.assertEqual(self.list_ids('登录'), {self.chinese.id})
+
+    def test_search_endpoint_matches_all_terms(self):
+        response = self.client.get('/api/todos/search/', {'q': 'app deploy'})
+        self.assertEqual({hit['todo']['id'] for hit in response.data['results']}, {self.phrase.id, self.words.id})
+
+    def test_search_endpoint_query_count_independent_of_hits(self):
+        with CaptureQueriesContext(connection) as single:
+            self.client.get('/api/todos/search/', {'q': 'Deploy the'})
+        with CaptureQueriesContext(connection) as several:
+            response = self.client.get('/api/todos/search/', {'q': 'deploy'})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(several), len(single))
+
+
+class TodoStatsTests(APITestCase):
+    """用户计数（UserTodoStats）的增量维护与 compute_todo_stats() 重新统计结果一致"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.other = User.objects.create_user(username='bob', password='password123', nickname='Bob')
+        self.task = Todo.objects.create(title='task', todo_type='task', priority='high', created_by=self.user)
+        self.issue = Todo.objects.create(title='issue', todo_type='issue', priority='low', created_by=self.user)
+        self.record = Todo.objects.create(title='record', todo_type='record', created_by=self.other)
+
+    def assertStatsMatch(self):
+        expected = compute_todo_stats([self.user.pk, self.other.pk])
+        for user_id, counts in expected.items():
+            stats = UserTodoStats.objects.get(user_id=user_id)
+            self.assertEqual({field: getattr(stats, field) for field in COUNTER_FIELDS}, counts)
+
+    def test_create_and_save(self):
+        self.assertStatsMatch()
+        self.task.status = 'completed'
+        self.task.completed = True
+        self.task.priority = 'medium'
+        self.task.save()
+        self.assertStatsMatch()
+        self.assertEqual(UserTodoStats.objects.get(user=self.user).completed_count, 1)
+
+    def test_soft_delete(self):
+        self.issue.is_deleted = True
+        self.issue.save()
+        self.assertStatsMatch()
+        self.assertEqual(UserTodoStats.objects.get(user=self.user).deleted_count, 1)
+
+    def test_queryset_hard_delete(self):
+        Todo.objects.filter(created_by=self.user).delete()
+        self.assertStatsMatch()
+        self.assertEqual(UserTodoStats.objects.get(user=self.user).total_count, 0)
+
+    def test_update_status(self):
+        Todo.objects.filter(todo_type='task').update(status='in_progress')
+        self.assertStatsMatch()
+
+    def test_update_owner(self):
+        Todo.objects.filter(pk=self.issue.pk).update(created_by=self.other)
+        self.assertStatsMatch()
+        self.assertEqual(UserTodoStats.objects.get(user=self.other).total_count, 2)
+
+    def test_update_with_expression(self):
+        # 新值由数据库计算，走重新统计
+        Todo.objects.update(priority=Case(When(priority='high', then=Value('low')), default=F('priority')))
+        self.assertStatsMatch()
+        self.assertEqual(UserTodoStats.objects.get(user=self.user).priority_low_count, 2)
+        self.assertEqual(Todo.objects.get(pk=self.task.pk).priority_rank, 3)
+
+    def test_bulk_create_and_bulk_update(self):
+        created = Todo.objects.bulk_create([
+            Todo(title='a', todo_type='task', status='pending', priority='high', created_by=self.user),
+            Todo(title='b', todo_type='issue', status='reported', created_by=self.other),
+        ])
+        self.assertStatsMatch()
+        todos = list(Todo.objects.filter(pk__in=[todo.pk for todo in created]))
+        for todo in todos:
+            todo.completed = True
+            todo.priority = 'low'
+        Todo.objects.bulk_update(todos, ['completed', 'priority'])
+        self.assertStatsMatch()
+
+    def test_serializer_many_create_and_update(self):
+        context = {'request': SimpleNamespace(user=self.user)}
+        serializer = TodoSerializer(data=[
+            {'title': 'x', 'todo_type': 'task', 'priority': 'medium'},
+            {'title': 'y', 'todo_type': 'requirement'},
+        ], many=True, context=context)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(created_by=self.user)
+        self.assertStatsMatch()
+
+        instances = list(Todo.objects.filter(created_by=self.user))
+        serializer = TodoSerializer(instances, data=[
+            {'id': self.task.pk, 'completed': True},
+            {'id': self.issue.pk, 'is_deleted': True},
+        ], many=True, partial=True, context=context)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertStatsMatch()
+
+
+@override_settings(LLM_PROVIDER='fake', LLM_FAKE_DELAY=0)
+class GenerateDailyReviewTests(TestCase):
+    """generate_daily_review：执行记录认领、重跑与批量写入"""
+
+    def setUp(self):
+        reset_provider()
+        self.addCleanup(reset_provider)
+        self.active = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.idle = User.objects.create_user(username='bob', password='password123', nickname='Bob')
+        self.admin = User.objects.create_superuser(username='root', password='password123', nickname='Root')
+        self.todo = Todo.objects.create(title='write tests', todo_type='task', created_by=self.active)
+        self.date = timezone.localtime(self.todo.created_at).date()
+
+    def run_command(self, **options):
+        out = StringIO()
+        call_command('generate_daily_review', date=self.date.isoformat(), rate=1000, stdout=out, **options)
+        return out.getvalue()
+
+    def reports(self, user=None):
+        reports = Todo.objects.filter(todo_type='record', title__startswith='每日回顾报告')
+        return reports.filter(created_by=user) if user else reports
+
+    def test_second_run_does_no_work(self):
+        self.run_command()
+        self.assertEqual(self.reports().count(), 2)
+        self.assertFalse(self.reports(self.admin).exists())
+        runs = DailyReviewRun.objects.filter(review_date=self.date)
+        self.assertEqual(sorted(runs.values_list('status', flat=True)), ['completed', 'completed'])
+        self.assertTrue(runs.get(user=self.active).result_todo.description.startswith('[fake]'))
+
+        output = self.run_command()
+        self.assertIn('0 to process, 2 already done', output)
+        self.assertEqual(self.reports().count(), 2)
+        self.assertEqual(set(runs.values_list('attempts', flat=True)), {1})
+
+    def test_failed_run_is_retried_and_report_reused(self):
+        self.run_command()
+        run = DailyReviewRun.objects.get(user=self.active, review_date=self.date)
+        report_id = run.result_todo_id
+        DailyReviewRun.objects.filter(pk=run.pk).update(status='failed', error='AI报告生成失败')
+
+        output = self.run_command()
+        self.assertIn('1 to process', output)
+        run.refresh_from_db()
+        self.assertEqual(run.status, 'completed')
+        self.assertEqual(run.attempts, 2)
+        self.assertEqual(run.error, '')
+        # 上次的报告原地更新，不重复创建
+        self.assertEqual(run.result_todo_id, report_id)
+        self.assertEqual(self.reports(self.active).count(), 1)
+
+    def test_stale_claim_taken_over_live_claim_left_alone(self):
+        now = timezone.now()
+        DailyReviewRun.objects.create(
+            user=self.active, review_date=self.date, status='running', claim_token='crashed',
+            attempts=1, started_at=now - timedelta(hours=2),
+        )
+        DailyReviewRun.objects.create(
+            user=self.idle, review_date=self.date, status='running', claim_token='alive',
+            attempts=1, started_at=now,
+        )
+        self.run_command()
+
+        stale = DailyReviewRun.objects.get(user=self.active, review_date=self.date)
+        self.assertEqual(stale.status, 'completed')
+        self.assertEqual(stale.attempts, 2)
+        self.assertEqual(stale.claim_token, '')
+        live = DailyReviewRun.objects.get(user=self.idle, review_date=self.date)
+        self.assertEqual((live.status, live.claim_token, live.attempts), ('running', 'alive', 1))
+        self.assertFalse(self.reports(self.idle).exists())
+
+    def test_results_flushed_in_batches(self):
+        for i in range(3):
+            user = User.objects.create_user(username=f'user{i}', password='password123', nickname=f'User {i}')
+            Todo.objects.create(title=f'todo {i}', todo_type='task', created_by=user)
+        self.run_command(batch_size=2)
+        runs = DailyReviewRun.objects.filter(review_date=self.date)
+        self.assertEqual(runs.count(), 5)
+        self.assertFalse(runs.exclude(status='completed').exists())
+        self.assertFalse(runs.filter(result_todo__isnull=True).exists())
+        self.assertEqual(self.reports().count(), 5)
+
+
+class DailyReviewSummaryTests(TestCase):
+    """每日回顾摘要：所有用户的摘要两条查询完成"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        self.bob = User.objects.create_user(username='bob', password='password123', nickname='Bob')
+        self.idle = User.objects.create_user(username='carol', password='password123', nickname='Carol')
+        for i in range(12):
+            Todo.objects.create(
+                title=f'task {i}', todo_type='task', priority='high' if i == 0 else 'low', created_by=self.alice
+            )
+        Todo.objects.create(title='bug', todo_type='issue', created_by=self.bob)
+        Todo.objects.create(title='gone', todo_type='issue', created_by=self.bob, is_deleted=True)
+        yesterday = Todo.objects.create(title='old', todo_type='record', created_by=self.bob)
+        Todo.objects.filter(pk=yesterday.pk).update(created_at=timezone.now() - timedelta(days=1))
+
+        self.date = timezone.localdate()
+        self.start = timezone.make_aware(datetime.combine(self.date, time.min))
+        self.end = timezone.make_aware(datetime.combine(self.date, time.max))
+
+    def test_summaries_for_all_users_in_two_queries(self):
+        users = [self.alice.pk, self.bob.pk, self.idle.pk]
+        with self.assertNumQueries(2):
+            summaries = DailyReviewCommand().build_todo_summaries(users, self.start, self.end, self.date)
+
+        self.assertEqual(set(summaries), {self.alice.pk, self.bob.pk})
+        alice = summaries[self.alice.pk]
+        self.assertEqual(alice['new_count'], 12)
+        self.assertEqual(alice['type_stats'], {TYPE_LABELS['task']: 12})
+        self.assertEqual(alice['priority_stats'], {PRIORITY_LABELS['high']: 1, PRIORITY_LABELS['low']: 11})
+        # 详情每人最多10条，按优先级、创建时间倒序
+        self.assertEqual(len(alice['new_todos']), 10)
+        self.assertEqual(alice['new_todos'][0]['title'], 'task 0')
+        self.assertEqual(alice['new_todos'][1]['title'], 'task 11')
+
+        bob = summaries[self.bob.pk]
+        self.assertEqual(bob['new_count'], 1)
+        self.assertEqual([todo['title'] for todo in bob['new_todos']], ['bug'])
+
+
+class TodoListParityTests(APITestCase):
+    """列表的 values() 精简路径与 TodoSerializer 输出一致"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='爱丽丝')
+        self.client.force_authenticate(self.user)
+        parent = Todo.objects.create(
+            title='parent', description='详情', todo_type='requirement', priority='high', created_by=self.user
+        )
+        Todo.objects.create(title='child', todo_type='task', created_by=self.user, parent_todo_id=parent.id)
+        Todo.objects.create(
+            title='done', todo_type='issue', status='resolved', completed=True, priority='low', created_by=self.user
+        )
+        Todo.objects.create(title='record', todo_type='record', priority='none', created_by=self.user)
+
+    def serializer_output(self):
+        todos = Todo.objects.filter(created_by=self.user, is_deleted=False)
+        data = TodoSerializer(todos, many=True).data
+        return {row['id']: row for row in json.loads(JSONRenderer().render(data))}
+
+    def test_full_rows_match_serializer(self):
+        response = self.client.get('/api/todos/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.json()['results']
+        expected = self.serializer_output()
+        self.assertEqual(len(rows), len(expected))
+        for row in rows:
+            self.assertEqual(list(row), list(expected[row['id']]))
+            self.assertEqual(row, expected[row['id']])
+
+    def test_sparse_fields_are_subset(self):
+        response = self.client.get('/api/todos/', {'fields': 'id,status_display,has_sub_todos,updated_at'})
+        expected = self.serializer_output()
+        for row in response.json()['results']:
+            self.assertEqual(row, {field: expected[row['id']][field] for field in row})
+            self.assertEqual(list(row), ['id', 'status_display', 'has_sub_todos', 'updated_at'])
+
+    def test_unknown_field_rejected(self):
+        response = self.client.get('/api/todos/', {'fields': 'id,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TodoMetaTests(APITestCase):
+    """/api/todos/meta/：目录来自 choices 模块，强 ETag → 304，无需登录"""
+
+    url = '/api/todos/meta/'
+
+    def test_catalogue_matches_choices(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        catalogue = response.json()
+        self.assertEqual([item['value'] for item in catalogue['types']], [value for value, _ in choices.TYPE_CHOICES])
+        task = next(item for item in catalogue['types'] if item['value'] == 'task')
+        self.assertEqual(task['default_status'], choices.DEFAULT_STATUS['task'])
+        self.assertEqual([item['value'] for item in task['statuses']], [v for v, _ in choices.STATUS_CHOICES['task']])
+        self.assertEqual(
+            {item['value']: item['weight'] for item in catalogue['priorities']}, dict(choices.PRIORITY_WEIGHTS)
+        )
+
+    def test_strong_etag_and_304(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertEqual(etag, choices.CATALOGUE_ETAG)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=', response['Cache-Control'])
+
+        cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached.content, b'')
+        self.assertEqual(cached['ETag'], etag)
+
+        stale = self.client.get(self.url, HTTP_IF_NONE_MATCH='"outdated"')
+        self.assertEqual(stale.status_code, status.HTTP_200_OK)
+
+    def test_invalid_token_ignored(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
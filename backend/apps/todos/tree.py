@@ -0,0 +1,123 @@
+"""
+Todo层级树（需求 → 任务 的拆解关系，parent_todo_id 指向父任务）
+
+- get_subtree / get_ancestors：递归CTE一次查询取出整棵子树或到根的祖先链，
+  SQLite 和 PostgreSQL 都支持 WITH RECURSIVE；MAX_DEPTH 限制递归深度，数据中出现环也不会无限递归；
+- build_tree：把子树节点组装为嵌套结构，并自底向上汇总子孙数量和完成比例；
+- prefetch_sub_todo_counts：一次查询为一批任务填充子任务数，has_sub_todos 不再逐行查询。
+"""
+from django.db.models import Count
+
+from .models import Todo
+
+MAX_DEPTH = 50
+
+_TABLE = Todo._meta.db_table
+
+
+def get_subtree(root_id, max_depth=MAX_DEPTH):
+    """
+    根任务及其全部未删除的子孙任务（一次查询），按深度、优先级排序。
+    每个任务带 tree_depth 属性（根为0）。
+    """
+    sql = f"""
+        WITH RECURSIVE subtree(id, depth) AS (
+            SELECT id, 0 FROM {_TABLE} WHERE id = %s
+            UNION ALL
+            SELECT t.id, s.depth + 1
+            FROM {_TABLE} t JOIN subtree s ON t.parent_todo_id = s.id
+            WHERE t.is_deleted = %s AND s.depth < %s
+        )
+        SELECT t.*, s.depth AS tree_depth
+        FROM {_TABLE} t JOIN subtree s ON t.id = s.id
+        ORDER BY s.depth, t.priority_rank, t.created_at DESC
+    """
+    return list(Todo.objects.raw(sql, [root_id, False, max_depth]))
+
+
+def get_subtree_ids(root_id, max_depth=MAX_DEPTH):
+    """根任务及其子孙任务的ID集合（包含已删除的子孙，用于防止形成环）"""
+    sql = f"""
+        WITH RECURSIVE subtree(id, depth) AS (
+            SELECT id, 0 FROM {_TABLE} WHERE id = %s
+            UNION ALL
+            SELECT t.id, s.depth + 1
+            FROM {_TABLE} t JOIN subtree s ON t.parent_todo_id = s.id
+            WHERE s.depth < %s
+        )
+        SELECT id FROM subtree
+    """
+    return {todo.id for todo in Todo.objects.raw(sql, [root_id, max_depth])}
+
+
+def get_ancestors(todo, max_depth=MAX_DEPTH):
+    """从根到直接父任务的祖先链（一次查询），不包含 todo 本身"""
+    if not todo.parent_todo_id:
+        return []
+    sql = f"""
+        WITH RECURSIVE chain(id, parent_todo_id, depth) AS (
+            SELECT id, parent_todo_id, 1 FROM {_TABLE} WHERE id = %s
+            UNION ALL
+            SELECT t.id, t.parent_todo_id, c.depth + 1
+            FROM {_TABLE} t JOIN chain c ON t.id = c.parent_todo_id
+            WHERE c.depth < %s
+        )
+        SELECT t.*, c.depth AS tree_depth
+        FROM {_TABLE} t JOIN chain c ON t.id = c.id
+        ORDER BY c.depth DESC
+    """
+    return list(Todo.objects.raw(sql, [todo.parent_todo_id, max_depth]))
+
+
+def build_tree(nodes, root_id, serialize):
+    """
+    把 get_subtree 的结果组装为嵌套字典，serialize(todo) 返回单个节点的数据。
+
+    每个节点附加：
+    - children：子节点列表；
+    - descendants_count / completed_descendants_count：全部子孙及其中已完成的数量；
+    - completion_percent：子孙的完成比例；没有子孙时按自身是否完成取 100 或 0。
+    """
+    # 数据中有环时同一任务会以不同深度出现多次，只保留最浅的一次；
+    # 只连接深度相差1的父子，指回祖先的边被忽略
+    by_id = {}
+    for todo in nodes:
+        by_id.setdefault(todo.id, todo)
+    children = {}
+    for todo in by_id.values():
+        parent = by_id.get(todo.parent_todo_id)
+        if parent is not None and todo.tree_depth == parent.tree_depth + 1:
+            children.setdefault(parent.id, []).append(todo)
+
+    def visit(todo):
+        node = serialize(todo)
+        node['children'] = [visit(child) for child in children.get(todo.id, [])]
+        total = sum(1 + child['descendants_count'] for child in node['children'])
+        completed = sum(
+            int(child['completed']) + child['completed_descendants_count'] for child in node['children']
+        )
+        node['descendants_count'] = total
+        node['completed_descendants_count'] = completed
+        if total:
+            node['completion_percent'] = round(completed * 100 / total)
+        else:
+            node['completion_percent'] = 100 if todo.completed else 0
+        return node
+
+    return visit(by_id[root_id])
+
+
+def prefetch_sub_todo_counts(todos):
+    """为一批任务填充未删除子任务数（一次分组查询），已填充的跳过"""
+    pending = [todo for todo in todos if getattr(todo, '_sub_todos_count', None) is None and todo.pk]
+    if not pending:
+        return todos
+    counts = dict(
+        Todo.objects.filter(parent_todo_id__in=[todo.pk for todo in pending], is_deleted=False)
+        .order_by()
+        .values_list('parent_todo_id')
+        .annotate(count=Count('pk'))
+    )
+    for todo in pending:
+        todo._sub_todos_count = counts.get(todo.pk, 0)
+    return todos
@@ -1,10 +1,23 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, prefetch_related_objects
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from django.db.models import Q, Case, When, IntegerField
+from . import choices
 from .models import Todo, QuickTaskConfig
 from .serializers import TodoSerializer, QuickTaskConfigSerializer, QuickTaskConfigCreateTodoSerializer
+from .listing import build_todo_list, parse_fields, todo_values
+from .pagination import TodoKeysetPagination
+from .search import filter_todos, search_todos
+from .stats import get_user_todo_stats
+from .tree import build_tree, get_ancestors, get_subtree, prefetch_sub_todo_counts
 from backend.apps.users.views import IsAdminUser # Import IsAdminUser
+from backend.conditional import make_etag, not_modified, set_validators
 
 
 class IsOwnerOrAdmin(permissions.BasePermission):
@@ -13,8 +26,8 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         # 管理员可以操作所有任务
         if request.user.is_staff:
             return True
-        # 创建者可以操作自己的任务
-        return obj.created_by == request.user
+        # 创建者可以操作自己的任务（比较外键ID，不加载关联用户）
+        return obj.created_by_id == request.user.id
 
 
 class TodoViewSet(viewsets.ModelViewSet):
@@ -23,6 +36,19 @@ class TodoViewSet(viewsets.ModelViewSet):
     # IsAuthenticated ensures user is logged in.
     # Specific admin-only actions will use IsAdminUser decorator.
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
+    # 批量接口单次请求最多的操作项数
+    bulk_max_items = 500
+    # 状态变更操作允许的字段
+    bulk_status_fields = {'id', 'status', 'completed'}
+    
+    @property
+    def paginator(self):
+        """传入 pagination=cursor 或 cursor 参数时使用游标分页，否则沿用默认页码分页"""
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = TodoKeysetPagination()
+        return super().paginator
     
     def get_queryset(self):
         """获取查询集，支持软删除过滤"""
@@ -46,9 +72,7 @@ class TodoViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(completed=completed_bool)
         
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(description__icontains=search)
-            )
+            queryset = filter_todos(queryset, search)
         
         # 新增：根据todo_type过滤
         if todo_type:
@@ -61,18 +85,63 @@ class TodoViewSet(viewsets.ModelViewSet):
             elif show_deleted.lower() in ['false', '0', 'no']:
                 queryset = queryset.filter(is_deleted=False)
         
-        # 按优先级排序（高优先级靠前），然后按创建时间倒序
-        return queryset.annotate(
-            priority_order=Case(
-                When(priority='high', then=1),
-                When(priority='medium', then=2),
-                When(priority='low', then=3),
-                When(priority='none', then=4),
-                default=4,
-                output_field=IntegerField()
-            )
-        ).order_by('priority_order', '-created_at')
-    
+        # 按优先级排序（高优先级靠前），然后按创建时间倒序；序列化需要创建者用户名，一并查出
+        return queryset.select_related('created_by').order_by('priority_rank', '-created_at')
+
+    def list(self, request, *args, **kwargs):
+        """
+        列表走精简路径：values() 只查询需要的列，直接构造字典，不经过 ModelSerializer；
+        fields=id,title,status,priority 只返回指定字段；exclude=available_statuses 去掉指定字段
+        （可用状态改从 /api/todos/meta/ 读取）；数据未变化时返回 304
+        """
+        fields = parse_fields(request.query_params.get('fields'), request.query_params.get('exclude'))
+        etag = self.list_etag()
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        rows = todo_values(self.filter_queryset(self.get_queryset()), fields)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            response = self.get_paginated_response(build_todo_list(page, fields))
+        else:
+            response = Response(build_todo_list(rows, fields))
+        return set_validators(response, etag)
+
+    def list_etag(self):
+        """
+        列表的 ETag：用户全部任务（管理员为全部任务）的数量和最新更新时间，
+        一条聚合查询（created_by, updated_at 索引）。不按过滤条件统计：子任务数、
+        软删除等变化可能来自过滤范围之外的任务；过滤、分页参数已包含在 ETag 中
+        """
+        user = self.request.user
+        scope = Todo.objects.all() if user.is_staff else Todo.objects.filter(created_by=user)
+        state = scope.aggregate(count=Count('id'), last_updated=Max('updated_at'))
+        return make_etag(
+            user.pk, user.username, user.nickname, self.request.get_full_path(),
+            state['count'], state['last_updated'] and state['last_updated'].isoformat(),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """详情：更新时间和子任务数未变化时返回 304，不再序列化"""
+        todo = self.get_object()
+        prefetch_sub_todo_counts([todo])
+        etag = make_etag(
+            todo.pk, todo.updated_at.isoformat(), todo.sub_todos_count,
+            todo.created_by.username, todo.created_by.nickname,
+        )
+        response = not_modified(request, etag)
+        if response is None:
+            response = set_validators(Response(self.get_serializer(todo).data), etag)
+        return response
+
+    def get_object(self):
+        """自己的任务直接复用已认证的用户对象，序列化 created_by_* 时不再查询用户表"""
+        obj = super().get_object()
+        if obj.created_by_id == self.request.user.id:
+            obj.created_by = self.request.user
+        return obj
+
     def perform_create(self, serializer):
         """创建任务时自动设置创建者"""
         serializer.save(created_by=self.request.user)
@@ -101,6 +170,39 @@ class TodoViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(todo)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def tree(self, request, pk=None):
+        """
+        任务及其全部未删除子孙任务的嵌套结构（递归CTE一次取出），
+        ancestors 为从根到父任务的祖先链；每个节点附带子孙数量和完成比例
+        """
+        todo = self.get_object()
+        user = request.user
+        nodes = get_subtree(todo.pk)
+        ancestors = get_ancestors(todo)
+        if not user.is_staff:
+            nodes = [node for node in nodes if node.created_by_id == user.id]
+            ancestors = [node for node in ancestors if node.created_by_id == user.id and not node.is_deleted]
+        
+        # 自己的任务复用 request.user，其余创建者一次查询
+        others = []
+        for node in nodes + ancestors:
+            if node.created_by_id == user.id:
+                node.created_by = user
+            else:
+                others.append(node)
+        prefetch_related_objects(others, 'created_by')
+        prefetch_sub_todo_counts(nodes)
+        
+        return Response({
+            'ancestors': [
+                {'id': node.id, 'title': node.title, 'todo_type': node.todo_type,
+                 'status': node.status, 'completed': node.completed}
+                for node in ancestors
+            ],
+            'tree': build_tree(nodes, todo.pk, lambda node: dict(self.get_serializer(node).data)),
+        })
+    
     @action(detail=True, methods=['post'], permission_classes=[IsAdminUser]) # Use IsAdminUser
     def restore(self, request, pk=None):
         """恢复已删除的任务（仅管理员）"""
@@ -189,6 +291,169 @@ class TodoViewSet(viewsets.ModelViewSet):
             'restored_count': restored_count
         })
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        批量新建、修改、变更状态、软删除任务
+        
+        请求体：{"create": [{...}], "update": [{"id": 1, ...}],
+                "status": [{"id": 2, "status": "done", "completed": true}], "delete": [3, 4]}
+        全部校验通过后在一个事务内用 bulk_create / bulk_update 写入；
+        任一项校验失败则不写入，返回与请求同结构的逐项错误（通过的项为空对象）。
+        """
+        user = request.user
+        if not isinstance(request.data, dict):
+            return Response({'error': '请求体必须是对象'}, status=status.HTTP_400_BAD_REQUEST)
+        ops = {key: request.data.get(key) or [] for key in ('create', 'update', 'status', 'delete')}
+        if not all(isinstance(items, list) for items in ops.values()):
+            return Response({'error': 'create、update、status、delete 必须是数组'}, status=status.HTTP_400_BAD_REQUEST)
+        total = sum(len(items) for items in ops.values())
+        if not total:
+            return Response({'error': '请提供要执行的操作'}, status=status.HTTP_400_BAD_REQUEST)
+        if total > self.bulk_max_items:
+            return Response(
+                {'error': f'单次最多 {self.bulk_max_items} 项操作'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # 一次查出所有要修改/删除的任务，同一任务在一次请求中只能出现一次
+        errors = {}
+        ids = []
+        for key in ('update', 'status'):
+            for item in ops[key]:
+                if isinstance(item, dict) and 'id' in item:
+                    ids.append(item['id'])
+        ids.extend(ops['delete'])
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            return Response({'error': '任务ID必须是整数'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) != len(set(ids)):
+            return Response({'error': '同一任务在一次请求中只能出现一次'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = Todo.objects.select_related('created_by')
+        if not user.is_staff:
+            queryset = queryset.filter(created_by=user, is_deleted=False)
+        instances = list(queryset.filter(id__in=ids))
+        
+        create_serializer = self.get_serializer(data=ops['create'], many=True)
+        update_serializer = self.get_serializer(instances, data=ops['update'], many=True, partial=True)
+        status_serializer = self.get_serializer(instances, data=ops['status'], many=True, partial=True)
+        for key, serializer in (('create', create_serializer), ('update', update_serializer), ('status', status_serializer)):
+            if not serializer.is_valid():
+                errors[key] = serializer.errors
+        
+        status_errors = [
+            {} if isinstance(item, dict) and set(item) <= self.bulk_status_fields
+            else {'non_field_errors': ['状态变更只能包含 id、status、completed']}
+            for item in ops['status']
+        ]
+        if any(status_errors):
+            errors['status'] = status_errors
+        
+        instances_by_id = {todo.id: todo for todo in instances}
+        deletes = [instances_by_id.get(int(pk)) for pk in ops['delete']]
+        delete_errors = [
+            {} if todo is not None and not todo.is_deleted else {'id': ['任务不存在、无权操作或已删除']}
+            for todo in deletes
+        ]
+        if any(delete_errors):
+            errors['delete'] = delete_errors
+        
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # 父任务只按请求前的数据校验过：不能挂到本次请求中删除的任务下
+        deleted_ids = {todo.id for todo in deletes}
+        for key, serializer in (('create', create_serializer), ('update', update_serializer)):
+            parent_errors = [
+                {'parent_todo_id': ['父任务在本次请求中被删除']}
+                if item.get('parent_todo_id') in deleted_ids else {}
+                for item in serializer.validated_data
+            ]
+            if any(parent_errors):
+                errors[key] = parent_errors
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        with transaction.atomic():
+            created = create_serializer.save(created_by=user) if ops['create'] else []
+            updated = update_serializer.save() if ops['update'] else []
+            changed = status_serializer.save() if ops['status'] else []
+            if deletes:
+                now = timezone.now()
+                for todo in deletes:
+                    todo.is_deleted = True
+                    todo.updated_at = now
+                Todo.objects.bulk_update(deletes, ['is_deleted', 'updated_at'])
+            # 事务内重新检查父任务：校验之后其他请求可能已删除父任务，回滚本次写入
+            parent_ids = {
+                item['parent_todo_id']
+                for item in [*create_serializer.validated_data, *update_serializer.validated_data]
+                if item.get('parent_todo_id')
+            }
+            if parent_ids:
+                alive = set(Todo.objects.filter(id__in=parent_ids, is_deleted=False).values_list('id', flat=True))
+                if parent_ids - alive:
+                    raise ValidationError({'error': '父任务已被删除，请刷新后重试'})
+        
+        return Response({
+            'created': self.get_serializer(created, many=True).data,
+            'updated': self.get_serializer(updated, many=True).data,
+            'status': self.get_serializer(changed, many=True).data,
+            'deleted': [todo.id for todo in deletes],
+        })
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny], authentication_classes=[])
+    def meta(self, request):
+        """
+        类型/状态/优先级目录，内容只随代码变化：预先渲染好的JSON，带强 ETag 和长缓存；
+        If-None-Match 命中时返回 304
+        """
+        response = get_conditional_response(request, etag=choices.CATALOGUE_ETAG)
+        if response is None:
+            response = HttpResponse(choices.CATALOGUE_JSON, content_type='application/json')
+        response['ETag'] = choices.CATALOGUE_ETAG
+        patch_cache_control(response, public=True, max_age=settings.TODO_META_MAX_AGE)
+        return response
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """当前用户的任务计数（读取统计表，不扫描任务）"""
+        return Response(get_user_todo_stats(request.user).as_dict())
+    
+    @action(detail=False, methods=['get'], url_path='search')
+    def search_hits(self, request):
+        """全文检索，按相关度返回命中的任务及高亮片段"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': '请提供搜索关键词'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            limit = 20
+        
+        hits = search_todos(self.get_queryset(), query, limit=limit)
+        serializer = self.get_serializer([hit['todo'] for hit in hits], many=True)
+        results = []
+        for hit, todo_data in zip(hits, serializer.data):
+            results.append({
+                'todo': todo_data,
+                'rank': hit['rank'],
+                'title_highlight': hit['title_highlight'],
+                'snippet': hit['snippet'],
+            })
+        
+        return Response({
+            'query': query,
+            'count': len(results),
+            'results': results
+        })
+    
     @action(detail=False, methods=['get'])
     def referenceable_todos(self, request):
         """获取可引用的todo列表（用于AI聊天引用）"""
@@ -199,16 +464,7 @@ class TodoViewSet(viewsets.ModelViewSet):
             created_by=user,
             completed=False,
             is_deleted=False
-        ).annotate(
-            priority_order=Case(
-                When(priority='high', then=1),
-                When(priority='medium', then=2),
-                When(priority='low', then=3),
-                When(priority='none', then=4),
-                default=4,
-                output_field=IntegerField()
-            )
-        ).order_by('priority_order', '-created_at')
+        ).order_by('priority_rank', '-created_at')
         
         # 按todo_type分组
         grouped_todos = {
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.apps.users'
+    
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from .authentication import user_changed
+        # 用户变更（启用/禁用、角色、密码、资料）时清除认证缓存
+        User = get_user_model()
+        post_save.connect(user_changed, sender=User, dispatch_uid='auth_user_cache_saved')
+        post_delete.connect(user_changed, sender=User, dispatch_uid='auth_user_cache_deleted')
@@ -0,0 +1,109 @@
+"""
+带用户缓存的 JWT 认证
+
+simplejwt 的 JWTAuthentication 每个请求都按 token 中的用户ID查询一次用户表。
+这里按ID缓存用户的一个小快照 USER_AUTH_CACHE_TIMEOUT 秒；用户保存或删除时
+（启用/禁用、修改角色、改密码、修改资料）立即使缓存失效。
+
+快照只包含 SNAPSHOT_FIELDS（不含密码哈希、邮箱等其他字段），命中时用它构造一个延迟加载
+其余字段的用户对象；需要完整用户并写回的接口（个人资料、改密码）自行从数据库重新读取。
+未命中时调用 JWTAuthentication.get_user 完成全部校验；命中时只复现其中两项：
+CHECK_USER_IS_ACTIVE（is_active），CHECK_REVOKE_TOKEN（快照保存密码哈希的md5，与 token 中的值相同）。
+simplejwt 以后在 get_user 中新增的校验需要同步到 _check_snapshot。
+
+失效窗口：
+- 通过 save()/delete() 的修改：共享缓存（REDIS_URL）下对所有进程立即生效。多个工作进程
+  使用进程内缓存时其他进程最多 USER_AUTH_CACHE_TIMEOUT 秒后才能看到，被禁用、删除的用户
+  在此期间仍能认证，因此 gunicorn 多进程且 DEBUG=False 时要求配置共享缓存（见 backend/gunicorn.conf.py）；
+- 绕过信号的修改（QuerySet.update()、直接改数据库）：最多 USER_AUTH_CACHE_TIMEOUT 秒；
+- USER_AUTH_CACHE_TIMEOUT=0 关闭缓存，每个请求都查询用户表。
+
+失效时写入几秒的标记而不是删除键：标记存在期间查到的用户不回填缓存，避免失效前开始的
+请求在失效之后把旧的快照写回缓存。
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+DEFAULT_TIMEOUT = 60
+
+# 缓存的用户字段：认证、权限判断和序列化创建者用到的字段
+SNAPSHOT_FIELDS = ('id', 'username', 'nickname', 'is_active', 'is_staff', 'is_superuser')
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+# 失效标记，存在期间只查询数据库、不回填缓存；只需覆盖正在进行中的请求，保留几秒即可
+INVALIDATED = 'invalidated'
+INVALIDATED_TIMEOUT = 5
+
+
+def _timeout():
+    return getattr(settings, 'USER_AUTH_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def invalidate_user_cache(user_id):
+    cache.set(user_cache_key(user_id), INVALIDATED, min(_timeout(), INVALIDATED_TIMEOUT))
+
+
+def user_changed(sender, instance, **kwargs):
+    """用户 post_save / post_delete 信号处理"""
+    invalidate_user_cache(instance.pk)
+
+
+def _password_md5(user):
+    from rest_framework_simplejwt.utils import get_md5_hash_password
+    return get_md5_hash_password(user.password)
+
+
+def make_snapshot(user):
+    snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+    if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+        snapshot['password_md5'] = _password_md5(user)
+    return snapshot
+
+
+def user_from_snapshot(snapshot):
+    """由快照构造用户对象，快照以外的字段延迟加载（访问时查询数据库）"""
+    User = get_user_model()
+    values = [snapshot[field.attname] for field in User._meta.concrete_fields if field.attname in SNAPSHOT_FIELDS]
+    return User.from_db(router.db_for_read(User), SNAPSHOT_FIELDS, values)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or not _timeout():
+            return super().get_user(validated_token)
+
+        key = user_cache_key(user_id)
+        snapshot = cache.get(key)
+        if snapshot is None or snapshot == INVALIDATED or not self._snapshot_usable(snapshot):
+            # 未命中时走原有逻辑（查询并校验），只缓存校验通过的用户；
+            # add 只在键不存在时写入，失效标记存在时不会覆盖
+            user = super().get_user(validated_token)
+            if snapshot is None:
+                cache.add(key, make_snapshot(user), _timeout())
+            return user
+
+        self._check_snapshot(snapshot, validated_token)
+        return user_from_snapshot(snapshot)
+
+    def _snapshot_usable(self, snapshot):
+        # 开启 CHECK_REVOKE_TOKEN 之前写入的快照没有密码哈希，按未命中处理
+        return not getattr(api_settings, 'CHECK_REVOKE_TOKEN', False) or 'password_md5' in snapshot
+
+    def _check_snapshot(self, snapshot, validated_token):
+        """复现 JWTAuthentication.get_user 对用户的校验"""
+        if api_settings.CHECK_USER_IS_ACTIVE and not snapshot['is_active']:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != snapshot['password_md5']:
+                raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from backend.apps.todos.choices import TYPE_CHOICES
 from .models import User
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -147,39 +148,40 @@ class PasswordChangeSerializer(serializers.Serializer):
             raise serializers.ValidationError('两次输入的新密码不一致')
         return attrs
 
-class AdminUserListSerializer(serializers.ModelSerializer):
+class AdminUserTodoCountsMixin(serializers.Serializer):
+    """
+    待办事项统计字段，读取 annotate_todo_counts() 注解的值，不再逐行查询。
+    todos_by_type 为 {类型: 数量}。
+    """
+    todos_count = serializers.IntegerField(read_only=True)
+    completed_todos_count = serializers.IntegerField(read_only=True)
+    todos_by_type = serializers.SerializerMethodField()
+    
+    def get_todos_by_type(self, obj):
+        return {
+            todo_type: getattr(obj, f'{todo_type}_todos_count')
+            for todo_type, _ in TYPE_CHOICES
+        }
+
+class AdminUserListSerializer(AdminUserTodoCountsMixin, serializers.ModelSerializer):
     """管理员用户列表序列化器"""
-    todos_count = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'nickname', 'is_staff', 'is_active', 
-                 'is_superuser', 'last_login_time', 'created_at', 'todos_count')
+                 'is_superuser', 'last_login_time', 'created_at', 'todos_count',
+                 'completed_todos_count', 'todos_by_type')
         read_only_fields = ('id', 'username', 'created_at')
-    
-    def get_todos_count(self, obj):
-        """获取用户的待办事项数量"""
-        return obj.todos.filter(is_deleted=False).count()
 
-class AdminUserDetailSerializer(serializers.ModelSerializer):
+class AdminUserDetailSerializer(AdminUserTodoCountsMixin, serializers.ModelSerializer):
     """管理员用户详情序列化器"""
-    todos_count = serializers.SerializerMethodField()
-    completed_todos_count = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'nickname', 'is_staff', 'is_active', 
                  'is_superuser', 'last_login_time', 'created_at', 'updated_at',
-                 'todos_count', 'completed_todos_count')
+                 'todos_count', 'completed_todos_count', 'todos_by_type')
         read_only_fields = ('id', 'username', 'created_at', 'updated_at')
-    
-    def get_todos_count(self, obj):
-        """获取用户的待办事项总数"""
-        return obj.todos.filter(is_deleted=False).count()
-    
-    def get_completed_todos_count(self, obj):
-        """获取用户已完成的待办事项数量"""
-        return obj.todos.filter(is_deleted=False, completed=True).count()
 
 class AdminUserUpdateSerializer(serializers.ModelSerializer):
     """管理员用户更新序列化器"""
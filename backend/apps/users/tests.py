@@ -1,3 +1,135 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend.apps.todos.models import Todo
+
+from .authentication import user_cache_key
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    """认证用户缓存的失效"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123', nickname='Alice')
+        cache.clear()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_cached_user_skips_user_query(self):
+        self.assertEqual(self.client.get('/api/todos/stats/').status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/api/todos/stats/').status_code, status.HTTP_200_OK)
+        self.assertFalse([q for q in queries.captured_queries if 'auth_user_extended' in q['sql']])
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_deactivated_user_rejected_immediately(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_200_OK)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_rejected_immediately(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_200_OK)
+        self.user.delete()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cache_holds_only_snapshot(self):
+        self.client.get('/api/auth/profile/')
+        snapshot = cache.get(user_cache_key(self.user.pk))
+        self.assertEqual(snapshot['nickname'], 'Alice')
+        self.assertNotIn('password', snapshot)
+        self.assertNotIn('email', snapshot)
+
+    def test_profile_served_from_database_on_cached_path(self):
+        User.objects.filter(pk=self.user.pk).update(email='alice@example.com')
+        self.client.get('/api/auth/profile/')
+        response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.data['email'], 'alice@example.com')
+
+    def test_password_change_rejects_next_request(self):
+        # simplejwt 的 api_settings 不随 override_settings 更新，直接替换属性
+        with mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True, create=True):
+            token = RefreshToken.for_user(self.user).access_token
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_200_OK)
+            # 快照命中时同样校验 token 中的密码哈希
+            self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_200_OK)
+
+            response = self.client.post('/api/auth/change-password/', {
+                'current_password': 'password123',
+                'new_password': 'another-secret-42',
+                'confirm_password': 'another-secret-42',
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response = self.client.get('/api/auth/profile/')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(response.data['code'], 'password_changed')
+
+    def test_deactivated_user_rejected_after_cache_refill(self):
+        self.client.get('/api/auth/profile/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_401_UNAUTHORIZED)
+        # 失效标记过期后，由快照构造的用户同样被拒绝
+        cache.set(user_cache_key(self.user.pk), {
+            'id': self.user.pk, 'username': 'alice', 'nickname': 'Alice',
+            'is_active': False, 'is_staff': False, 'is_superuser': False,
+        })
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stale_fill_does_not_overwrite_invalidation(self):
+        # 失效前开始的请求查到了旧的用户对象，失效之后才回填
+        stale = User.objects.get(pk=self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(cache.add(user_cache_key(self.user.pk), stale))
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AdminUserTodoCountsTests(APITestCase):
+    """管理员用户列表/详情的待办统计：查询数与用户数量无关"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', password='password123', nickname='Admin', is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+    def create_users(self, count):
+        for i in range(count):
+            user = User.objects.create_user(username=f'user{i}', password='password123', nickname=f'User {i}')
+            Todo.objects.create(title='task', todo_type='task', created_by=user, completed=True)
+            Todo.objects.create(title='issue', todo_type='issue', created_by=user)
+
+    def test_list_query_count_is_constant(self):
+        # 分页计数 + 当前页，各一条查询
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/auth/admin/users/')
+        self.assertEqual(response.data['count'], 1)
+
+        self.create_users(10)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/auth/admin/users/')
+        self.assertEqual(response.data['count'], 11)
+        row = next(user for user in response.data['results'] if user['username'] == 'user0')
+        self.assertEqual(row['todos_count'], 2)
+        self.assertEqual(row['completed_todos_count'], 1)
+
+    def test_detail_counts_in_one_query(self):
+        self.create_users(1)
+        user = User.objects.get(username='user0')
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/auth/admin/users/{user.pk}/')
+        self.assertEqual(response.data['todos_count'], 2)
+        self.assertEqual(response.data['todos_by_type'], {'record': 0, 'requirement': 0, 'task': 1, 'issue': 1})
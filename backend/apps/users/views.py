@@ -3,7 +3,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
-from django.db.models import Q
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from backend.apps.todos.choices import TYPE_CHOICES
+from backend.apps.todos.models import UserTodoStats
 from .models import User
 from .serializers import (
     UserRegistrationSerializer,
@@ -61,7 +64,8 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
+        # 认证得到的是缓存快照构造的用户，更新资料需要完整的用户对象
+        return User.objects.get(pk=self.request.user.pk)
     
     def get_serializer_class(self):
         if self.request.method == 'PUT' or self.request.method == 'PATCH':
@@ -84,12 +88,29 @@ def change_password(request):
     """修改密码"""
     serializer = PasswordChangeSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
-        user = request.user
+        user = User.objects.get(pk=request.user.pk)
         user.set_password(serializer.validated_data['new_password'])
         user.save()
         return Response({'message': '密码修改成功'}, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def annotate_todo_counts(queryset):
+    """
+    为用户查询集注解待办事项统计（未删除的总数、已完成数、各类型数量），
+    供管理员序列化器读取；从用户计数表（UserTodoStats）关联读取，不扫描todo表。
+    """
+    counts = {
+        'todos_count': Coalesce('todo_stats__total_count', 0),
+        'completed_todos_count': Coalesce('todo_stats__completed_count', 0),
+    }
+    for todo_type, _ in TYPE_CHOICES:
+        counts[f'{todo_type}_todos_count'] = Coalesce(f'todo_stats__type_{todo_type}_count', 0)
+    return queryset.annotate(**counts)
+
+def admin_user_data(user):
+    """重新读取带统计注解的用户并序列化"""
+    return AdminUserDetailSerializer(annotate_todo_counts(User.objects.filter(pk=user.pk)).get()).data
+
 class IsAdminUser(permissions.BasePermission):
     """管理员权限检查"""
     def has_permission(self, request, view):
@@ -101,7 +122,7 @@ class AdminUserListView(generics.ListAPIView):
     permission_classes = [IsAdminUser]
     
     def get_queryset(self):
-        queryset = User.objects.all().order_by('-created_at')
+        queryset = annotate_todo_counts(User.objects.all()).order_by('-created_at')
         
         # 搜索功能
         search = self.request.query_params.get('search', None)
@@ -126,9 +147,13 @@ class AdminUserListView(generics.ListAPIView):
 
 class AdminUserDetailView(generics.RetrieveUpdateAPIView):
     """管理员查看和更新用户详情"""
-    queryset = User.objects.all()
     permission_classes = [IsAdminUser]
     
+    def get_queryset(self):
+        if self.request.method in ['PUT', 'PATCH']:
+            return User.objects.all()
+        return annotate_todo_counts(User.objects.all())
+    
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return AdminUserUpdateSerializer
@@ -168,7 +193,7 @@ def admin_toggle_user_status(request, user_id):
     action = '启用' if user.is_active else '禁用'
     return Response({
         'message': f'用户 {user.username} 已{action}',
-        'user': AdminUserDetailSerializer(user).data
+        'user': admin_user_data(user)
     })
 
 @api_view(['DELETE'])
@@ -211,13 +236,19 @@ def admin_user_stats(request):
     total_users = User.objects.count()
     active_users = User.objects.filter(is_active=True).count()
     staff_users = User.objects.filter(is_staff=True).count()
+    todo_totals = UserTodoStats.objects.aggregate(
+        total_todos=Coalesce(Sum('total_count'), 0),
+        completed_todos=Coalesce(Sum('completed_count'), 0),
+        deleted_todos=Coalesce(Sum('deleted_count'), 0),
+    )
     
     return Response({
         'total_users': total_users,
         'active_users': active_users,
         'inactive_users': total_users - active_users,
         'staff_users': staff_users,
-        'regular_users': total_users - staff_users
+        'regular_users': total_users - staff_users,
+        **todo_totals
     })
 
 @api_view(['POST'])
@@ -273,6 +304,6 @@ def admin_update_role(request, user_id):
         serializer.save()
         return Response({
             'message': f'用户 {user.username} 的角色已更新',
-            'user': AdminUserDetailSerializer(user).data
+            'user': admin_user_data(user)
         })
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
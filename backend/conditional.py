@@ -0,0 +1,35 @@
+"""
+条件GET（ETag → 304）
+
+接口先用很便宜的方式计算验证值（如 count + max(updated_at)），请求带的 If-None-Match 命中时
+直接返回 304，跳过查询数据、序列化和响应体传输。
+只发送 ETag 不发送 Last-Modified：验证值里的数量（删除、子任务数变化）无法用时间表达，
+且 Last-Modified 只精确到秒，同一秒内的修改会被 If-Modified-Since 误判为未变化。
+响应都是按用户的数据：Cache-Control: private, no-cache 让浏览器缓存但每次重新验证，
+Vary: Authorization 避免不同用户共用缓存。
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+
+def make_etag(*parts):
+    """由若干部分计算弱ETag（内容相同即可，不保证字节完全一致）"""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def not_modified(request, etag):
+    """If-None-Match 命中时返回带验证头的 304 响应，否则返回 None"""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        set_validators(response, etag)
+    return response
+
+
+def set_validators(response, etag):
+    """写入 ETag 和缓存头"""
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
@@ -0,0 +1,28 @@
+"""
+调优的 SQLite 数据库后端（ENGINE = 'backend.db.sqlite3'）
+
+SQLite 默认的回滚日志模式下写操作会锁住整个库，聊天消息写入、调度任务和API请求并发时
+容易出现 "database is locked"。在 Django 自带后端的基础上：
+
+- 新连接建立时设置 settings.SQLITE_PRAGMAS：
+  journal_mode=WAL（读写互不阻塞，写操作只与写操作串行，设置持久化在数据库文件中）、
+  synchronous=NORMAL（WAL 模式下安全，提交时不再每次 fsync）、
+  busy_timeout（遇到写锁时等待而不是立即报错）、mmap_size / cache_size / temp_store；
+- 事务以 BEGIN IMMEDIATE 开始：默认的 BEGIN 先取读锁、写入时再升级为写锁，
+  期间其他连接已提交时 SQLite 不等待 busy_timeout 而直接报 "database is locked"；
+  开始事务时就取写锁则只会排队等待。
+"""
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            conn.execute(f'PRAGMA {name}={value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
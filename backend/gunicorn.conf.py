@@ -0,0 +1,69 @@
+"""
+Gunicorn 配置：gunicorn -c backend/gunicorn.conf.py
+
+SERVER_ROLE 选择服务角色：
+- api（默认）：WSGI + gthread 线程工作进程，处理常规接口和同步的 send_message 流式接口，
+  流式响应只占用一个线程，不会阻塞整个工作进程；
+- stream：ASGI + UvicornWorker，处理异步流式接口 /api/chat/<id>/send_message_async/，
+  单个工作进程即可同时保持大量 SSE 连接。需要反向代理把该路径转发到这一组进程。
+
+进程数按 CPU 核数计算，可用 WEB_CONCURRENCY / GUNICORN_THREADS 覆盖。
+多个工作进程时必须设置 REDIS_URL 使用共享缓存（对话侧边栏、认证用户缓存的失效要对所有进程生效），
+DEBUG=False 时未配置则拒绝启动。
+"""
+import multiprocessing
+import os
+
+SERVER_ROLE = os.environ.get('SERVER_ROLE', 'api')
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+if SERVER_ROLE == 'api':
+    wsgi_app = 'backend.wsgi:application'
+    worker_class = 'gthread'
+    workers = int(os.environ.get('WEB_CONCURRENCY', cpu_count * 2 + 1))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+    # gthread 的 timeout 是工作进程心跳超时，线程中的长连接（流式回复）不受影响
+    timeout = 30
+elif SERVER_ROLE == 'stream':
+    wsgi_app = 'backend.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    workers = int(os.environ.get('WEB_CONCURRENCY', cpu_count))
+    timeout = 120
+else:
+    raise ValueError(f"Unsupported SERVER_ROLE: {SERVER_ROLE}")
+
+# 主进程先加载应用再fork，工作进程共享已导入的代码，启动更快、内存占用更少
+preload_app = True
+
+# 平滑回收：每个工作进程处理一定数量请求后重启（加随机抖动避免同时重启），防止内存缓慢增长；
+# 重启/停止时给正在处理的请求 graceful_timeout 秒完成
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    # preload_app 时应用已加载，可以读取 Django 配置
+    from django.conf import settings
+    backend = settings.CACHES['default']['BACKEND']
+    if workers > 1 and backend.endswith('LocMemCache'):
+        message = (
+            f'{workers} 个工作进程使用进程内缓存，对话侧边栏和认证用户缓存的失效只在本进程生效；'
+            '请设置 REDIS_URL 使用共享缓存'
+        )
+        if not settings.DEBUG:
+            raise RuntimeError(message)
+        server.log.warning(message)
+
+
+def pre_fork(server, worker):
+    # preload 时主进程可能已打开数据库连接，fork前关闭，避免工作进程共享同一个连接
+    from django.db import connections
+    connections.close_all()
@@ -11,8 +11,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-fallback-key-for-development-only')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-# Recommended: DEBUG = os.environ.get('DJANGO_DEBUG', 'False') == 'True'
-DEBUG = True # Default to False for production readiness
+# 本地开发设置环境变量 DEBUG=True；DEBUG 模式会在内存中保留每条SQL查询记录，生产环境必须关闭
+DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
 
 # ALLOWED_HOSTS should be configured for your production domain(s)
 # Example: ALLOWED_HOSTS = ['yourdomain.com', 'www.yourdomain.com']
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',  # gunicorn 下由应用直接提供静态文件（admin、DRF 页面）
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -73,12 +74,61 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 AUTH_USER_MODEL = 'users.User'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'data' / 'db.sqlite3',
+# DB_ENGINE=sqlite（默认）或 postgresql；PostgreSQL 需安装 psycopg
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'pass'),
+            'USER': os.environ.get('DB_USER', 'pass'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # 持久连接：每个工作线程复用连接，省去每个请求的连接建立和认证
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+elif DB_ENGINE == 'sqlite':
+    # SQLITE_TUNING=False 时使用 Django 自带后端，便于对比
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'True').lower() == 'true'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'backend.db.sqlite3' if SQLITE_TUNING else 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'data' / 'db.sqlite3'),
+        }
+    }
+    # 新连接建立时设置的 PRAGMA（见 backend/db/sqlite3/base.py）
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', '5000')),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', str(64 * 1024))),
+        'temp_store': 'MEMORY',
+    }
+else:
+    raise ValueError(f"Unsupported DB_ENGINE: {DB_ENGINE}")
+
+# Cache
+# 默认使用进程内缓存；多进程部署必须设置 REDIS_URL 使用共享缓存，缓存失效才能跨进程生效
+# （gunicorn 多个工作进程且 DEBUG=False 时未设置会拒绝启动）
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
     }
-}
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -97,13 +147,25 @@ USE_I18N = True
 USE_TZ = True
 
 # Static files
+# DEBUG=False 时 Django 不再提供静态文件，由 WhiteNoise 提供；镜像构建时 collectstatic 收集到 STATIC_ROOT。
+# 生产使用带哈希文件名的压缩存储，浏览器可长期缓存；需要先运行 collectstatic，开发时使用默认存储。
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'backend.apps.users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -166,10 +228,40 @@ CORS_ALLOW_ALL_ORIGINS = False # More secure default
 
 
 
+# Todo全文检索：PostgreSQL 下 to_tsvector 使用的分词配置（安装 zhparser 后可设为中文配置）
+TODO_SEARCH_CONFIG = os.environ.get('TODO_SEARCH_CONFIG', 'simple')
+
 # Gemini API配置
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 
-if not GEMINI_API_KEY:
+# 大模型调用方式：gemini / fake（本地确定性实现，用于测试和压测）
+LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'gemini')
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gemini-2.5-pro')
+# 单次调用超时（秒）
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', '120'))
+# 共享HTTP连接池大小
+LLM_MAX_CONNECTIONS = int(os.environ.get('LLM_MAX_CONNECTIONS', '20'))
+# fake 实现每输出一块前的等待秒数，用于模拟模型生成耗时
+LLM_FAKE_DELAY = float(os.environ.get('LLM_FAKE_DELAY', '0'))
+
+# 对话侧边栏（对话列表）缓存秒数，新增消息、对话变更时提前失效
+CHAT_SIDEBAR_CACHE_TIMEOUT = int(os.environ.get('CHAT_SIDEBAR_CACHE_TIMEOUT', '300'))
+
+# /api/todos/meta/ 选项目录的浏览器缓存秒数（过期后按 ETag 重新验证）
+TODO_META_MAX_AGE = int(os.environ.get('TODO_META_MAX_AGE', '86400'))
+
+# JWT 认证的用户缓存秒数，用户保存/删除时提前失效；0 关闭缓存（失效窗口见 users/authentication.py）
+USER_AUTH_CACHE_TIMEOUT = int(os.environ.get('USER_AUTH_CACHE_TIMEOUT', '60'))
+
+# 每日回顾任务：并发调用数、每秒最多请求数（令牌桶限流）
+DAILY_REVIEW_CONCURRENCY = int(os.environ.get('DAILY_REVIEW_CONCURRENCY', '4'))
+DAILY_REVIEW_RATE_LIMIT = float(os.environ.get('DAILY_REVIEW_RATE_LIMIT', '1.0'))
+# 执行记录停留在"执行中"超过该秒数视为进程已崩溃，可被重新认领
+DAILY_REVIEW_STALE_AFTER = int(os.environ.get('DAILY_REVIEW_STALE_AFTER', '1800'))
+# run_scheduler 的租约有效秒数：活跃实例每 1/3 周期续约，崩溃后其他实例最多等待该时长接管
+SCHEDULER_LEASE_TTL = int(os.environ.get('SCHEDULER_LEASE_TTL', '60'))
+
+if LLM_PROVIDER == 'gemini' and not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY environment variable is required")
 
 # 在文件末尾添加日志配置
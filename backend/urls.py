@@ -29,6 +29,7 @@ router.register(r'quick-task-configs', QuickTaskConfigViewSet, basename='quickta
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/chat/<int:pk>/send_message_async/', chat_views.send_message_async, name='chat-send-message-async'),
     path('api/', include(router.urls)),
     path('api/auth/', include('backend.apps.users.urls')),
     path('api-auth/', include('rest_framework.urls')),
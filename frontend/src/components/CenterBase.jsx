@@ -5,6 +5,7 @@ import { todoAPI } from '../services/api';
 import { useAuth } from './AuthContext';
 import PriorityTag from './PriorityTag';
 import StatusTag from './StatusTag';
+import useTodoMeta from './useTodoMeta';
 // 导入新的统一组件
 import { MacosSelect, MacosInput, MacosTextarea } from './ui';
 
@@ -44,52 +45,12 @@ const CenterBase = ({
     { value: 'issue', label: '故障', color: 'bg-red-100 text-red-800' }
   ];
 
-  // 优先级选项
-  const priorityOptions = [
-    { value: 'high', label: '高' },
-    { value: 'medium', label: '中' },
-    { value: 'low', label: '低' },
-    { value: 'none', label: '无' }
-  ];
-
-  // 添加状态配置 - 与后端保持同步
-  const statusConfig = {
-    record: [
-      { value: 'pending', label: '待阅' },
-      { value: 'archived', label: '归档' }
-    ],
-    requirement: [
-      { value: 'pending_evaluation', label: '待评估' },
-      { value: 'decomposed', label: '已拆解' },
-      { value: 'rejected', label: '已拒绝' }
-    ],
-    task: [
-      { value: 'todo', label: '待办' },
-      { value: 'on_hold', label: '搁置' },
-      { value: 'cancelled', label: '取消' },
-      { value: 'completed', label: '完成' }
-    ],
-    issue: [
-      { value: 'reported', label: '报告' },
-      { value: 'reproduced', label: '复现' },
-      { value: 'fixing', label: '修复' },
-      { value: 'resolved', label: '解决' },
-      { value: 'closed', label: '关闭' }
-    ]
-  };
-
-  // 创建状态映射表用于快速查找显示名称
-  const allStatusMap = {};
-  Object.values(statusConfig).forEach(statuses => {
-    statuses.forEach(status => {
-      allStatusMap[status.value] = status.label;
-    });
-  });
+  // 优先级、状态选项来自 /api/todos/meta/ 目录（页面共用一份，带浏览器缓存），加载完成前列表显示加载中
+  const todoMeta = useTodoMeta();
+  const priorityOptions = todoMeta.priorities;
 
   // 获取状态显示名称的辅助函数
-  const getStatusDisplay = (statusValue) => {
-    return allStatusMap[statusValue] || statusValue;
-  };
+  const getStatusDisplay = todoMeta.getStatusLabel;
   
   // 颜色主题配置
   const colorThemes = {
@@ -142,7 +103,8 @@ const CenterBase = ({
       setLoading(true);
       const params = {
         todo_type: todoType,
-        search: searchTerm
+        search: searchTerm,
+        exclude: 'available_statuses'
       };
       
       if (filter === 'completed') {
@@ -333,12 +295,8 @@ const CenterBase = ({
     });
   };
 
-    // 从后端数据获取可用状态选项
-  // 修改 getAvailableStatuses 函数
-  const getAvailableStatuses = (todoType) => {
-  // 使用前端配置而不是从后端获取
-  return statusConfig[todoType] || [];
-  };
+  // 可用状态选项从目录读取，列表接口不再逐行返回 available_statuses
+  const getAvailableStatuses = todoMeta.getStatusOptions;
 
   return (
     <div className="h-full bg-gradient-to-br from-gray-50 to-gray-100 flex flex-col">
@@ -413,7 +371,14 @@ const CenterBase = ({
             <div className="flex-1 overflow-y-auto">
               <div className="space-y-1 pr-2">
                 <AnimatePresence>
-                  {loading ? (
+                  {todoMeta.failed ? (
+                    <div className="text-center py-6 text-macos-gray-500">
+                      任务选项加载失败，
+                      <button className="text-macos-blue hover:underline" onClick={todoMeta.retry}>
+                        重试
+                      </button>
+                    </div>
+                  ) : loading || !todoMeta.loaded ? (
                     <div className="text-center py-6 text-macos-gray-500">
                       加载中...
                     </div>
@@ -647,7 +612,7 @@ const CenterBase = ({
                           {selectedTodo.status && (
                             <div>
                               <StatusTag 
-                                status={getStatusDisplay(selectedTodo.status)}
+                                status={selectedTodo.status}
                                 todoType={selectedTodo.todo_type} 
                                 size="sm" 
                               />
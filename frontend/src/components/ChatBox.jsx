@@ -15,7 +15,12 @@ function ChatBox() {
   const [streamingMessage, setStreamingMessage] = useState('');
   const [isStreaming, setIsStreaming] = useState(false);
   const [selectedPersona, setSelectedPersona] = useState('DefaultAssistant'); // 新增AI人格状态
+  const [olderCursor, setOlderCursor] = useState(null); // 加载更早消息的游标
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const messagesEndRef = useRef(null);
+  const messagesContainerRef = useRef(null);
+  const preservedScrollRef = useRef(null); // 向前插入消息时保持当前可见位置
+  const jumpToBottomRef = useRef(false); // 打开对话时直接定位到底部，避免平滑滚动经过顶部触发加载
   const isCreatingConversation = useRef(false); // 防止重复创建
 
   // 滚动到底部
@@ -24,6 +29,19 @@ function ChatBox() {
   };
 
   useEffect(() => {
+    if (preservedScrollRef.current !== null) {
+      const container = messagesContainerRef.current;
+      if (container) {
+        container.scrollTop = container.scrollHeight - preservedScrollRef.current;
+      }
+      preservedScrollRef.current = null;
+      return;
+    }
+    if (jumpToBottomRef.current) {
+      jumpToBottomRef.current = false;
+      messagesEndRef.current?.scrollIntoView();
+      return;
+    }
     scrollToBottom();
   }, [messages, streamingMessage]);
 
@@ -42,7 +60,9 @@ function ChatBox() {
     try {
       setLoading(true);
       const response = await chatAPI.getMessages(conversationId);
-      setMessages(response.data || []);
+      jumpToBottomRef.current = true;
+      setMessages(response.data.results || []);
+      setOlderCursor(response.data.previous);
     } catch (error) {
       console.error('加载消息失败:', error);
     } finally {
@@ -50,6 +70,31 @@ function ChatBox() {
     }
   };
 
+  // 滚动到顶部时加载更早的消息
+  const loadOlderMessages = async () => {
+    if (!currentConversation || !olderCursor || loadingOlder) return;
+    try {
+      setLoadingOlder(true);
+      const response = await chatAPI.getMessages(currentConversation.id, { before: olderCursor });
+      const container = messagesContainerRef.current;
+      if (container) {
+        preservedScrollRef.current = container.scrollHeight - container.scrollTop;
+      }
+      setMessages(prev => [...(response.data.results || []), ...prev]);
+      setOlderCursor(response.data.previous);
+    } catch (error) {
+      console.error('加载更早消息失败:', error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
+  const handleMessagesScroll = (e) => {
+    if (e.currentTarget.scrollTop < 80) {
+      loadOlderMessages();
+    }
+  };
+
   // 创建新对话（防重复调用）
   const handleNewConversation = useCallback(async () => {
     if (isCreatingConversation.current) {
@@ -63,6 +108,7 @@ function ChatBox() {
       const newConversation = response.data;
       setCurrentConversation(newConversation);
       setMessages([]);
+      setOlderCursor(null);
       setConversations(prev => [newConversation, ...prev]);
       setShowHistory(false);
     } catch (error) {
@@ -92,6 +138,7 @@ function ChatBox() {
         if (currentConversation?.id === conversationId) {
           setCurrentConversation(null);
           setMessages([]);
+          setOlderCursor(null);
         }
         console.log('对话删除成功');
       } catch (error) {
@@ -121,6 +168,7 @@ function ChatBox() {
         const newConversation = response.data;
         setCurrentConversation(newConversation);
         setMessages([]);
+        setOlderCursor(null);
         setConversations(prev => [newConversation, ...prev]);
         conversationToUse = newConversation;
       } catch (error) {
@@ -243,13 +291,24 @@ function ChatBox() {
         </div>
 
         {/* 消息区域 - 修改：移除固定高度，使用纯flex布局 */}
-        <div className="flex-1 overflow-y-auto p-4 space-y-4 min-h-0">
+        <div
+          ref={messagesContainerRef}
+          onScroll={handleMessagesScroll}
+          className="flex-1 overflow-y-auto p-4 space-y-4 min-h-0"
+        >
           {loading ? (
             <div className="flex justify-center items-center h-32">
               <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-macos-blue"></div>
             </div>
           ) : (
             <>
+              {/* 加载更早的消息 */}
+              {loadingOlder && (
+                <div className="flex justify-center py-2">
+                  <div className="animate-spin rounded-full h-5 w-5 border-b-2 border-macos-blue"></div>
+                </div>
+              )}
+              
               {messages.map((message) => (
                 <ChatMessage
                   key={message.id}
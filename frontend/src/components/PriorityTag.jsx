@@ -1,26 +1,27 @@
 import React from 'react';
+import useTodoMeta from './useTodoMeta';
 
 const PriorityTag = ({ priority, size = 'sm' }) => {
+  const { getPriorityLabel, loaded } = useTodoMeta();
+
+  // 颜色配置，显示名称来自选项目录
   const priorityConfig = {
     high: {
-      label: '高',
       className: 'bg-red-100 text-red-800 border-red-200'
     },
-    medium: {
-      label: '中', 
+    medium: { 
       className: 'bg-yellow-100 text-yellow-800 border-yellow-200'
     },
     low: {
-      label: '低',
       className: 'bg-green-100 text-green-800 border-green-200'
     },
     none: {
-      label: '无',
       className: 'bg-gray-100 text-gray-800 border-gray-200'
     }
   };
 
-  const config = priorityConfig[priority] || priorityConfig.none;
+  const value = priorityConfig[priority] ? priority : 'none';
+  const config = priorityConfig[value];
   
   const sizeClasses = {
     xs: 'px-1.5 py-0.5 text-xs',
@@ -29,9 +30,18 @@ const PriorityTag = ({ priority, size = 'sm' }) => {
     lg: 'px-3 py-2 text-sm'
   };
 
+  // 目录加载完成前显示占位
+  if (!loaded) {
+    return (
+      <span className={`inline-flex items-center rounded-full border font-medium animate-pulse bg-gray-100 text-gray-400 border-gray-200 ${sizeClasses[size]}`}>
+        …
+      </span>
+    );
+  }
+
   return (
     <span className={`inline-flex items-center rounded-full border font-medium ${config.className} ${sizeClasses[size]}`}>
-      {config.label}
+      {getPriorityLabel(value)}
     </span>
   );
 };
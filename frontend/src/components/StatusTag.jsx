@@ -1,38 +1,41 @@
 import React from 'react';
+import useTodoMeta from './useTodoMeta';
 
 const StatusTag = ({ status, todoType, size = 'sm' }) => {
-  // 根据todo类型和状态定义颜色配置
+  const { getStatusLabel, loaded } = useTodoMeta();
+
+  // 根据todo类型和状态值定义颜色，显示名称来自选项目录
   const statusConfig = {
     record: {
-      '待阅': { label: '待阅', className: 'bg-blue-100 text-blue-800 border-blue-200' },
-      '归档': { label: '归档', className: 'bg-gray-100 text-gray-800 border-gray-200' }
+      'pending': { className: 'bg-blue-100 text-blue-800 border-blue-200' },
+      'archived': { className: 'bg-gray-100 text-gray-800 border-gray-200' }
     },
     requirement: {
-      '待评估': { label: '待评估', className: 'bg-yellow-100 text-yellow-800 border-yellow-200' },
-      '已拆解': { label: '已拆解', className: 'bg-green-100 text-green-800 border-green-200' },
-      '已拒绝': { label: '已拒绝', className: 'bg-red-100 text-red-800 border-red-200' }
+      'pending_evaluation': { className: 'bg-yellow-100 text-yellow-800 border-yellow-200' },
+      'decomposed': { className: 'bg-green-100 text-green-800 border-green-200' },
+      'rejected': { className: 'bg-red-100 text-red-800 border-red-200' }
     },
     task: {
-      '待办': { label: '待办', className: 'bg-blue-100 text-blue-800 border-blue-200' },
-      '搁置': { label: '搁置', className: 'bg-orange-100 text-orange-800 border-orange-200' },
-      '取消': { label: '取消', className: 'bg-red-100 text-red-800 border-red-200' },
-      '完成': { label: '完成', className: 'bg-green-100 text-green-800 border-green-200' }
+      'todo': { className: 'bg-blue-100 text-blue-800 border-blue-200' },
+      'on_hold': { className: 'bg-orange-100 text-orange-800 border-orange-200' },
+      'cancelled': { className: 'bg-red-100 text-red-800 border-red-200' },
+      'completed': { className: 'bg-green-100 text-green-800 border-green-200' }
     },
     issue: {
-      '报告': { label: '报告', className: 'bg-red-100 text-red-800 border-red-200' },
-      '复现': { label: '复现', className: 'bg-orange-100 text-orange-800 border-orange-200' },
-      '修复': { label: '修复', className: 'bg-yellow-100 text-yellow-800 border-yellow-200' },
-      '解决': { label: '解决', className: 'bg-blue-100 text-blue-800 border-blue-200' },
-      '关闭': { label: '关闭', className: 'bg-gray-100 text-gray-800 border-gray-200' }
+      'reported': { className: 'bg-red-100 text-red-800 border-red-200' },
+      'reproduced': { className: 'bg-orange-100 text-orange-800 border-orange-200' },
+      'fixing': { className: 'bg-yellow-100 text-yellow-800 border-yellow-200' },
+      'resolved': { className: 'bg-blue-100 text-blue-800 border-blue-200' },
+      'closed': { className: 'bg-gray-100 text-gray-800 border-gray-200' }
     }
   };
 
   // 获取配置，如果找不到则使用默认配置
   const typeConfig = statusConfig[todoType] || {};
   const config = typeConfig[status] || {
-    label: status || '未知',
     className: 'bg-gray-100 text-gray-800 border-gray-200'
   };
+  const label = status ? getStatusLabel(status) : '未知';
   
   const sizeClasses = {
     xs: 'px-1.5 py-0.5 text-xs',
@@ -41,9 +44,18 @@ const StatusTag = ({ status, todoType, size = 'sm' }) => {
     lg: 'px-3 py-2 text-sm'
   };
 
+  // 目录加载完成前显示占位
+  if (!loaded) {
+    return (
+      <span className={`inline-flex items-center rounded-full border font-medium animate-pulse bg-gray-100 text-gray-400 border-gray-200 ${sizeClasses[size]}`}>
+        …
+      </span>
+    );
+  }
+
   return (
     <span className={`inline-flex items-center rounded-full border font-medium ${config.className} ${sizeClasses[size]}`}>
-      {config.label}
+      {label}
     </span>
   );
 };
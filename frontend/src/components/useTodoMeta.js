@@ -0,0 +1,76 @@
+import { useEffect, useState } from 'react';
+import { todoAPI } from '../services/api';
+
+// 类型/状态/优先级目录只来自后端 /api/todos/meta/（todos/choices.py），前端不内置副本；
+// 目录返回前 loaded 为 false，使用方显示加载状态
+
+// 目录加上查找表，便于按值取显示名称
+const indexMeta = (meta, state) => {
+  const statusLabels = {};
+  const statusesByType = {};
+  meta.types.forEach(type => {
+    statusesByType[type.value] = type.statuses;
+    type.statuses.forEach(status => {
+      statusLabels[status.value] = status.label;
+    });
+  });
+  const priorityLabels = {};
+  meta.priorities.forEach(priority => {
+    priorityLabels[priority.value] = priority.label;
+  });
+
+  return {
+    ...meta,
+    loaded: state === 'loaded',
+    failed: state === 'failed',
+    getStatusLabel: (status) => statusLabels[status] || status,
+    getStatusOptions: (todoType) => statusesByType[todoType] || [],
+    getPriorityLabel: (priority) => priorityLabels[priority] || priority
+  };
+};
+
+const EMPTY_META = { types: [], priorities: [] };
+
+// 整个页面共用一份目录，只请求一次（响应本身也带长缓存和ETag）；加载或失败时通知所有使用方
+let cachedMeta = indexMeta(EMPTY_META, 'loading');
+let loadingMeta = null;
+const listeners = new Set();
+
+const publish = (meta) => {
+  cachedMeta = meta;
+  listeners.forEach(listener => listener(meta));
+};
+
+const loadTodoMeta = () => {
+  if (!loadingMeta && !cachedMeta.loaded) {
+    publish(indexMeta(EMPTY_META, 'loading'));
+    loadingMeta = todoAPI.getTodoMeta()
+      .then(response => {
+        publish(indexMeta(response.data, 'loaded'));
+      })
+      .catch(error => {
+        console.error('获取任务选项目录失败:', error);
+        publish(indexMeta(EMPTY_META, 'failed'));
+      })
+      .finally(() => {
+        loadingMeta = null;
+      });
+  }
+};
+
+const useTodoMeta = () => {
+  const [meta, setMeta] = useState(cachedMeta);
+
+  useEffect(() => {
+    listeners.add(setMeta);
+    setMeta(cachedMeta);
+    loadTodoMeta();
+    return () => {
+      listeners.delete(setMeta);
+    };
+  }, []);
+
+  return { ...meta, retry: loadTodoMeta };
+};
+
+export default useTodoMeta;
@@ -202,6 +202,15 @@ export const todoAPI = {
   
   // 获取可引用的todos（用于AI聊天引用）
   getReferenceableTodos: () => api.get('/todos/referenceable_todos/'),
+  
+  // 获取任务树（子孙任务嵌套结构、祖先链、完成进度）
+  getTodoTree: (id) => api.get(`/todos/${id}/tree/`),
+  
+  // 批量操作：{ create: [...], update: [{id, ...}], status: [{id, status, completed}], delete: [id] }
+  bulkTodos: (operations) => api.post('/todos/bulk/', operations),
+  
+  // 类型/状态/优先级目录（强ETag、长缓存）
+  getTodoMeta: () => api.get('/todos/meta/'),
 };
 
 // 权限检查工具
@@ -251,8 +260,8 @@ export const chatAPI = {
   // 获取对话详情
   getConversation: (id) => api.get(`/chat/${id}/`),
   
-  // 获取对话消息
-  getMessages: (conversationId) => api.get(`/chat/${conversationId}/messages/`),
+  // 获取对话消息（游标分页：默认最近的消息，params.before 加载更早的消息）
+  getMessages: (conversationId, params = {}) => api.get(`/chat/${conversationId}/messages/`, { params }),
   
   // 发送消息（流式响应）- 支持todo引用
   sendMessage: async (conversationId, message, persona = 'DefaultAssistant', referencedTodos = []) => {